@@ -0,0 +1,240 @@
+"""Initial schema, as created by setup_db.py before migrations
+
+Revision ID: 0001_initial_schema
+Revises: 
+Create Date: 2026-10-16 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001_initial_schema'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('approval_paths',
+        sa.Column('approvalPathId', sa.Integer(), nullable=False),
+        sa.Column('department', sa.String(), nullable=True),
+        sa.Column('college', sa.String(), nullable=True),
+        sa.Column('approver_email', sa.String(), nullable=True),
+        sa.Column('approval_number', sa.Integer(), nullable=True),
+        sa.Column('isDeptHead', sa.Boolean(), nullable=True),
+        sa.Column('isDean', sa.Boolean(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('approvalPathId')
+    )
+    op.create_index(op.f('ix_approval_paths_approvalPathId'), 'approval_paths', ['approvalPathId'], unique=False)
+
+    op.create_table('users',
+        sa.Column('userId', sa.Integer(), nullable=False),
+        sa.Column('userName', sa.String(), nullable=True),
+        sa.Column('userEmail', sa.String(), nullable=True),
+        sa.Column('password', sa.String(), nullable=True),
+        sa.Column('rank', sa.String(), nullable=True),
+        sa.Column('college', sa.String(), nullable=True),
+        sa.Column('department', sa.String(), nullable=True),
+        sa.Column('role', sa.String(), nullable=True),
+        sa.Column('researchExpDetails', sa.Text(), nullable=True),
+        sa.Column('isDepartmentHead', sa.Boolean(), nullable=True),
+        sa.Column('isDean', sa.Boolean(), nullable=True),
+        sa.Column('googleScholarLink', sa.String(), nullable=True),
+        sa.Column('dolibarr_third_party_id', sa.Integer(), nullable=True),
+        sa.PrimaryKeyConstraint('userId')
+    )
+    op.create_index(op.f('ix_users_userEmail'), 'users', ['userEmail'], unique=True)
+    op.create_index(op.f('ix_users_userId'), 'users', ['userId'], unique=False)
+    op.create_index(op.f('ix_users_userName'), 'users', ['userName'], unique=False)
+
+    op.create_table('affiliations',
+        sa.Column('affId', sa.Integer(), nullable=False),
+        sa.Column('userId', sa.Integer(), nullable=True),
+        sa.Column('affInt', sa.Text(), nullable=True),
+        sa.ForeignKeyConstraint(['userId'], ['users.userId'], ),
+        sa.PrimaryKeyConstraint('affId')
+    )
+    op.create_index(op.f('ix_affiliations_affId'), 'affiliations', ['affId'], unique=False)
+
+    op.create_table('authorships',
+        sa.Column('authorId', sa.Integer(), nullable=False),
+        sa.Column('userId', sa.Integer(), nullable=True),
+        sa.Column('title', sa.String(), nullable=True),
+        sa.Column('authors', sa.Text(), nullable=True),
+        sa.Column('date', sa.Date(), nullable=True),
+        sa.Column('upCourse', sa.String(), nullable=True),
+        sa.Column('recommendingUnit', sa.String(), nullable=True),
+        sa.Column('publisher', sa.String(), nullable=True),
+        sa.Column('authorshipType', sa.String(), nullable=True),
+        sa.Column('numberOfAuthors', sa.Integer(), nullable=True),
+        sa.Column('supportingDocument', sa.String(), nullable=True),
+        sa.Column('status', sa.String(), nullable=True),
+        sa.Column('currentApprover', sa.Integer(), nullable=True),
+        sa.Column('approvalPath', sa.String(), nullable=True),
+        sa.Column('approverStatus', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['userId'], ['users.userId'], ),
+        sa.PrimaryKeyConstraint('authorId')
+    )
+    op.create_index(op.f('ix_authorships_authorId'), 'authorships', ['authorId'], unique=False)
+
+    op.create_table('courses_and_set',
+        sa.Column('caSId', sa.Integer(), nullable=False),
+        sa.Column('userId', sa.Integer(), nullable=True),
+        sa.Column('academicYear', sa.String(), nullable=True),
+        sa.Column('term', sa.String(), nullable=True),
+        sa.Column('courseNum', sa.String(), nullable=True),
+        sa.Column('section', sa.String(), nullable=True),
+        sa.Column('courseDesc', sa.Text(), nullable=True),
+        sa.Column('courseType', sa.String(), nullable=True),
+        sa.Column('percentContri', sa.Float(), nullable=True),
+        sa.Column('loadCreditUnits', sa.Float(), nullable=True),
+        sa.Column('noOfRespondents', sa.Integer(), nullable=True),
+        sa.Column('partOneStudent', sa.Float(), nullable=True),
+        sa.Column('partTwoCourse', sa.Float(), nullable=True),
+        sa.Column('partThreeTeaching', sa.Float(), nullable=True),
+        sa.Column('teachingPoints', sa.Float(), nullable=True),
+        sa.Column('supportingDocuments', sa.String(), nullable=True),
+        sa.Column('status', sa.String(), nullable=True),
+        sa.Column('currentApprover', sa.Integer(), nullable=True),
+        sa.Column('approvalPath', sa.String(), nullable=True),
+        sa.Column('approverStatus', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['userId'], ['users.userId'], ),
+        sa.PrimaryKeyConstraint('caSId')
+    )
+    op.create_index(op.f('ix_courses_and_set_caSId'), 'courses_and_set', ['caSId'], unique=False)
+
+    op.create_table('degrees',
+        sa.Column('degreeId', sa.Integer(), nullable=False),
+        sa.Column('userId', sa.Integer(), nullable=True),
+        sa.Column('school', sa.String(), nullable=True),
+        sa.Column('year', sa.Integer(), nullable=True),
+        sa.Column('degreeType', sa.String(), nullable=True),
+        sa.ForeignKeyConstraint(['userId'], ['users.userId'], ),
+        sa.PrimaryKeyConstraint('degreeId')
+    )
+    op.create_index(op.f('ix_degrees_degreeId'), 'degrees', ['degreeId'], unique=False)
+
+    op.create_table('extensions',
+        sa.Column('extensionId', sa.Integer(), nullable=False),
+        sa.Column('userId', sa.Integer(), nullable=True),
+        sa.Column('position', sa.String(), nullable=True),
+        sa.Column('office', sa.String(), nullable=True),
+        sa.Column('startDate', sa.Date(), nullable=True),
+        sa.Column('endDate', sa.Date(), nullable=True),
+        sa.Column('number', sa.String(), nullable=True),
+        sa.Column('extOfService', sa.Text(), nullable=True),
+        sa.Column('supportingDocument', sa.String(), nullable=True),
+        sa.Column('status', sa.String(), nullable=True),
+        sa.Column('currentApprover', sa.Integer(), nullable=True),
+        sa.Column('approvalPath', sa.String(), nullable=True),
+        sa.Column('approverStatus', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['userId'], ['users.userId'], ),
+        sa.PrimaryKeyConstraint('extensionId')
+    )
+    op.create_index(op.f('ix_extensions_extensionId'), 'extensions', ['extensionId'], unique=False)
+
+    op.create_table('research_activities',
+        sa.Column('raId', sa.Integer(), nullable=False),
+        sa.Column('userId', sa.Integer(), nullable=True),
+        sa.Column('title', sa.String(), nullable=True),
+        sa.Column('institute', sa.String(), nullable=True),
+        sa.Column('authors', sa.Text(), nullable=True),
+        sa.Column('datePublished', sa.Date(), nullable=True),
+        sa.Column('startDate', sa.Date(), nullable=True),
+        sa.Column('endDate', sa.Date(), nullable=True),
+        sa.Column('journal', sa.String(), nullable=True),
+        sa.Column('citedAs', sa.Text(), nullable=True),
+        sa.Column('doi', sa.String(), nullable=True),
+        sa.Column('publicationType', sa.String(), nullable=True),
+        sa.Column('supportingDocument', sa.String(), nullable=True),
+        sa.Column('status', sa.String(), nullable=True),
+        sa.Column('currentApprover', sa.Integer(), nullable=True),
+        sa.Column('approvalPath', sa.String(), nullable=True),
+        sa.Column('approverStatus', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['userId'], ['users.userId'], ),
+        sa.PrimaryKeyConstraint('raId')
+    )
+    op.create_index(op.f('ix_research_activities_raId'), 'research_activities', ['raId'], unique=False)
+
+    op.create_table('research_experiences',
+        sa.Column('rElId', sa.Integer(), nullable=False),
+        sa.Column('userId', sa.Integer(), nullable=True),
+        sa.Column('resExpLoc', sa.String(), nullable=True),
+        sa.Column('startDate', sa.Date(), nullable=True),
+        sa.Column('endDate', sa.Date(), nullable=True),
+        sa.ForeignKeyConstraint(['userId'], ['users.userId'], ),
+        sa.PrimaryKeyConstraint('rElId')
+    )
+    op.create_index(op.f('ix_research_experiences_rElId'), 'research_experiences', ['rElId'], unique=False)
+
+    op.create_table('research_interests',
+        sa.Column('rllId', sa.Integer(), nullable=False),
+        sa.Column('userId', sa.Integer(), nullable=True),
+        sa.Column('resInt', sa.Text(), nullable=True),
+        sa.ForeignKeyConstraint(['userId'], ['users.userId'], ),
+        sa.PrimaryKeyConstraint('rllId')
+    )
+    op.create_index(op.f('ix_research_interests_rllId'), 'research_interests', ['rllId'], unique=False)
+
+    op.create_table('sdgs',
+        sa.Column('sdgId', sa.Integer(), nullable=False),
+        sa.Column('raId', sa.Integer(), nullable=True),
+        sa.Column('sdgNum', sa.Integer(), nullable=True),
+        sa.Column('sdgDesc', sa.Text(), nullable=True),
+        sa.ForeignKeyConstraint(['raId'], ['research_activities.raId'], ),
+        sa.PrimaryKeyConstraint('sdgId')
+    )
+    op.create_index(op.f('ix_sdgs_sdgId'), 'sdgs', ['sdgId'], unique=False)
+
+    op.create_table('sdg_subsets',
+        sa.Column('sdgSId', sa.Integer(), nullable=False),
+        sa.Column('sdgId', sa.Integer(), nullable=True),
+        sa.Column('sdgSNum', sa.Integer(), nullable=True),
+        sa.Column('sdgSDesc', sa.Text(), nullable=True),
+        sa.ForeignKeyConstraint(['sdgId'], ['sdgs.sdgId'], ),
+        sa.PrimaryKeyConstraint('sdgSId')
+    )
+    op.create_index(op.f('ix_sdg_subsets_sdgSId'), 'sdg_subsets', ['sdgSId'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_sdg_subsets_sdgSId'), table_name='sdg_subsets')
+    op.drop_table('sdg_subsets')
+    op.drop_index(op.f('ix_sdgs_sdgId'), table_name='sdgs')
+    op.drop_table('sdgs')
+    op.drop_index(op.f('ix_research_interests_rllId'), table_name='research_interests')
+    op.drop_table('research_interests')
+    op.drop_index(op.f('ix_research_experiences_rElId'), table_name='research_experiences')
+    op.drop_table('research_experiences')
+    op.drop_index(op.f('ix_research_activities_raId'), table_name='research_activities')
+    op.drop_table('research_activities')
+    op.drop_index(op.f('ix_extensions_extensionId'), table_name='extensions')
+    op.drop_table('extensions')
+    op.drop_index(op.f('ix_degrees_degreeId'), table_name='degrees')
+    op.drop_table('degrees')
+    op.drop_index(op.f('ix_courses_and_set_caSId'), table_name='courses_and_set')
+    op.drop_table('courses_and_set')
+    op.drop_index(op.f('ix_authorships_authorId'), table_name='authorships')
+    op.drop_table('authorships')
+    op.drop_index(op.f('ix_affiliations_affId'), table_name='affiliations')
+    op.drop_table('affiliations')
+    op.drop_index(op.f('ix_users_userName'), table_name='users')
+    op.drop_index(op.f('ix_users_userId'), table_name='users')
+    op.drop_index(op.f('ix_users_userEmail'), table_name='users')
+    op.drop_table('users')
+    op.drop_index(op.f('ix_approval_paths_approvalPathId'), table_name='approval_paths')
+    op.drop_table('approval_paths')
@@ -0,0 +1,62 @@
+"""Dolibarr outbox and delta sync state
+
+Revision ID: 0002_dolibarr_sync_state
+Revises: 0001_initial_schema
+Create Date: 2026-10-16 09:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002_dolibarr_sync_state'
+down_revision: Union[str, None] = '0001_initial_schema'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('dolibarr_outbox',
+        sa.Column('outboxId', sa.Integer(), nullable=False),
+        sa.Column('userId', sa.Integer(), nullable=True),
+        sa.Column('operation', sa.String(), nullable=True),
+        sa.Column('dolibarr_third_party_id', sa.Integer(), nullable=True),
+        sa.Column('status', sa.String(), nullable=True),
+        sa.Column('attempts', sa.Integer(), nullable=True),
+        sa.Column('next_attempt_at', sa.DateTime(), nullable=True),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('outboxId')
+    )
+    op.create_index(op.f('ix_dolibarr_outbox_outboxId'), 'dolibarr_outbox', ['outboxId'], unique=False)
+    op.create_index(op.f('ix_dolibarr_outbox_userId'), 'dolibarr_outbox', ['userId'], unique=False)
+    op.create_index('ix_dolibarr_outbox_status_next_attempt', 'dolibarr_outbox', ['status', 'next_attempt_at'], unique=False)
+
+    op.create_table('sync_state',
+        sa.Column('key', sa.String(), nullable=False),
+        sa.Column('value', sa.String(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('key')
+    )
+
+    op.add_column('users', sa.Column('dolibarr_payload_hash', sa.String(length=64), nullable=True))
+    op.add_column('users', sa.Column('dolibarr_synced_hash', sa.String(length=64), nullable=True))
+    op.add_column('users', sa.Column('dolibarr_synced_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.drop_column('dolibarr_synced_at')
+        batch_op.drop_column('dolibarr_synced_hash')
+        batch_op.drop_column('dolibarr_payload_hash')
+
+    op.drop_table('sync_state')
+
+    op.drop_index('ix_dolibarr_outbox_status_next_attempt', table_name='dolibarr_outbox')
+    op.drop_index(op.f('ix_dolibarr_outbox_userId'), table_name='dolibarr_outbox')
+    op.drop_index(op.f('ix_dolibarr_outbox_outboxId'), table_name='dolibarr_outbox')
+    op.drop_table('dolibarr_outbox')
@@ -0,0 +1,54 @@
+"""Approval inbox view and approver indexes
+
+Revision ID: 0003_approval_inbox
+Revises: 0002_dolibarr_sync_state
+Create Date: 2026-10-16 09:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003_approval_inbox'
+down_revision: Union[str, None] = '0002_dolibarr_sync_state'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Frozen copy of app.models.APPROVAL_INBOX_SELECT at this revision
+APPROVAL_INBOX_SELECT = """
+SELECT 'research_activity' AS record_type, "raId" AS record_id, "userId" AS submitter_id,
+       "currentApprover" AS current_approver, status, created_at, title
+FROM research_activities
+UNION ALL
+SELECT 'course', "caSId", "userId", "currentApprover", status, created_at,
+       "courseNum" || ' - ' || "courseDesc"
+FROM courses_and_set
+UNION ALL
+SELECT 'extension', "extensionId", "userId", "currentApprover", status, created_at,
+       position || ' at ' || office
+FROM extensions
+UNION ALL
+SELECT 'authorship', "authorId", "userId", "currentApprover", status, created_at, title
+FROM authorships
+"""
+
+
+def upgrade() -> None:
+    op.create_index('ix_research_activities_approver_status_created', 'research_activities', ['currentApprover', 'status', 'created_at'], unique=False)
+    op.create_index('ix_courses_and_set_approver_status_created', 'courses_and_set', ['currentApprover', 'status', 'created_at'], unique=False)
+    op.create_index('ix_extensions_approver_status_created', 'extensions', ['currentApprover', 'status', 'created_at'], unique=False)
+    op.create_index('ix_authorships_approver_status_created', 'authorships', ['currentApprover', 'status', 'created_at'], unique=False)
+
+    op.execute("CREATE VIEW approval_inbox AS" + APPROVAL_INBOX_SELECT)
+
+
+def downgrade() -> None:
+    op.execute("DROP VIEW IF EXISTS approval_inbox")
+
+    op.drop_index('ix_authorships_approver_status_created', table_name='authorships')
+    op.drop_index('ix_extensions_approver_status_created', table_name='extensions')
+    op.drop_index('ix_courses_and_set_approver_status_created', table_name='courses_and_set')
+    op.drop_index('ix_research_activities_approver_status_created', table_name='research_activities')
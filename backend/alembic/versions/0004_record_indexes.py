@@ -0,0 +1,52 @@
+"""Owner/status and foreign key indexes on record tables
+
+Revision ID: 0004_record_indexes
+Revises: 0003_approval_inbox
+Create Date: 2026-10-16 09:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004_record_indexes'
+down_revision: Union[str, None] = '0003_approval_inbox'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Owner lists and summary counts filter on (userId, status); approver
+    # lookups are covered by the (currentApprover, status, created_at) indexes
+    op.create_index('ix_research_activities_user_status', 'research_activities', ['userId', 'status'], unique=False)
+    op.create_index('ix_courses_and_set_user_status', 'courses_and_set', ['userId', 'status'], unique=False)
+    op.create_index('ix_extensions_user_status', 'extensions', ['userId', 'status'], unique=False)
+    op.create_index('ix_authorships_user_status', 'authorships', ['userId', 'status'], unique=False)
+
+    # Foreign keys used for child lookups, and the summary scope filters
+    op.create_index(op.f('ix_affiliations_userId'), 'affiliations', ['userId'], unique=False)
+    op.create_index(op.f('ix_degrees_userId'), 'degrees', ['userId'], unique=False)
+    op.create_index(op.f('ix_research_experiences_userId'), 'research_experiences', ['userId'], unique=False)
+    op.create_index(op.f('ix_research_interests_userId'), 'research_interests', ['userId'], unique=False)
+    op.create_index(op.f('ix_sdgs_raId'), 'sdgs', ['raId'], unique=False)
+    op.create_index(op.f('ix_sdg_subsets_sdgId'), 'sdg_subsets', ['sdgId'], unique=False)
+    op.create_index(op.f('ix_users_college'), 'users', ['college'], unique=False)
+    op.create_index(op.f('ix_users_department'), 'users', ['department'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_users_department'), table_name='users')
+    op.drop_index(op.f('ix_users_college'), table_name='users')
+    op.drop_index(op.f('ix_sdg_subsets_sdgId'), table_name='sdg_subsets')
+    op.drop_index(op.f('ix_sdgs_raId'), table_name='sdgs')
+    op.drop_index(op.f('ix_research_interests_userId'), table_name='research_interests')
+    op.drop_index(op.f('ix_research_experiences_userId'), table_name='research_experiences')
+    op.drop_index(op.f('ix_degrees_userId'), table_name='degrees')
+    op.drop_index(op.f('ix_affiliations_userId'), table_name='affiliations')
+    op.drop_index('ix_authorships_user_status', table_name='authorships')
+    op.drop_index('ix_extensions_user_status', table_name='extensions')
+    op.drop_index('ix_courses_and_set_user_status', table_name='courses_and_set')
+    op.drop_index('ix_research_activities_user_status', table_name='research_activities')
@@ -0,0 +1,48 @@
+"""Precomputed approval counters per department, college and overall
+
+Revision ID: 0005_approval_counters
+Revises: 0004_record_indexes
+Create Date: 2026-10-16 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005_approval_counters'
+down_revision: Union[str, None] = '0004_record_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('approval_counters',
+        sa.Column('scope_type', sa.String(), nullable=False),
+        sa.Column('scope_value', sa.String(), nullable=False),
+        sa.Column('record_type', sa.String(), nullable=False),
+        sa.Column('status', sa.String(), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('scope_type', 'scope_value', 'record_type', 'status')
+    )
+
+    # Backfill from the existing records
+    for scope_type, scope_value, scope_filter, scope_group in (
+        ("department", 'u."department"', 'WHERE u."department" IS NOT NULL', ', u."department"'),
+        ("college", 'u."college"', 'WHERE u."college" IS NOT NULL', ', u."college"'),
+        ("all", "'*'", "", ""),
+    ):
+        op.execute(f"""
+            INSERT INTO approval_counters (scope_type, scope_value, record_type, status, count, updated_at)
+            SELECT '{scope_type}', {scope_value}, i.record_type, COALESCE(i.status, 'pending'), COUNT(*), CURRENT_TIMESTAMP
+            FROM approval_inbox i JOIN users u ON u."userId" = i.submitter_id
+            {scope_filter}
+            GROUP BY i.record_type, COALESCE(i.status, 'pending'){scope_group}
+        """)
+
+
+def downgrade() -> None:
+    op.drop_table('approval_counters')
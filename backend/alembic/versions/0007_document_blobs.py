@@ -0,0 +1,34 @@
+"""Reference-counted content-addressed supporting documents
+
+Revision ID: 0007_document_blobs
+Revises: 0006_profile_updated_at
+Create Date: 2026-10-16 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0007_document_blobs'
+down_revision: Union[str, None] = '0006_profile_updated_at'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('document_blobs',
+        sa.Column('sha256', sa.String(length=64), nullable=False),
+        sa.Column('size', sa.Integer(), nullable=True),
+        sa.Column('refcount', sa.Integer(), nullable=True),
+        sa.Column('uploaded_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('sha256')
+    )
+    op.create_index('ix_document_blobs_unreferenced', 'document_blobs', ['refcount', 'uploaded_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_document_blobs_unreferenced', table_name='document_blobs')
+    op.drop_table('document_blobs')
@@ -0,0 +1,143 @@
+"""Normalized approval steps replacing the JSON approval columns
+
+Revision ID: 0008_approval_steps
+Revises: 0007_document_blobs
+Create Date: 2026-10-16 16:00:00.000000
+
+"""
+import json
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0008_approval_steps'
+down_revision: Union[str, None] = '0007_document_blobs'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# record_type -> (table, primary key), as in the approval_inbox view
+RECORD_TABLES = {
+    'research_activity': ('research_activities', 'raId'),
+    'course': ('courses_and_set', 'caSId'),
+    'extension': ('extensions', 'extensionId'),
+    'authorship': ('authorships', 'authorId'),
+}
+
+approval_steps = sa.table('approval_steps',
+    sa.column('record_type', sa.String()),
+    sa.column('record_id', sa.Integer()),
+    sa.column('step_no', sa.Integer()),
+    sa.column('approver_id', sa.Integer()),
+    sa.column('role', sa.String()),
+    sa.column('status', sa.String()),
+    sa.column('comments', sa.Text()),
+    sa.column('acted_at', sa.DateTime()),
+)
+
+
+def _parse_steps(approval_path, approver_status):
+    """
+    Steps from the old columns: a JSON list of {approver_id, role, status,
+    comments, updated_at}, or a comma-separated list of approver IDs with a
+    matching comma-separated approverStatus.
+    """
+    try:
+        path = json.loads(approval_path)
+    except ValueError:
+        ids = [part.strip() for part in approval_path.split(',') if part.strip()]
+        statuses = approver_status.split(',') if approver_status else []
+        path = [
+            {'approver_id': int(approver_id), 'status': (statuses[i].strip() if i < len(statuses) else 'pending')}
+            for i, approver_id in enumerate(ids)
+        ]
+    if not isinstance(path, list):
+        return []
+
+    steps = []
+    for step in path:
+        acted_at = None
+        if step.get('updated_at'):
+            try:
+                acted_at = datetime.fromisoformat(step['updated_at'])
+            except (TypeError, ValueError):
+                pass
+        steps.append({
+            'approver_id': step.get('approver_id'),
+            'role': step.get('role'),
+            'status': step.get('status') or 'pending',
+            'comments': step.get('comments'),
+            'acted_at': acted_at,
+        })
+    return steps
+
+
+def upgrade() -> None:
+    op.create_table('approval_steps',
+        sa.Column('stepId', sa.Integer(), nullable=False),
+        sa.Column('record_type', sa.String(), nullable=False),
+        sa.Column('record_id', sa.Integer(), nullable=False),
+        sa.Column('step_no', sa.Integer(), nullable=False),
+        sa.Column('approver_id', sa.Integer(), nullable=True),
+        sa.Column('role', sa.String(), nullable=True),
+        sa.Column('status', sa.String(), nullable=True),
+        sa.Column('comments', sa.Text(), nullable=True),
+        sa.Column('acted_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['approver_id'], ['users.userId'], ),
+        sa.PrimaryKeyConstraint('stepId')
+    )
+    op.create_index(op.f('ix_approval_steps_stepId'), 'approval_steps', ['stepId'], unique=False)
+    op.create_index('ux_approval_steps_record_step', 'approval_steps', ['record_type', 'record_id', 'step_no'], unique=True)
+    op.create_index('ix_approval_steps_approver_status', 'approval_steps', ['approver_id', 'status'])
+
+    connection = op.get_bind()
+    for record_type, (table, key) in RECORD_TABLES.items():
+        records = sa.table(table, sa.column(key, sa.Integer()), sa.column('approvalPath'), sa.column('approverStatus'))
+        rows = []
+        for record_id, approval_path, approver_status in connection.execute(
+            sa.select(records.c[key], records.c.approvalPath, records.c.approverStatus)
+            .where(records.c.approvalPath.isnot(None), records.c.approvalPath != '')
+        ):
+            for step_no, step in enumerate(_parse_steps(approval_path, approver_status), start=1):
+                rows.append({'record_type': record_type, 'record_id': record_id, 'step_no': step_no, **step})
+        if rows:
+            op.bulk_insert(approval_steps, rows)
+
+        # Plain ALTER TABLE (SQLite 3.35+): a batch table copy would trip over approval_inbox
+        op.drop_column(table, 'approverStatus')
+        op.drop_column(table, 'approvalPath')
+
+
+def downgrade() -> None:
+    connection = op.get_bind()
+    for record_type, (table, key) in RECORD_TABLES.items():
+        op.add_column(table, sa.Column('approvalPath', sa.String(), nullable=True))
+        op.add_column(table, sa.Column('approverStatus', sa.String(), nullable=True))
+
+        paths = {}
+        for row in connection.execute(
+            sa.select(approval_steps)
+            .where(approval_steps.c.record_type == record_type)
+            .order_by(approval_steps.c.record_id, approval_steps.c.step_no)
+        ):
+            paths.setdefault(row.record_id, []).append({
+                'approver_id': row.approver_id,
+                'role': row.role,
+                'status': row.status,
+                'comments': row.comments,
+                'updated_at': row.acted_at.isoformat() if row.acted_at else None,
+            })
+
+        records = sa.table(table, sa.column(key, sa.Integer()), sa.column('approvalPath', sa.String()))
+        for record_id, path in paths.items():
+            connection.execute(
+                records.update().where(records.c[key] == record_id).values(approvalPath=json.dumps(path))
+            )
+
+    op.drop_index('ix_approval_steps_approver_status', table_name='approval_steps')
+    op.drop_index('ux_approval_steps_record_step', table_name='approval_steps')
+    op.drop_index(op.f('ix_approval_steps_stepId'), table_name='approval_steps')
+    op.drop_table('approval_steps')
@@ -0,0 +1,39 @@
+"""Unique course section per faculty member, the key of teaching imports
+
+Revision ID: 0009_course_import_key
+Revises: 0008_approval_steps
+Create Date: 2026-10-16 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0009_course_import_key'
+down_revision: Union[str, None] = '0008_approval_steps'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+KEY_COLUMNS = ['userId', 'academicYear', 'term', 'courseNum', 'section']
+
+
+def upgrade() -> None:
+    courses = sa.table('courses_and_set', *(sa.column(column) for column in KEY_COLUMNS))
+    duplicates = sa.select(sa.func.count()).select_from(
+        sa.select(*courses.c).group_by(*courses.c).having(sa.func.count() > 1).subquery()
+    )
+    duplicate_groups = op.get_bind().scalar(duplicates)
+    if duplicate_groups:
+        raise RuntimeError(
+            f"{duplicate_groups} course sections have more than one courses_and_set row for the "
+            f"same user; merge or delete the duplicates of ({', '.join(KEY_COLUMNS)}) and rerun"
+        )
+
+    op.create_index('ux_courses_and_set_user_section', 'courses_and_set', KEY_COLUMNS, unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ux_courses_and_set_user_section', table_name='courses_and_set')
@@ -0,0 +1,27 @@
+"""Email on Dolibarr outbox deletes queued before the third party was linked
+
+Revision ID: 0010_outbox_user_email
+Revises: 0009_course_import_key
+Create Date: 2026-10-16 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0010_outbox_user_email'
+down_revision: Union[str, None] = '0009_course_import_key'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('dolibarr_outbox', sa.Column('user_email', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('dolibarr_outbox') as batch_op:
+        batch_op.drop_column('user_email')
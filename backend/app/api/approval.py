@@ -1,9 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List, Dict, Any
-from ..dependencies import get_db, get_current_user, get_current_admin
-from ..models import User, ApprovalPath
-from ..schemas import ApprovalPathCreate, ApprovalPathUpdate, ApprovalPathInDB
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from typing import List, Dict, Any, Optional
+from datetime import datetime
+import base64
+from ..dependencies import get_async_db, get_current_user, get_current_admin
+from ..models import User, ApprovalPath, approval_inbox
+from ..config import settings
+from ..schemas import (
+    ApprovalPathCreate, ApprovalPathUpdate, ApprovalPathInDB, ApprovalStepInDB,
+    ApprovalBatchRequest, ApprovalBatchResponse
+)
+from ..services.approvals import apply_decision, batch_decide, record_key, record_model
 import json
 
 router = APIRouter()
@@ -14,36 +23,38 @@ async def get_approval_paths(
     college: str = None,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_admin)
 ):
     """
     Get all approval paths (admin only).
     Filter by department and/or college if provided.
     """
-    query = db.query(ApprovalPath)
+    query = select(ApprovalPath)
     
     if department:
-        query = query.filter(ApprovalPath.department == department)
+        query = query.where(ApprovalPath.department == department)
     
     if college:
-        query = query.filter(ApprovalPath.college == college)
+        query = query.where(ApprovalPath.college == college)
     
-    paths = query.order_by(ApprovalPath.department, ApprovalPath.college, ApprovalPath.approval_number).offset(skip).limit(limit).all()
+    paths = (await db.scalars(
+        query.order_by(ApprovalPath.department, ApprovalPath.college, ApprovalPath.approval_number).offset(skip).limit(limit)
+    )).all()
     
     return paths
 
 @router.post("/paths", response_model=ApprovalPathInDB)
 async def create_approval_path(
     path_data: ApprovalPathCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_admin)
 ):
     """
     Create a new approval path (admin only).
     """
     # Check if approver email exists
-    approver = db.query(User).filter(User.userEmail == path_data.approver_email).first()
+    approver = await db.scalar(select(User.userId).where(User.userEmail == path_data.approver_email))
     if not approver:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -61,8 +72,8 @@ async def create_approval_path(
     )
     
     db.add(db_path)
-    db.commit()
-    db.refresh(db_path)
+    await db.commit()
+    await db.refresh(db_path)
     
     return db_path
 
@@ -70,13 +81,13 @@ async def create_approval_path(
 async def update_approval_path(
     path_id: int,
     path_data: ApprovalPathUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_admin)
 ):
     """
     Update an approval path (admin only).
     """
-    db_path = db.query(ApprovalPath).filter(ApprovalPath.approvalPathId == path_id).first()
+    db_path = await db.get(ApprovalPath, path_id)
     
     if db_path is None:
         raise HTTPException(
@@ -86,7 +97,7 @@ async def update_approval_path(
     
     # Check if approver email exists if it's being updated
     if path_data.approver_email:
-        approver = db.query(User).filter(User.userEmail == path_data.approver_email).first()
+        approver = await db.scalar(select(User.userId).where(User.userEmail == path_data.approver_email))
         if not approver:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -97,21 +108,21 @@ async def update_approval_path(
     for key, value in path_data.dict(exclude_unset=True).items():
         setattr(db_path, key, value)
     
-    db.commit()
-    db.refresh(db_path)
+    await db.commit()
+    await db.refresh(db_path)
     
     return db_path
 
 @router.delete("/paths/{path_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_approval_path(
     path_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_admin)
 ):
     """
     Delete an approval path (admin only).
     """
-    db_path = db.query(ApprovalPath).filter(ApprovalPath.approvalPathId == path_id).first()
+    db_path = await db.get(ApprovalPath, path_id)
     
     if db_path is None:
         raise HTTPException(
@@ -119,100 +130,171 @@ async def delete_approval_path(
             detail="Approval path not found"
         )
     
-    db.delete(db_path)
-    db.commit()
+    await db.delete(db_path)
+    await db.commit()
     
     return None
 
-@router.get("/pending", response_model=Dict[str, List[Dict[str, Any]]])
+# Response category for each record type in /pending
+PENDING_CATEGORIES = {
+    "research_activity": "research_activities",
+    "course": "courses",
+    "extension": "extensions",
+    "authorship": "authorships"
+}
+
+
+def _inbox_query(approver_id: int, item_status: str = "pending"):
+    """
+    Rows of the approval_inbox view for one approver, joined to the submitter.
+    """
+    return select(
+        approval_inbox.c.record_type,
+        approval_inbox.c.record_id,
+        approval_inbox.c.title,
+        approval_inbox.c.submitter_id,
+        User.userName.label("submitter_name"),
+        approval_inbox.c.status,
+        approval_inbox.c.created_at
+    ).outerjoin(User, User.userId == approval_inbox.c.submitter_id).where(
+        approval_inbox.c.current_approver == approver_id,
+        approval_inbox.c.status == item_status
+    )
+
+
+# Sort key for legacy rows without created_at; NULL would never compare past a cursor
+_NO_CREATED_AT = datetime(1970, 1, 1)
+
+
+def _apply_keyset(query, cursor: Optional[str], descending: bool = False):
+    """
+    Order inbox rows by (created_at, record_type, record_id) and seek past the cursor.
+    """
+    columns = (
+        func.coalesce(approval_inbox.c.created_at, _NO_CREATED_AT),
+        approval_inbox.c.record_type,
+        approval_inbox.c.record_id
+    )
+    if cursor:
+        created_at, record_type, record_id = _decode_cursor(cursor)
+        after = (lambda column, value: column < value) if descending else (lambda column, value: column > value)
+        query = query.where(or_(
+            after(columns[0], created_at),
+            and_(columns[0] == created_at, or_(
+                after(columns[1], record_type),
+                and_(columns[1] == record_type, after(columns[2], record_id))
+            ))
+        ))
+    return query.order_by(*(column.desc() if descending else column for column in columns))
+
+
+async def _fetch_page(db: AsyncSession, query, limit: Optional[int]):
+    """
+    Returns (rows, has_more); fetches one extra row to detect a following page.
+    """
+    if not limit:
+        return (await db.execute(query)).all(), False
+    rows = (await db.execute(query.limit(limit + 1))).all()
+    return rows[:limit], len(rows) > limit
+
+
+async def _count(db: AsyncSession, query) -> int:
+    return await db.scalar(select(func.count()).select_from(query.order_by(None).subquery()))
+
+
+def _inbox_item(row) -> Dict[str, Any]:
+    return {
+        "id": row.record_id,
+        "title": row.title,
+        "type": row.record_type,
+        "submitter_id": row.submitter_id,
+        "submitter_name": row.submitter_name,
+        "date_submitted": row.created_at.isoformat() if row.created_at else None
+    }
+
+
+def _encode_cursor(row) -> str:
+    key = [(row.created_at or _NO_CREATED_AT).isoformat(), row.record_type, row.record_id]
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode()
+
+
+def _decode_cursor(cursor: str):
+    try:
+        created_at, record_type, record_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        # Cursors issued before NULL dates sorted as _NO_CREATED_AT carry null
+        created_at = datetime.fromisoformat(created_at) if created_at is not None else _NO_CREATED_AT
+        return created_at, str(record_type), int(record_id)
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+@router.get("/pending", response_model=Dict[str, Any])
 async def get_pending_approvals(
-    db: Session = Depends(get_db),
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Get all items pending approval by the current user.
-    Returns a dictionary with categories of pending items.
+    Returns a dictionary with categories of pending items, the total number
+    of pending items and, when paginating with limit, a next_cursor to pass
+    back for the following page (oldest submissions first).
     """
-    # Get all types of items pending approval
-    from ..models import ResearchActivities, CourseAndSET, Extension, Authorship
+    query = _inbox_query(current_user.userId)
+    rows, has_more = await _fetch_page(db, _apply_keyset(query, cursor), limit)
+    total = await _count(db, query)
     
-    # Research activities
-    research_activities = db.query(ResearchActivities).filter(
-        ResearchActivities.currentApprover == current_user.userId,
-        ResearchActivities.status == "pending"
-    ).all()
+    # Format response
+    result: Dict[str, Any] = {category: [] for category in PENDING_CATEGORIES.values()}
+    for row in rows:
+        result[PENDING_CATEGORIES[row.record_type]].append(_inbox_item(row))
+    result["total"] = total
+    result["next_cursor"] = _encode_cursor(rows[-1]) if has_more else None
     
-    # Courses and SET
-    courses = db.query(CourseAndSET).filter(
-        CourseAndSET.currentApprover == current_user.userId,
-        CourseAndSET.status == "pending"
-    ).all()
+    return result
+
+@router.get("/inbox", response_model=Dict[str, Any])
+async def get_approval_inbox(
+    record_type: Optional[List[str]] = Query(None),
+    item_status: str = Query("pending", alias="status"),
+    order: str = Query("asc", pattern="^(asc|desc)$"),
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get the current user's approval inbox as a single list across record types.
+    Filter by record_type (repeatable) and status, sort by submission date
+    with order=asc|desc, and page with limit and the returned next_cursor.
+    """
+    if record_type:
+        unknown = set(record_type) - set(PENDING_CATEGORIES)
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid record type: {', '.join(sorted(unknown))}"
+            )
     
-    # Extensions
-    extensions = db.query(Extension).filter(
-        Extension.currentApprover == current_user.userId,
-        Extension.status == "pending"
-    ).all()
+    query = _inbox_query(current_user.userId, item_status)
+    if record_type:
+        query = query.where(approval_inbox.c.record_type.in_(record_type))
     
-    # Authorships
-    authorships = db.query(Authorship).filter(
-        Authorship.currentApprover == current_user.userId,
-        Authorship.status == "pending"
-    ).all()
+    rows, has_more = await _fetch_page(db, _apply_keyset(query, cursor, descending=order == "desc"), limit)
     
-    # Format response
-    result = {
-        "research_activities": [
-            {
-                "id": item.raId,
-                "title": item.title,
-                "type": "research_activity",
-                "submitter_id": item.userId,
-                "submitter_name": db.query(User).filter(User.userId == item.userId).first().userName,
-                "date_submitted": item.created_at.isoformat()
-            }
-            for item in research_activities
-        ],
-        "courses": [
-            {
-                "id": item.caSId,
-                "title": f"{item.courseNum} - {item.courseDesc}",
-                "type": "course",
-                "submitter_id": item.userId,
-                "submitter_name": db.query(User).filter(User.userId == item.userId).first().userName,
-                "date_submitted": item.created_at.isoformat()
-            }
-            for item in courses
-        ],
-        "extensions": [
-            {
-                "id": item.extensionId,
-                "title": f"{item.position} at {item.office}",
-                "type": "extension",
-                "submitter_id": item.userId,
-                "submitter_name": db.query(User).filter(User.userId == item.userId).first().userName,
-                "date_submitted": item.created_at.isoformat()
-            }
-            for item in extensions
-        ],
-        "authorships": [
-            {
-                "id": item.authorId,
-                "title": item.title,
-                "type": "authorship",
-                "submitter_id": item.userId,
-                "submitter_name": db.query(User).filter(User.userId == item.userId).first().userName,
-                "date_submitted": item.created_at.isoformat()
-            }
-            for item in authorships
-        ]
+    return {
+        "items": [_inbox_item(row) for row in rows],
+        "total": await _count(db, query),
+        "next_cursor": _encode_cursor(rows[-1]) if has_more else None
     }
-    
-    return result
 
 @router.get("/my-submissions", response_model=Dict[str, List[Dict[str, Any]]])
 async def get_my_submissions(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -222,24 +304,24 @@ async def get_my_submissions(
     from ..models import ResearchActivities, CourseAndSET, Extension, Authorship
     
     # Research activities
-    research_activities = db.query(ResearchActivities).filter(
+    research_activities = (await db.scalars(select(ResearchActivities).where(
         ResearchActivities.userId == current_user.userId
-    ).all()
+    ))).all()
     
     # Courses and SET
-    courses = db.query(CourseAndSET).filter(
+    courses = (await db.scalars(select(CourseAndSET).where(
         CourseAndSET.userId == current_user.userId
-    ).all()
+    ))).all()
     
     # Extensions
-    extensions = db.query(Extension).filter(
+    extensions = (await db.scalars(select(Extension).where(
         Extension.userId == current_user.userId
-    ).all()
+    ))).all()
     
     # Authorships
-    authorships = db.query(Authorship).filter(
+    authorships = (await db.scalars(select(Authorship).where(
         Authorship.userId == current_user.userId
-    ).all()
+    ))).all()
     
     # Format response
     result = {
@@ -250,7 +332,7 @@ async def get_my_submissions(
                 "type": "research_activity",
                 "status": item.status,
                 "date_submitted": item.created_at.isoformat(),
-                "current_approver": get_approver_name(db, item.currentApprover) if item.currentApprover else None
+                "current_approver": await get_approver_name(db, item.currentApprover) if item.currentApprover else None
             }
             for item in research_activities
         ],
@@ -261,7 +343,7 @@ async def get_my_submissions(
                 "type": "course",
                 "status": item.status,
                 "date_submitted": item.created_at.isoformat(),
-                "current_approver": get_approver_name(db, item.currentApprover) if item.currentApprover else None
+                "current_approver": await get_approver_name(db, item.currentApprover) if item.currentApprover else None
             }
             for item in courses
         ],
@@ -272,7 +354,7 @@ async def get_my_submissions(
                 "type": "extension",
                 "status": item.status,
                 "date_submitted": item.created_at.isoformat(),
-                "current_approver": get_approver_name(db, item.currentApprover) if item.currentApprover else None
+                "current_approver": await get_approver_name(db, item.currentApprover) if item.currentApprover else None
             }
             for item in extensions
         ],
@@ -283,7 +365,7 @@ async def get_my_submissions(
                 "type": "authorship",
                 "status": item.status,
                 "date_submitted": item.created_at.isoformat(),
-                "current_approver": get_approver_name(db, item.currentApprover) if item.currentApprover else None
+                "current_approver": await get_approver_name(db, item.currentApprover) if item.currentApprover else None
             }
             for item in authorships
         ]
@@ -291,139 +373,112 @@ async def get_my_submissions(
     
     return result
 
-def get_approver_name(db: Session, approver_id: int) -> str:
+async def get_approver_name(db: AsyncSession, approver_id: int) -> str:
     """Helper function to get approver name from ID."""
     if not approver_id:
         return None
         
-    approver = db.query(User).filter(User.userId == approver_id).first()
-    return approver.userName if approver else None
+    return await db.scalar(select(User.userName).where(User.userId == approver_id))
 
 
-@router.post("/{record_type}/{record_id}/approve", response_model=Dict[str, Any])
-async def update_approval_status(
-    record_type: str,
-    record_id: int,
-    status: str,
-    comments: str = None,
-    db: Session = Depends(get_db),
+@router.post("/batch", response_model=ApprovalBatchResponse)
+async def batch_update_approval_status(
+    batch: ApprovalBatchRequest,
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """
-    Update the approval status of a record.
-    Status can be 'approved' or 'rejected'.
+    Approve or reject many records in one transaction.
+    Each item is a record_type, record_id, decision ('approved' or
+    'rejected') and optional comment. Items fail independently: the
+    response has a result per item, in request order, with the record's new
+    status or the error. Records another request is updating are skipped
+    with a 409 rather than waited for; resubmit those.
     """
-    # Validate status
-    if status not in ['approved', 'rejected']:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Status must be 'approved' or 'rejected'"
-        )
-    
-    # Get the appropriate model based on record_type
-    model_map = {
-        'research_activity': ('ResearchActivities', 'raId'),
-        'course': ('CourseAndSET', 'caSId'),
-        'extension': ('Extension', 'extensionId'),
-        'authorship': ('Authorship', 'authorId')
-    }
-    
-    if record_type not in model_map:
+    if len(batch.items) > settings.APPROVAL_BATCH_MAX_ITEMS:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Invalid record type: {record_type}"
+            detail=f"At most {settings.APPROVAL_BATCH_MAX_ITEMS} items per batch"
         )
     
-    model_name, id_field = model_map[record_type]
+    results = await db.run_sync(batch_decide, batch.items, current_user.userId)
+    await db.commit()
     
-    # Import the model dynamically
-    from ..models import ResearchActivities, CourseAndSET, Extension, Authorship
-    model_classes = {
-        'ResearchActivities': ResearchActivities,
-        'CourseAndSET': CourseAndSET,
-        'Extension': Extension,
-        'Authorship': Authorship
+    succeeded = sum(1 for result in results if result["ok"])
+    return {
+        "results": results,
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded
     }
-    
-    model = model_classes[model_name]
-    
-    # Get the record
-    record = db.query(model).filter(getattr(model, id_field) == record_id).first()
-    
+
+
+async def _get_record(db: AsyncSession, record_type: str, record_id: int):
+    model = record_model(record_type)
+    record = await db.scalar(
+        select(model).where(record_key(model) == record_id).options(selectinload(model.approval_steps))
+    )
     if not record:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"{record_type.capitalize()} record not found"
         )
+    return record
+
+
+@router.get("/{record_type}/{record_id}/steps", response_model=List[ApprovalStepInDB])
+async def get_approval_steps(
+    record_type: str,
+    record_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get the approval steps of a record in path order, with each approver's
+    decision and comments. Visible to the submitter, the record's approvers
+    and admins.
+    """
+    record = await _get_record(db, record_type, record_id)
     
-    # Check if user is the current approver
-    if record.currentApprover != current_user.userId:
+    if (
+        record.userId != current_user.userId
+        and current_user.role != "admin"
+        and all(step.approver_id != current_user.userId for step in record.approval_steps)
+    ):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
-            detail="You are not authorized to approve this record"
+            detail="Not authorized to view this record's approval steps"
         )
     
+    return record.approval_steps
+
+
+@router.post("/{record_type}/{record_id}/approve", response_model=Dict[str, Any])
+async def update_approval_status(
+    record_type: str,
+    record_id: int,
+    decision: str = Query(..., alias="status"),
+    comments: str = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Update the approval status of a record.
+    Status can be 'approved' or 'rejected'.
+    """
+    # Get the record
+    record = await _get_record(db, record_type, record_id)
+    
     # Update approval status
-    if status == "approved":
-        # Check if there's an approval path
-        if record.approvalPath:
-            # Parse the approval path
-            approval_path = record.approvalPath.split(",")
-            approver_status = record.approverStatus.split(",") if record.approverStatus else ["pending"] * len(approval_path)
-            
-            # Find current approver's position
-            try:
-                current_index = approval_path.index(str(current_user.userId))
-            except ValueError:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Current user not found in approval path"
-                )
-            
-            # Update approver status
-            approver_status[current_index] = "approved"
-            record.approverStatus = ",".join(approver_status)
-            
-            # Check if there are more approvers
-            if current_index < len(approval_path) - 1:
-                # Move to next approver
-                record.currentApprover = int(approval_path[current_index + 1])
-            else:
-                # Final approval
-                record.status = "approved"
-                record.currentApprover = None
-        else:
-            # No approval path defined, just approve
-            record.status = "approved"
-            record.currentApprover = None
-    
-    elif status == "rejected":
-        # Reject the record
-        record.status = "rejected"
-        
-        # Update approver status if path exists
-        if record.approvalPath and record.approverStatus:
-            approval_path = record.approvalPath.split(",")
-            approver_status = record.approverStatus.split(",")
-            
-            try:
-                current_index = approval_path.index(str(current_user.userId))
-                approver_status[current_index] = "rejected"
-                record.approverStatus = ",".join(approver_status)
-            except ValueError:
-                pass  # Ignore if user not found in path
-    
-    # Add comments if provided
-    # Note: You might want to store comments in a separate table for a production system
+    apply_decision(record, current_user.userId, decision, comments)
     
     # Save changes
-    db.commit()
-    db.refresh(record)
+    await db.commit()
+    await db.refresh(record)
     
     return {
-        "message": f"Record {status} successfully",
+        "message": f"Record {decision} successfully",
         "record_id": record_id,
         "record_type": record_type,
         "status": record.status,
-        "current_approver": get_approver_name(db, record.currentApprover) if record.currentApprover else None
+        "current_approver": await get_approver_name(db, record.currentApprover) if record.currentApprover else None
     }
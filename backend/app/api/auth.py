@@ -5,7 +5,7 @@ from ..dependencies import get_db
 from ..auth import authenticate_user, create_access_token
 from ..schemas import Token, UserCreate, UserResponse
 from ..models import User
-from ..auth import get_password_hash
+from ..auth import get_password_hash_async
 from datetime import timedelta
 from ..config import settings
 
@@ -19,7 +19,7 @@ async def login_for_access_token(
     """
     Authenticate user and provide access token.
     """
-    user = authenticate_user(db, form_data.username, form_data.password)
+    user = await authenticate_user(db, form_data.username, form_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -49,7 +49,7 @@ async def register_user(user_data: UserCreate, db: Session = Depends(get_db)):
         )
     
     # Create new user with default role as faculty
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await get_password_hash_async(user_data.password)
     db_user = User(
         userName=user_data.userName,
         userEmail=user_data.userEmail,
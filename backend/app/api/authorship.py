@@ -4,8 +4,8 @@ from typing import List, Optional
 from ..dependencies import get_db, get_current_user, get_current_admin
 from ..models import User, Authorship
 from ..schemas import AuthorshipCreate, AuthorshipUpdate, AuthorshipInDB, ApprovalStatusUpdate
-from ..utils import save_upload_file, generate_approval_path, json_serialize, update_approval_status, get_overall_approval_status
-import json
+from ..services.approvals import new_approval_steps, apply_decision, resubmit
+from ..utils import save_upload_file, generate_approval_path
 
 router = APIRouter()
 
@@ -72,7 +72,7 @@ async def create_authorship(
         authorshipType=authorship_data.authorshipType,
         numberOfAuthors=authorship_data.numberOfAuthors,
         supportingDocument=authorship_data.supportingDocument,
-        approvalPath=json_serialize(approval_path),
+        approval_steps=new_approval_steps("authorship", approval_path),
         currentApprover=approval_path[0]["approver_id"] if approval_path else None,
         status="pending"
     )
@@ -113,16 +113,7 @@ async def update_authorship(
         setattr(db_authorship, key, value)
     
     # Reset approval status if content is changed
-    if db_authorship.status == "rejected":
-        approval_path = json.loads(db_authorship.approvalPath) if db_authorship.approvalPath else []
-        
-        # Reset all statuses to pending
-        for step in approval_path:
-            step["status"] = "pending"
-        
-        db_authorship.approvalPath = json_serialize(approval_path)
-        db_authorship.currentApprover = approval_path[0]["approver_id"] if approval_path else None
-        db_authorship.status = "pending"
+    resubmit(db_authorship)
     
     db.commit()
     db.refresh(db_authorship)
@@ -178,7 +169,7 @@ async def upload_supporting_document(
         raise HTTPException(status_code=404, detail="Authorship record not found")
     
     # Save uploaded file
-    file_path = await save_upload_file(file, f"authorships/{current_user.userId}")
+    file_path = await save_upload_file(file)
     
     # Update authorship with file path
     db_authorship.supportingDocument = file_path
@@ -227,46 +218,7 @@ async def approve_authorship(
         )
     
     # Update approval status
-    approval_path = json.loads(db_authorship.approvalPath) if db_authorship.approvalPath else []
-    
-    # Find current approver in path
-    current_approver_index = -1
-    for i, step in enumerate(approval_path):
-        if step["approver_id"] == current_user.userId:
-            current_approver_index = i
-            break
-    
-    if current_approver_index == -1:
-        raise HTTPException(
-            status_code=400,
-            detail="You are not in the approval path for this authorship record"
-        )
-    
-    # Update status for current approver
-    approval_path[current_approver_index]["status"] = approval_data.status
-    approval_path[current_approver_index]["comments"] = approval_data.comments
-    
-    # If rejected, update authorship status
-    if approval_data.status == "rejected":
-        db_authorship.status = "rejected"
-        db_authorship.approvalPath = json_serialize(approval_path)
-    else:
-        # If approved, check if there are more approvers
-        next_approver = None
-        for i in range(current_approver_index + 1, len(approval_path)):
-            if approval_path[i]["status"] == "pending":
-                next_approver = approval_path[i]["approver_id"]
-                break
-        
-        if next_approver:
-            # Move to next approver
-            db_authorship.currentApprover = next_approver
-        else:
-            # All approvers have approved
-            db_authorship.status = "approved"
-            db_authorship.currentApprover = None
-        
-        db_authorship.approvalPath = json_serialize(approval_path)
+    apply_decision(db_authorship, current_user.userId, approval_data.status, approval_data.comments)
     
     db.commit()
     db.refresh(db_authorship)
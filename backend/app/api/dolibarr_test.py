@@ -23,7 +23,7 @@ async def ping_dolibarr():
             "data": result
         }
     except Exception as e:
-        logger.error(f"Error connecting to Dolibarr API: {str(e)}")
+        logger.error("Error connecting to Dolibarr API: %s", e)
         raise HTTPException(status_code=500, detail=f"Error connecting to Dolibarr API: {str(e)}")
 
 @router.get("/third-party/{third_party_id}", response_model=Dict[str, Any])
@@ -41,7 +41,7 @@ async def get_third_party(
             "data": result
         }
     except Exception as e:
-        logger.error(f"Error fetching third party {third_party_id}: {str(e)}")
+        logger.error("Error fetching third party %s: %s", third_party_id, e)
         raise HTTPException(status_code=500, detail=f"Error fetching third party: {str(e)}")
 
 @router.get("/third-parties", response_model=Dict[str, Any])
@@ -61,7 +61,7 @@ async def list_third_parties(
             "data": result
         }
     except Exception as e:
-        logger.error(f"Error listing third parties: {str(e)}")
+        logger.error("Error listing third parties: %s", e)
         raise HTTPException(status_code=500, detail=f"Error listing third parties: {str(e)}")
 
 @router.get("/search", response_model=Dict[str, Any])
@@ -80,5 +80,5 @@ async def search_third_party_by_email(
             "data": result
         }
     except Exception as e:
-        logger.error(f"Error searching for third party by email {email}: {str(e)}")
+        logger.error("Error searching for third party by email %s: %s", email, e)
         raise HTTPException(status_code=500, detail=f"Error searching for third party: {str(e)}")
@@ -4,8 +4,8 @@ from typing import List, Optional
 from ..dependencies import get_db, get_current_user, get_current_admin
 from ..models import User, Extension
 from ..schemas import ExtensionCreate, ExtensionUpdate, ExtensionInDB, ApprovalStatusUpdate
-from ..utils import save_upload_file, generate_approval_path, json_serialize, update_approval_status, get_overall_approval_status
-import json
+from ..services.approvals import new_approval_steps, apply_decision, resubmit
+from ..utils import save_upload_file, generate_approval_path
 
 router = APIRouter()
 
@@ -70,7 +70,7 @@ async def create_extension(
         number=extension_data.number,
         extOfService=extension_data.extOfService,
         supportingDocument=extension_data.supportingDocument,
-        approvalPath=json_serialize(approval_path),
+        approval_steps=new_approval_steps("extension", approval_path),
         currentApprover=approval_path[0]["approver_id"] if approval_path else None,
         status="pending"
     )
@@ -111,16 +111,7 @@ async def update_extension(
         setattr(db_extension, key, value)
     
     # Reset approval status if content is changed
-    if db_extension.status == "rejected":
-        approval_path = json.loads(db_extension.approvalPath) if db_extension.approvalPath else []
-        
-        # Reset all statuses to pending
-        for step in approval_path:
-            step["status"] = "pending"
-        
-        db_extension.approvalPath = json_serialize(approval_path)
-        db_extension.currentApprover = approval_path[0]["approver_id"] if approval_path else None
-        db_extension.status = "pending"
+    resubmit(db_extension)
     
     db.commit()
     db.refresh(db_extension)
@@ -176,7 +167,7 @@ async def upload_supporting_document(
         raise HTTPException(status_code=404, detail="Extension activity not found")
     
     # Save uploaded file
-    file_path = await save_upload_file(file, f"extensions/{current_user.userId}")
+    file_path = await save_upload_file(file)
     
     # Update extension with file path
     db_extension.supportingDocument = file_path
@@ -225,46 +216,7 @@ async def approve_extension(
         )
     
     # Update approval status
-    approval_path = json.loads(db_extension.approvalPath) if db_extension.approvalPath else []
-    
-    # Find current approver in path
-    current_approver_index = -1
-    for i, step in enumerate(approval_path):
-        if step["approver_id"] == current_user.userId:
-            current_approver_index = i
-            break
-    
-    if current_approver_index == -1:
-        raise HTTPException(
-            status_code=400,
-            detail="You are not in the approval path for this extension activity"
-        )
-    
-    # Update status for current approver
-    approval_path[current_approver_index]["status"] = approval_data.status
-    approval_path[current_approver_index]["comments"] = approval_data.comments
-    
-    # If rejected, update extension status
-    if approval_data.status == "rejected":
-        db_extension.status = "rejected"
-        db_extension.approvalPath = json_serialize(approval_path)
-    else:
-        # If approved, check if there are more approvers
-        next_approver = None
-        for i in range(current_approver_index + 1, len(approval_path)):
-            if approval_path[i]["status"] == "pending":
-                next_approver = approval_path[i]["approver_id"]
-                break
-        
-        if next_approver:
-            # Move to next approver
-            db_extension.currentApprover = next_approver
-        else:
-            # All approvers have approved
-            db_extension.status = "approved"
-            db_extension.currentApprover = None
-        
-        db_extension.approvalPath = json_serialize(approval_path)
+    apply_decision(db_extension, current_user.userId, approval_data.status, approval_data.comments)
     
     db.commit()
     db.refresh(db_extension)
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status, UploadFile, File, Form
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from ..dependencies import get_db, get_current_user
@@ -11,46 +11,45 @@ from ..schemas import (
     ResearchExperienceCreate, ResearchExperienceUpdate, ResearchExperienceInDB,
     ProfileResponse
 )
-from ..services.dolibarr_client import dolibarr_client
+from ..services.dolibarr_outbox import enqueue_user_sync, outbox_worker
+from ..services.profile import PROFILE_CACHE_CONTROL, profile_etag, etag_matches, load_profile
+import logging
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 @router.get("/me", response_model=ProfileResponse)
 async def get_my_profile(
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Get the current user's profile with all related information.
+    Returns 304 when If-None-Match carries the profile's current ETag.
     """
-    print(f"\n=== PROFILE ENDPOINT ===\nUser: {current_user.userName}, Role: {current_user.role}\n")
-    
-    # Debug user information
-    print(f"User ID: {current_user.userId}")
-    print(f"User Name: {current_user.userName}")
-    print(f"User Email: {current_user.userEmail}")
-    print(f"User Role: {current_user.role}")
-    print(f"User College: {current_user.college}")
-    print(f"User Department: {current_user.department}")
-    print(f"Is Department Head: {current_user.isDepartmentHead}")
-    print(f"Is Dean: {current_user.isDean}")
-    
-    # Debug related data
-    print(f"Degrees: {current_user.degrees}")
-    print(f"Research Interests: {current_user.research_interests}")
-    print(f"Affiliations: {current_user.affiliations}")
-    print(f"Research Experiences: {current_user.research_experiences}")
-    
-    response_data = {
-        "user": current_user,
-        "degrees": current_user.degrees,
-        "research_interests": current_user.research_interests,
-        "affiliations": current_user.affiliations,
-        "research_experiences": current_user.research_experiences
-    }
-    
-    print(f"Returning profile data")
-    return response_data
+    logger.debug(
+        "Profile requested by user %s (%s), role: %s, department: %s, college: %s",
+        current_user.userId, current_user.userEmail, current_user.role,
+        current_user.department, current_user.college
+    )
+    
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        etag = profile_etag(db, current_user.userId)
+        if etag_matches(if_none_match, etag):
+            return Response(
+                status_code=status.HTTP_304_NOT_MODIFIED,
+                headers={"ETag": etag, "Cache-Control": PROFILE_CACHE_CONTROL}
+            )
+    
+    # current_user may be a cached token snapshot; the body uses the row the ETag was computed from
+    etag, user, children = load_profile(db, current_user.userId)
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = PROFILE_CACHE_CONTROL
+    return {"user": user, **children}
 
 @router.put("/me", response_model=UserResponse)
 async def update_my_profile(
@@ -65,25 +64,13 @@ async def update_my_profile(
     for key, value in user_data.dict(exclude_unset=True).items():
         setattr(current_user, key, value)
     
+    # Queue the Dolibarr sync in the same transaction as the update
+    if current_user.dolibarr_third_party_id:
+        enqueue_user_sync(db, current_user.userId, "upsert")
+    
     db.commit()
     db.refresh(current_user)
-    
-    # Sync with Dolibarr if third party ID exists
-    if current_user.dolibarr_third_party_id:
-        try:
-            await dolibarr_client.update_third_party(
-                current_user.dolibarr_third_party_id,
-                {
-                    "userName": current_user.userName,
-                    "userEmail": current_user.userEmail,
-                    "department": current_user.department,
-                    "college": current_user.college,
-                    "rank": current_user.rank
-                }
-            )
-        except Exception as e:
-            # Log error but don't fail the request
-            print(f"Error syncing with Dolibarr: {str(e)}")
+    outbox_worker.notify()
     
     return current_user
 
@@ -1,43 +1,60 @@
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
-from sqlalchemy.orm import Session
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 from typing import List, Optional
-from ..dependencies import get_db, get_current_user, get_current_admin
+from ..dependencies import get_async_db, get_current_user, get_current_admin
 from ..models import User, ResearchActivities, SDG, SDGSubset
 from ..schemas import ResearchActivitiesCreate, ResearchActivitiesUpdate, ResearchActivitiesInDB, ApprovalStatusUpdate
-from ..utils import save_upload_file, generate_approval_path, json_serialize, update_approval_status, get_overall_approval_status
-import json
+from ..services.sdg_tags import validate_sdg_tags, replace_sdg_tags
+from ..services.approvals import new_approval_steps, apply_decision, resubmit
+from ..utils import save_upload_file, generate_approval_path
 
 router = APIRouter()
 
+def _publication_query():
+    # Responses include SDGs and their subsets, which can't lazy load on an async session
+    return select(ResearchActivities).options(
+        selectinload(ResearchActivities.sdgs).selectinload(SDG.subsets)
+    )
+
+async def _load_publication(db: AsyncSession, publication_id: int) -> ResearchActivities:
+    """
+    Reload a publication after a commit, with fresh column values and SDGs.
+    """
+    return await db.scalar(
+        _publication_query().where(ResearchActivities.raId == publication_id).execution_options(populate_existing=True)
+    )
+
 @router.get("/", response_model=List[ResearchActivitiesInDB])
 async def get_publications(
     skip: int = 0, 
     limit: int = 100, 
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Get all publications for the current user.
     """
-    publications = db.query(ResearchActivities).filter(
+    publications = (await db.scalars(_publication_query().where(
         ResearchActivities.userId == current_user.userId
-    ).offset(skip).limit(limit).all()
+    ).offset(skip).limit(limit))).all()
     
     return publications
 
 @router.get("/{publication_id}", response_model=ResearchActivitiesInDB)
 async def get_publication(
     publication_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Get a specific publication by ID.
     """
-    publication = db.query(ResearchActivities).filter(
+    publication = await db.scalar(_publication_query().where(
         ResearchActivities.raId == publication_id,
         ResearchActivities.userId == current_user.userId
-    ).first()
+    ))
     
     if publication is None:
         raise HTTPException(status_code=404, detail="Publication not found")
@@ -47,17 +64,17 @@ async def get_publication(
 @router.post("/", response_model=ResearchActivitiesInDB)
 async def create_publication(
     publication_data: ResearchActivitiesCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Create a new publication.
     """
+    sdg_tags = validate_sdg_tags(publication_data.sdgs or [])
+    
     # Generate approval path
-    approval_path = generate_approval_path(
-        current_user.department, 
-        current_user.college,
-        db
+    approval_path = await db.run_sync(
+        lambda session: generate_approval_path(current_user.department, current_user.college, session)
     )
     
     # Create publication
@@ -74,56 +91,35 @@ async def create_publication(
         doi=publication_data.doi,
         publicationType=publication_data.publicationType,
         supportingDocument=publication_data.supportingDocument,
-        approvalPath=json_serialize(approval_path),
+        approval_steps=new_approval_steps("research_activity", approval_path),
         currentApprover=approval_path[0]["approver_id"] if approval_path else None,
         status="pending"
     )
     
     db.add(db_publication)
-    db.commit()
-    db.refresh(db_publication)
     
-    # Create SDGs if provided
-    if publication_data.sdgs:
-        for sdg_data in publication_data.sdgs:
-            db_sdg = SDG(
-                raId=db_publication.raId,
-                sdgNum=sdg_data.sdgNum,
-                sdgDesc=sdg_data.sdgDesc
-            )
-            
-            db.add(db_sdg)
-            db.commit()
-            db.refresh(db_sdg)
-            
-            # Create SDG subsets if provided
-            if sdg_data.subsets:
-                for subset_data in sdg_data.subsets:
-                    db_subset = SDGSubset(
-                        sdgId=db_sdg.sdgId,
-                        sdgSNum=subset_data.sdgSNum,
-                        sdgSDesc=subset_data.sdgSDesc
-                    )
-                    
-                    db.add(db_subset)
-                    db.commit()
+    # SDGs go in with the publication, in one transaction
+    if sdg_tags:
+        await db.flush()
+        await db.run_sync(replace_sdg_tags, db_publication.raId, sdg_tags)
+    await db.commit()
     
-    return db_publication
+    return await _load_publication(db, db_publication.raId)
 
 @router.put("/{publication_id}", response_model=ResearchActivitiesInDB)
 async def update_publication(
     publication_id: int,
     publication_data: ResearchActivitiesUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Update a publication.
     """
-    db_publication = db.query(ResearchActivities).filter(
+    db_publication = await db.scalar(_publication_query().where(
         ResearchActivities.raId == publication_id,
         ResearchActivities.userId == current_user.userId
-    ).first()
+    ))
     
     if db_publication is None:
         raise HTTPException(status_code=404, detail="Publication not found")
@@ -140,35 +136,24 @@ async def update_publication(
         setattr(db_publication, key, value)
     
     # Reset approval status if content is changed
-    if db_publication.status == "rejected":
-        approval_path = json.loads(db_publication.approvalPath) if db_publication.approvalPath else []
-        
-        # Reset all statuses to pending
-        for step in approval_path:
-            step["status"] = "pending"
-        
-        db_publication.approvalPath = json_serialize(approval_path)
-        db_publication.currentApprover = approval_path[0]["approver_id"] if approval_path else None
-        db_publication.status = "pending"
-    
-    db.commit()
-    db.refresh(db_publication)
+    await db.run_sync(lambda session: resubmit(db_publication))
     
-    return db_publication
+    await db.commit()
+    return await _load_publication(db, db_publication.raId)
 
 @router.delete("/{publication_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_publication(
     publication_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Delete a publication.
     """
-    db_publication = db.query(ResearchActivities).filter(
+    db_publication = await db.scalar(_publication_query().where(
         ResearchActivities.raId == publication_id,
         ResearchActivities.userId == current_user.userId
-    ).first()
+    ))
     
     if db_publication is None:
         raise HTTPException(status_code=404, detail="Publication not found")
@@ -181,17 +166,15 @@ async def delete_publication(
         )
     
     # Delete associated SDGs and subsets
-    sdgs = db.query(SDG).filter(SDG.raId == publication_id).all()
-    for sdg in sdgs:
-        # Delete subsets
-        db.query(SDGSubset).filter(SDGSubset.sdgId == sdg.sdgId).delete()
+    sdg_ids = select(SDG.sdgId).where(SDG.raId == publication_id)
+    await db.execute(delete(SDGSubset).where(SDGSubset.sdgId.in_(sdg_ids)))
         
     # Delete SDGs
-    db.query(SDG).filter(SDG.raId == publication_id).delete()
+    await db.execute(delete(SDG).where(SDG.raId == publication_id))
     
     # Delete publication
-    db.delete(db_publication)
-    db.commit()
+    await db.delete(db_publication)
+    await db.commit()
     
     return None
 
@@ -199,45 +182,43 @@ async def delete_publication(
 async def upload_supporting_document(
     publication_id: int,
     file: UploadFile = File(...),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Upload a supporting document for a publication.
     """
-    db_publication = db.query(ResearchActivities).filter(
+    db_publication = await db.scalar(_publication_query().where(
         ResearchActivities.raId == publication_id,
         ResearchActivities.userId == current_user.userId
-    ).first()
+    ))
     
     if db_publication is None:
         raise HTTPException(status_code=404, detail="Publication not found")
     
     # Save uploaded file
-    file_path = await save_upload_file(file, f"publications/{current_user.userId}")
+    file_path = await save_upload_file(file)
     
     # Update publication with file path
     db_publication.supportingDocument = file_path
-    db.commit()
-    db.refresh(db_publication)
-    
-    return db_publication
+    await db.commit()
+    return await _load_publication(db, db_publication.raId)
 
 # Admin endpoints for approval workflow
 @router.get("/pending-approval", response_model=List[ResearchActivitiesInDB])
 async def get_pending_publications(
     skip: int = 0, 
     limit: int = 100, 
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Get all publications pending approval by the current user.
     """
-    publications = db.query(ResearchActivities).filter(
+    publications = (await db.scalars(_publication_query().where(
         ResearchActivities.currentApprover == current_user.userId,
         ResearchActivities.status == "pending"
-    ).offset(skip).limit(limit).all()
+    ).offset(skip).limit(limit))).all()
     
     return publications
 
@@ -245,16 +226,16 @@ async def get_pending_publications(
 async def approve_publication(
     publication_id: int,
     approval_data: ApprovalStatusUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Approve or reject a publication.
     """
-    db_publication = db.query(ResearchActivities).filter(
+    db_publication = await db.scalar(_publication_query().where(
         ResearchActivities.raId == publication_id,
         ResearchActivities.currentApprover == current_user.userId
-    ).first()
+    ))
     
     if db_publication is None:
         raise HTTPException(
@@ -263,48 +244,7 @@ async def approve_publication(
         )
     
     # Update approval status
-    approval_path = json.loads(db_publication.approvalPath) if db_publication.approvalPath else []
-    
-    # Find current approver in path
-    current_approver_index = -1
-    for i, step in enumerate(approval_path):
-        if step["approver_id"] == current_user.userId:
-            current_approver_index = i
-            break
-    
-    if current_approver_index == -1:
-        raise HTTPException(
-            status_code=400,
-            detail="You are not in the approval path for this publication"
-        )
-    
-    # Update status for current approver
-    approval_path[current_approver_index]["status"] = approval_data.status
-    approval_path[current_approver_index]["comments"] = approval_data.comments
-    
-    # If rejected, update publication status
-    if approval_data.status == "rejected":
-        db_publication.status = "rejected"
-        db_publication.approvalPath = json_serialize(approval_path)
-    else:
-        # If approved, check if there are more approvers
-        next_approver = None
-        for i in range(current_approver_index + 1, len(approval_path)):
-            if approval_path[i]["status"] == "pending":
-                next_approver = approval_path[i]["approver_id"]
-                break
-        
-        if next_approver:
-            # Move to next approver
-            db_publication.currentApprover = next_approver
-        else:
-            # All approvers have approved
-            db_publication.status = "approved"
-            db_publication.currentApprover = None
-        
-        db_publication.approvalPath = json_serialize(approval_path)
-    
-    db.commit()
-    db.refresh(db_publication)
+    await db.run_sync(lambda session: apply_decision(db_publication, current_user.userId, approval_data.status, approval_data.comments))
     
-    return db_publication
+    await db.commit()
+    return await _load_publication(db, db_publication.raId)
@@ -1,33 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 from typing import List, Dict, Any
 from ..dependencies import get_db, get_current_user
 from ..models import User, SDG, SDGSubset
 from ..schemas import SDGCreate, SDGInDB, SDGSubsetCreate, SDGSubsetInDB
+from ..services.sdg_tags import SDG_REFERENCE, validate_sdg_tags, replace_sdg_tags
 
 router = APIRouter()
 
-# Predefined SDGs for reference
-SDG_REFERENCE = [
-    {"sdgNum": 1, "sdgDesc": "No Poverty"},
-    {"sdgNum": 2, "sdgDesc": "Zero Hunger"},
-    {"sdgNum": 3, "sdgDesc": "Good Health and Well-being"},
-    {"sdgNum": 4, "sdgDesc": "Quality Education"},
-    {"sdgNum": 5, "sdgDesc": "Gender Equality"},
-    {"sdgNum": 6, "sdgDesc": "Clean Water and Sanitation"},
-    {"sdgNum": 7, "sdgDesc": "Affordable and Clean Energy"},
-    {"sdgNum": 8, "sdgDesc": "Decent Work and Economic Growth"},
-    {"sdgNum": 9, "sdgDesc": "Industry, Innovation and Infrastructure"},
-    {"sdgNum": 10, "sdgDesc": "Reduced Inequality"},
-    {"sdgNum": 11, "sdgDesc": "Sustainable Cities and Communities"},
-    {"sdgNum": 12, "sdgDesc": "Responsible Consumption and Production"},
-    {"sdgNum": 13, "sdgDesc": "Climate Action"},
-    {"sdgNum": 14, "sdgDesc": "Life Below Water"},
-    {"sdgNum": 15, "sdgDesc": "Life on Land"},
-    {"sdgNum": 16, "sdgDesc": "Peace, Justice and Strong Institutions"},
-    {"sdgNum": 17, "sdgDesc": "Partnerships for the Goals"}
-]
-
 @router.get("/reference", response_model=List[Dict[str, Any]])
 async def get_sdg_reference():
     """
@@ -70,32 +50,55 @@ async def add_sdg_to_research(
             detail="Research activity not found or you don't have permission"
         )
     
-    # Create SDG
+    sdg_desc, subsets = validate_sdg_tags([sdg_data])[sdg_data.sdgNum]
+    
+    # Create the SDG and its subsets in one transaction
     db_sdg = SDG(
         raId=research_id,
         sdgNum=sdg_data.sdgNum,
-        sdgDesc=sdg_data.sdgDesc
+        sdgDesc=sdg_desc
     )
+    db_sdg.subsets = [
+        SDGSubset(sdgSNum=subset_num, sdgSDesc=subset_desc)
+        for subset_num, subset_desc in subsets.items()
+    ]
     
     db.add(db_sdg)
     db.commit()
     db.refresh(db_sdg)
     
-    # Create SDG subsets if provided
-    if sdg_data.subsets:
-        for subset_data in sdg_data.subsets:
-            db_subset = SDGSubset(
-                sdgId=db_sdg.sdgId,
-                sdgSNum=subset_data.sdgSNum,
-                sdgSDesc=subset_data.sdgSDesc
-            )
-            
-            db.add(db_subset)
-            db.commit()
-            db.refresh(db_subset)
-    
     return db_sdg
 
+@router.put("/research/{research_id}", response_model=List[SDGInDB])
+async def replace_sdgs_for_research(
+    research_id: int,
+    sdgs: List[SDGCreate],
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Replace the full set of SDGs and subsets on a research activity.
+    """
+    # Check if research activity exists and belongs to user
+    from ..models import ResearchActivities
+    research = db.query(ResearchActivities).filter(
+        ResearchActivities.raId == research_id,
+        ResearchActivities.userId == current_user.userId
+    ).first()
+    
+    if research is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Research activity not found or you don't have permission"
+        )
+    
+    replace_sdg_tags(db, research_id, validate_sdg_tags(sdgs))
+    db.commit()
+    
+    return db.query(SDG).options(selectinload(SDG.subsets)).filter(
+        SDG.raId == research_id
+    ).order_by(SDG.sdgNum).all()
+
 @router.delete("/research/{research_id}/sdg/{sdg_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_sdg_from_research(
     research_id: int,
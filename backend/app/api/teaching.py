@@ -1,43 +1,106 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Query
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
-from ..dependencies import get_db, get_current_user, get_current_admin
+from ..dependencies import get_async_db, get_current_user, get_current_admin
 from ..models import User, CourseAndSET
-from ..schemas import CourseAndSETCreate, CourseAndSETUpdate, CourseAndSETInDB, ApprovalStatusUpdate
-from ..utils import save_upload_file, generate_approval_path, json_serialize, update_approval_status, get_overall_approval_status
-import json
+from ..config import settings
+from ..schemas import CourseAndSETCreate, CourseAndSETUpdate, CourseAndSETInDB, ApprovalStatusUpdate, TeachingImportResult, TeachingScoresResponse
+from ..services.approvals import new_approval_steps, apply_decision, resubmit
+from ..services.teaching_import import import_courses
+from ..services.teaching_scores import GROUPINGS, aggregate_scores, derive_teaching_points, score_query
+from ..utils import save_upload_file, generate_approval_path
 
 router = APIRouter()
 
+async def _section_recorded(db: AsyncSession, user_id: int, values, exclude_id: Optional[int] = None) -> bool:
+    """
+    Whether the user already has a record for this academic year, term, course and section.
+    """
+    query = select(CourseAndSET.caSId).where(
+        CourseAndSET.userId == user_id,
+        CourseAndSET.academicYear == values.academicYear,
+        CourseAndSET.term == values.term,
+        CourseAndSET.courseNum == values.courseNum,
+        CourseAndSET.section == values.section
+    )
+    if exclude_id is not None:
+        query = query.where(CourseAndSET.caSId != exclude_id)
+    return await db.scalar(query) is not None
+
+async def _commit_section(db: AsyncSession) -> None:
+    """
+    Commit a created or edited course; 400 if a concurrent request recorded the same section first.
+    """
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="This course section is already recorded"
+        )
+
 @router.get("/", response_model=List[CourseAndSETInDB])
 async def get_courses(
     skip: int = 0, 
     limit: int = 100, 
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Get all courses for the current user.
     """
-    courses = db.query(CourseAndSET).filter(
+    courses = (await db.scalars(select(CourseAndSET).where(
         CourseAndSET.userId == current_user.userId
-    ).offset(skip).limit(limit).all()
+    ).offset(skip).limit(limit))).all()
     
     return courses
 
+@router.get("/scores", response_model=TeachingScoresResponse)
+async def get_teaching_scores(
+    group_by: str = Query("user", description="user, department, college or term"),
+    academic_year: Optional[str] = Query(None, alias="academicYear"),
+    term: Optional[str] = None,
+    department: Optional[str] = None,
+    college: Optional[str] = None,
+    record_status: Optional[str] = Query("approved", alias="status"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Teaching points and respondent-weighted SET averages, grouped by faculty member,
+    department, college or term.
+
+    Department heads see their department, deans their college, admins
+    everything and other users their own courses.
+    """
+    if group_by not in GROUPINGS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"group_by must be one of: {', '.join(GROUPINGS)}"
+        )
+
+    rows = (await db.execute(score_query(
+        current_user, group_by, academic_year, term, department, college, record_status
+    ))).all()
+    return {"groupBy": group_by, **aggregate_scores(rows)}
+
 @router.get("/{course_id}", response_model=CourseAndSETInDB)
 async def get_course(
     course_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Get a specific course by ID.
     """
-    course = db.query(CourseAndSET).filter(
+    course = await db.scalar(select(CourseAndSET).where(
         CourseAndSET.caSId == course_id,
         CourseAndSET.userId == current_user.userId
-    ).first()
+    ))
     
     if course is None:
         raise HTTPException(status_code=404, detail="Course not found")
@@ -47,17 +110,21 @@ async def get_course(
 @router.post("/", response_model=CourseAndSETInDB)
 async def create_course(
     course_data: CourseAndSETCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Create a new course.
     """
+    if await _section_recorded(db, current_user.userId, course_data):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="This course section is already recorded"
+        )
+
     # Generate approval path
-    approval_path = generate_approval_path(
-        current_user.department, 
-        current_user.college,
-        db
+    approval_path = await db.run_sync(
+        lambda session: generate_approval_path(current_user.department, current_user.college, session)
     )
     
     # Create course
@@ -75,33 +142,51 @@ async def create_course(
         partOneStudent=course_data.partOneStudent,
         partTwoCourse=course_data.partTwoCourse,
         partThreeTeaching=course_data.partThreeTeaching,
-        teachingPoints=course_data.teachingPoints,
+        teachingPoints=derive_teaching_points(course_data),
         supportingDocuments=course_data.supportingDocuments,
-        approvalPath=json_serialize(approval_path),
+        approval_steps=new_approval_steps("course", approval_path),
         currentApprover=approval_path[0]["approver_id"] if approval_path else None,
         status="pending"
     )
     
     db.add(db_course)
-    db.commit()
-    db.refresh(db_course)
+    await _commit_section(db)
+    await db.refresh(db_course)
     
     return db_course
 
+@router.post("/import", response_model=TeachingImportResult)
+async def import_course_file(
+    file: UploadFile = File(...),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Import courses from a CSV or XLSX file, one row per course section.
+
+    Rows matching an existing record (same academic year, term, course and
+    section) update it instead of adding a duplicate. Admins may include a
+    userEmail column to import records for other faculty.
+    """
+    if file.size is not None and file.size > settings.MAX_UPLOAD_SIZE:
+        raise HTTPException(status_code=413, detail="File too large")
+
+    await file.seek(0)
+    return await run_in_threadpool(import_courses, file.file, file.filename, current_user.userId)
+
 @router.put("/{course_id}", response_model=CourseAndSETInDB)
 async def update_course(
     course_id: int,
     course_data: CourseAndSETUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Update a course.
     """
-    db_course = db.query(CourseAndSET).filter(
+    db_course = await db.scalar(select(CourseAndSET).where(
         CourseAndSET.caSId == course_id,
         CourseAndSET.userId == current_user.userId
-    ).first()
+    ))
     
     if db_course is None:
         raise HTTPException(status_code=404, detail="Course not found")
@@ -116,37 +201,35 @@ async def update_course(
     # Update course fields
     for key, value in course_data.dict(exclude_unset=True).items():
         setattr(db_course, key, value)
+    db_course.teachingPoints = derive_teaching_points(db_course)
+
+    if await _section_recorded(db, current_user.userId, db_course, exclude_id=course_id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="This course section is already recorded"
+        )
     
     # Reset approval status if content is changed
-    if db_course.status == "rejected":
-        approval_path = json.loads(db_course.approvalPath) if db_course.approvalPath else []
-        
-        # Reset all statuses to pending
-        for step in approval_path:
-            step["status"] = "pending"
-        
-        db_course.approvalPath = json_serialize(approval_path)
-        db_course.currentApprover = approval_path[0]["approver_id"] if approval_path else None
-        db_course.status = "pending"
+    await db.run_sync(lambda session: resubmit(db_course))
     
-    db.commit()
-    db.refresh(db_course)
+    await _commit_section(db)
+    await db.refresh(db_course)
     
     return db_course
 
 @router.delete("/{course_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_course(
     course_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Delete a course.
     """
-    db_course = db.query(CourseAndSET).filter(
+    db_course = await db.scalar(select(CourseAndSET).where(
         CourseAndSET.caSId == course_id,
         CourseAndSET.userId == current_user.userId
-    ).first()
+    ))
     
     if db_course is None:
         raise HTTPException(status_code=404, detail="Course not found")
@@ -159,8 +242,8 @@ async def delete_course(
         )
     
     # Delete course
-    db.delete(db_course)
-    db.commit()
+    await db.delete(db_course)
+    await db.commit()
     
     return None
 
@@ -168,27 +251,27 @@ async def delete_course(
 async def upload_supporting_document(
     course_id: int,
     file: UploadFile = File(...),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Upload a supporting document for a course.
     """
-    db_course = db.query(CourseAndSET).filter(
+    db_course = await db.scalar(select(CourseAndSET).where(
         CourseAndSET.caSId == course_id,
         CourseAndSET.userId == current_user.userId
-    ).first()
+    ))
     
     if db_course is None:
         raise HTTPException(status_code=404, detail="Course not found")
     
     # Save uploaded file
-    file_path = await save_upload_file(file, f"courses/{current_user.userId}")
+    file_path = await save_upload_file(file)
     
     # Update course with file path
     db_course.supportingDocuments = file_path
-    db.commit()
-    db.refresh(db_course)
+    await db.commit()
+    await db.refresh(db_course)
     
     return db_course
 
@@ -197,16 +280,16 @@ async def upload_supporting_document(
 async def get_pending_courses(
     skip: int = 0, 
     limit: int = 100, 
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Get all courses pending approval by the current user.
     """
-    courses = db.query(CourseAndSET).filter(
+    courses = (await db.scalars(select(CourseAndSET).where(
         CourseAndSET.currentApprover == current_user.userId,
         CourseAndSET.status == "pending"
-    ).offset(skip).limit(limit).all()
+    ).offset(skip).limit(limit))).all()
     
     return courses
 
@@ -214,16 +297,16 @@ async def get_pending_courses(
 async def approve_course(
     course_id: int,
     approval_data: ApprovalStatusUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Approve or reject a course.
     """
-    db_course = db.query(CourseAndSET).filter(
+    db_course = await db.scalar(select(CourseAndSET).where(
         CourseAndSET.caSId == course_id,
         CourseAndSET.currentApprover == current_user.userId
-    ).first()
+    ))
     
     if db_course is None:
         raise HTTPException(
@@ -232,48 +315,9 @@ async def approve_course(
         )
     
     # Update approval status
-    approval_path = json.loads(db_course.approvalPath) if db_course.approvalPath else []
-    
-    # Find current approver in path
-    current_approver_index = -1
-    for i, step in enumerate(approval_path):
-        if step["approver_id"] == current_user.userId:
-            current_approver_index = i
-            break
-    
-    if current_approver_index == -1:
-        raise HTTPException(
-            status_code=400,
-            detail="You are not in the approval path for this course"
-        )
-    
-    # Update status for current approver
-    approval_path[current_approver_index]["status"] = approval_data.status
-    approval_path[current_approver_index]["comments"] = approval_data.comments
-    
-    # If rejected, update course status
-    if approval_data.status == "rejected":
-        db_course.status = "rejected"
-        db_course.approvalPath = json_serialize(approval_path)
-    else:
-        # If approved, check if there are more approvers
-        next_approver = None
-        for i in range(current_approver_index + 1, len(approval_path)):
-            if approval_path[i]["status"] == "pending":
-                next_approver = approval_path[i]["approver_id"]
-                break
-        
-        if next_approver:
-            # Move to next approver
-            db_course.currentApprover = next_approver
-        else:
-            # All approvers have approved
-            db_course.status = "approved"
-            db_course.currentApprover = None
-        
-        db_course.approvalPath = json_serialize(approval_path)
+    await db.run_sync(lambda session: apply_decision(db_course, current_user.userId, approval_data.status, approval_data.comments))
     
-    db.commit()
-    db.refresh(db_course)
+    await db.commit()
+    await db.refresh(db_course)
     
     return db_course
@@ -1,11 +1,17 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import List
+from datetime import datetime
+import logging
 from ..dependencies import get_db, get_current_admin, get_current_user
 from ..models import User
-from ..schemas import UserCreate, UserUpdate, UserResponse
-from ..services.dolibarr_client import dolibarr_client
-from ..auth import get_password_hash
+from ..schemas import UserCreate, UserUpdate, UserResponse, SyncJobResponse
+from ..services.dolibarr_client import dolibarr_client, dolibarr_user_data, third_party_payload_hash
+from ..services.dolibarr_sync import start_sync_all_job, get_sync_job
+from ..services.dolibarr_outbox import enqueue_user_sync, outbox_worker
+from ..auth import get_password_hash_async
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
@@ -43,7 +49,7 @@ async def create_user(
     current_user: User = Depends(get_current_admin)
 ):
     """
-    Create a new user and sync with Dolibarr (admin only).
+    Create a new user and queue a sync with Dolibarr (admin only).
     """
     # Check if user already exists
     db_user = db.query(User).filter(User.userEmail == user_data.userEmail).first()
@@ -54,7 +60,7 @@ async def create_user(
         )
     
     # Create user in database
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await get_password_hash_async(user_data.password)
     db_user = User(
         userName=user_data.userName,
         userEmail=user_data.userEmail,
@@ -70,45 +76,14 @@ async def create_user(
     )
     
     db.add(db_user)
+    db.flush()
+    
+    # Queue the Dolibarr sync in the same transaction as the insert
+    enqueue_user_sync(db, db_user.userId, "upsert")
+    
     db.commit()
     db.refresh(db_user)
-    
-    # Sync with Dolibarr
-    try:
-        # Map user data for Dolibarr
-        user_data = {
-            "userName": db_user.userName,
-            "userEmail": db_user.userEmail,
-            "department": db_user.department,
-            "college": db_user.college,
-            "rank": db_user.rank
-        }
-        
-        # Try to find existing third party by email first
-        existing_third_party = await dolibarr_client.get_third_party_by_email(db_user.userEmail)
-        
-        if existing_third_party and "id" in existing_third_party:
-            # Update existing third party
-            third_party = await dolibarr_client.update_third_party(
-                existing_third_party["id"],
-                user_data
-            )
-            db_user.dolibarr_third_party_id = existing_third_party["id"]
-        else:
-            # Create new third party
-            third_party = await dolibarr_client.create_third_party(user_data)
-            
-            # Update user with Dolibarr third party ID
-            if third_party and "id" in third_party:
-                db_user.dolibarr_third_party_id = third_party["id"]
-        
-        db.commit()
-        db.refresh(db_user)
-    except Exception as e:
-        # Log error but don't fail the request
-        print(f"Error syncing with Dolibarr: {str(e)}")
-        import traceback
-        traceback.print_exc()
+    outbox_worker.notify()
     
     return db_user
 
@@ -120,7 +95,7 @@ async def update_user(
     current_user: User = Depends(get_current_admin)
 ):
     """
-    Update a user and sync with Dolibarr (admin only).
+    Update a user and queue a sync with Dolibarr (admin only).
     """
     db_user = db.query(User).filter(User.userId == user_id).first()
     if db_user is None:
@@ -130,52 +105,12 @@ async def update_user(
     for key, value in user_data.dict(exclude_unset=True).items():
         setattr(db_user, key, value)
     
+    # Queue the Dolibarr sync in the same transaction as the update
+    enqueue_user_sync(db, db_user.userId, "upsert")
+    
     db.commit()
     db.refresh(db_user)
-    
-    # Sync with Dolibarr if third party ID exists
-    try:
-        # Map user data for Dolibarr
-        user_data = {
-            "userName": db_user.userName,
-            "userEmail": db_user.userEmail,
-            "department": db_user.department,
-            "college": db_user.college,
-            "rank": db_user.rank
-        }
-        
-        if db_user.dolibarr_third_party_id:
-            # Update existing third party
-            await dolibarr_client.update_third_party(
-                db_user.dolibarr_third_party_id,
-                user_data
-            )
-        else:
-            # Try to find existing third party by email
-            existing_third_party = await dolibarr_client.get_third_party_by_email(db_user.userEmail)
-            
-            if existing_third_party and "id" in existing_third_party:
-                # Update existing third party
-                third_party = await dolibarr_client.update_third_party(
-                    existing_third_party["id"],
-                    user_data
-                )
-                db_user.dolibarr_third_party_id = existing_third_party["id"]
-            else:
-                # Create new third party
-                third_party = await dolibarr_client.create_third_party(user_data)
-                
-                # Update user with Dolibarr third party ID
-                if third_party and "id" in third_party:
-                    db_user.dolibarr_third_party_id = third_party["id"]
-            
-            db.commit()
-            db.refresh(db_user)
-    except Exception as e:
-        # Log error but don't fail the request
-        print(f"Error syncing with Dolibarr: {str(e)}")
-        import traceback
-        traceback.print_exc()
+    outbox_worker.notify()
     
     return db_user
 
@@ -186,26 +121,18 @@ async def delete_user(
     current_user: User = Depends(get_current_admin)
 ):
     """
-    Delete a user (admin only).
+    Delete a user and queue its removal from Dolibarr (admin only).
     """
     db_user = db.query(User).filter(User.userId == user_id).first()
     if db_user is None:
         raise HTTPException(status_code=404, detail="User not found")
     
-    # Delete from Dolibarr if third party ID exists
-    if db_user.dolibarr_third_party_id:
-        try:
-            success = await dolibarr_client.delete_third_party(db_user.dolibarr_third_party_id)
-            if success:
-                print(f"Successfully deleted third party {db_user.dolibarr_third_party_id} from Dolibarr")
-        except Exception as e:
-            # Log error but don't fail the request
-            print(f"Error deleting from Dolibarr: {str(e)}")
-            import traceback
-            traceback.print_exc()
+    # Queue the Dolibarr delete in the same transaction as the user delete
+    enqueue_user_sync(db, db_user.userId, "delete", db_user.dolibarr_third_party_id, db_user.userEmail)
     
     db.delete(db_user)
     db.commit()
+    outbox_worker.notify()
     
     return None
 
@@ -223,36 +150,27 @@ async def sync_user_with_dolibarr(
         raise HTTPException(status_code=404, detail="User not found")
     
     try:
+        user_data = dolibarr_user_data(db_user)
+        
         # If user already has dolibarr_third_party_id, update existing third party
         if db_user.dolibarr_third_party_id:
-            await dolibarr_client.update_third_party(
-                db_user.dolibarr_third_party_id,
-                {
-                    "userName": db_user.userName,
-                    "userEmail": db_user.userEmail,
-                    "department": db_user.department,
-                    "college": db_user.college,
-                    "rank": db_user.rank
-                }
-            )
+            await dolibarr_client.update_third_party(db_user.dolibarr_third_party_id, user_data)
         # Otherwise create new third party
         else:
-            third_party = await dolibarr_client.create_third_party({
-                "userName": db_user.userName,
-                "userEmail": db_user.userEmail,
-                "department": db_user.department,
-                "college": db_user.college,
-                "rank": db_user.rank
-            })
+            third_party = await dolibarr_client.create_third_party(user_data)
             
             # Update user with Dolibarr third party ID
             if third_party and "id" in third_party:
                 db_user.dolibarr_third_party_id = third_party["id"]
-                db.commit()
-                db.refresh(db_user)
+        
+        # Remember what was pushed so delta syncs skip this user until it changes
+        db_user.dolibarr_synced_hash = third_party_payload_hash(user_data)
+        db_user.dolibarr_synced_at = datetime.utcnow()
+        db.commit()
+        db.refresh(db_user)
     except Exception as e:
         # Log error and raise exception
-        print(f"Error syncing with Dolibarr: {str(e)}")
+        logger.error("Error syncing with Dolibarr: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error syncing with Dolibarr: {str(e)}"
@@ -260,87 +178,29 @@ async def sync_user_with_dolibarr(
     
     return db_user
 
-@router.post("/sync-all", response_model=List[UserResponse])
+@router.post("/sync-all", response_model=SyncJobResponse, status_code=status.HTTP_202_ACCEPTED)
 async def sync_all_users_with_dolibarr(
+    full: bool = False,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Start a background sync of changed users with Dolibarr (admin only).
+    Pass full=true to push every user. Returns a job that can be polled at
+    /users/sync-jobs/{job_id}.
+    """
+    job = start_sync_all_job(full=full)
+    return job.to_dict()
+
+@router.get("/sync-jobs/{job_id}", response_model=SyncJobResponse)
+async def get_sync_job_status(
+    job_id: str,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
-    Manually sync all users with Dolibarr (admin only).
+    Get the progress of a bulk Dolibarr sync job, whichever worker runs it.
     """
-    users = db.query(User).all()
-    synced_users = []
-    errors = []
-    
-    # Process in smaller batches to avoid timeouts
-    batch_size = 5
-    total_users = len(users)
-    
-    print(f"Starting sync of {total_users} users with Dolibarr")
-    
-    # Process users in batches
-    for i in range(0, total_users, batch_size):
-        batch = users[i:i+batch_size]
-        print(f"Processing batch {i//batch_size + 1} ({len(batch)} users)")
-        
-        # Process each user in the batch concurrently
-        batch_tasks = []
-        for user in batch:
-            # Create task for each user
-            if user.dolibarr_third_party_id:
-                # Update existing third party
-                task = dolibarr_client.update_third_party(
-                    user.dolibarr_third_party_id,
-                    {
-                        "userName": user.userName,
-                        "userEmail": user.userEmail,
-                        "department": user.department,
-                        "college": user.college,
-                        "rank": user.rank
-                    }
-                )
-            else:
-                # Create new third party
-                task = dolibarr_client.create_third_party({
-                    "userName": user.userName,
-                    "userEmail": user.userEmail,
-                    "department": user.department,
-                    "college": user.college,
-                    "rank": user.rank
-                })
-            
-            batch_tasks.append((user, task))
-        
-        # Execute all tasks for this batch
-        for user, task in batch_tasks:
-            try:
-                result = await task
-                
-                # Update user with Dolibarr third party ID if it's a new record
-                if not user.dolibarr_third_party_id and result and "id" in result:
-                    user.dolibarr_third_party_id = result["id"]
-                    db.commit()
-                    db.refresh(user)
-                    
-                synced_users.append(user)
-            except Exception as e:
-                error_msg = f"Error syncing user {user.userName}: {str(e)}"
-                print(error_msg)
-                errors.append({"user": user.userName, "error": str(e)})
-        
-        # Wait a moment between batches to avoid overwhelming the API
-        await asyncio.sleep(1)
-    
-    # If all users failed to sync, raise exception
-    if len(errors) == len(users):
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to sync any users with Dolibarr: {errors}"
-        )
-    
-    # If some users failed to sync, commit successful ones
-    if errors:
-        db.commit()
-        print(f"Some users failed to sync: {errors}")
-    
-    return synced_users
+    job = get_sync_job(db, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Sync job not found")
+    return job
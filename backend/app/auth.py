@@ -1,5 +1,8 @@
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 from fastapi import Depends, APIRouter, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from jose import JWTError, jwt
@@ -10,36 +13,74 @@ from .models import User
 from .schemas import Token, UserCreate, UserResponse
 from .config import settings
 
+logger = logging.getLogger(__name__)
+
 # Get values from settings
 SECRET_KEY = settings.SECRET_KEY
 ALGORITHM = settings.ALGORITHM
 ACCESS_TOKEN_EXPIRE_MINUTES = settings.ACCESS_TOKEN_EXPIRE_MINUTES
 
 router = APIRouter()
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Pinning min and max rounds makes any hash with different rounds need an update
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.BCRYPT_ROUNDS
+)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/token")
 
+# bcrypt releases the GIL, so a thread pool hashes on every core without blocking the event loop
+_password_executor = ThreadPoolExecutor(
+    max_workers=max(1, settings.PASSWORD_HASH_WORKERS),
+    thread_name_prefix="bcrypt"
+)
+
 def verify_password(plain_password, hashed_password):
     return pwd_context.verify(plain_password, hashed_password)
 
 def get_password_hash(password):
     return pwd_context.hash(password)
 
-def authenticate_user(db: Session, email: str, password: str):
-    print(f"\n=== LOGIN ATTEMPT ===\nEmail: {email}")
+async def get_password_hash_async(password: str) -> str:
+    """
+    Hash a password on the bcrypt worker pool.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_password_executor, pwd_context.hash, password)
+
+async def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password on the bcrypt worker pool.
+
+    Returns (valid, new_hash); new_hash is set when the stored hash uses
+    different bcrypt rounds than BCRYPT_ROUNDS and should be replaced.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _password_executor, pwd_context.verify_and_update, plain_password, hashed_password
+    )
+
+async def authenticate_user(db: Session, email: str, password: str):
+    logger.debug("Login attempt: %s", email)
     
     user = db.query(User).filter(User.userEmail == email).first()
     if not user:
-        print(f"User not found with email: {email}")
+        logger.info("Login failed, no user with email: %s", email)
         return False
     
-    print(f"Found user: {user.userName}, Role: {user.role}")
-    
-    if not verify_password(password, user.password):
-        print("Password verification failed")
+    valid, new_hash = await verify_and_update_password(password, user.password)
+    if not valid:
+        logger.info("Login failed, wrong password for: %s", email)
         return False
     
-    print(f"Authentication successful for: {user.userName}, Role: {user.role}")
+    if new_hash:
+        # Bcrypt rounds changed since this hash was made; store the rehashed password
+        user.password = new_hash
+        db.commit()
+    
+    logger.debug("Authentication successful for: %s, role: %s", user.userName, user.role)
     return user
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
@@ -51,43 +92,32 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     
     to_encode.update({"exp": expire})
     
-    print(f"Token payload before encoding: {to_encode}")
-    print(f"Using SECRET_KEY: {SECRET_KEY[:5]}... (length: {len(SECRET_KEY)})")
-    print(f"Using ALGORITHM: {ALGORITHM}")
-    
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     
-    # Debug the token
-    print(f"Generated token: {encoded_jwt[:20]}... (length: {len(encoded_jwt)})")
-    
-    # Verify the token can be decoded immediately
-    try:
-        decoded = jwt.decode(encoded_jwt, SECRET_KEY, algorithms=[ALGORITHM])
-        print(f"Token verified successfully: {decoded}")
-    except Exception as e:
-        print(f"WARNING: Token verification failed immediately after creation: {str(e)}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Generated %s token for payload: %s", ALGORITHM, to_encode)
+        # Verify the token can be decoded immediately
+        try:
+            jwt.decode(encoded_jwt, SECRET_KEY, algorithms=[ALGORITHM])
+        except Exception as e:
+            logger.warning("Token verification failed immediately after creation: %s", e)
     
     return encoded_jwt
 
 @router.post("/token", response_model=Token)
 async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    print(f"\n=== LOGIN REQUEST ===\nUsername: {form_data.username}")
-    
-    user = authenticate_user(db, form_data.username, form_data.password)
+    user = await authenticate_user(db, form_data.username, form_data.password)
     if not user:
-        print("Authentication failed - returning 401")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    print(f"Creating token for user: {user.userName}, Role: {user.role}")
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     
     # Create token payload
     token_data = {"sub": user.userEmail, "role": user.role}
-    print(f"Token payload: {token_data}")
     
     # Generate token
     access_token = create_access_token(
@@ -95,7 +125,6 @@ async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(
         expires_delta=access_token_expires
     )
     
-    print(f"Generated token: {access_token[:20]}...")
     return {"access_token": access_token, "token_type": "bearer"}
 
 @router.post("/register", response_model=UserResponse)
@@ -109,7 +138,7 @@ async def register_user(user_data: UserCreate, db: Session = Depends(get_db)):
         )
     
     # Create new user
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await get_password_hash_async(user_data.password)
     db_user = User(
         userName=user_data.userName,
         userEmail=user_data.userEmail,
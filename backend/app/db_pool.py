@@ -0,0 +1,150 @@
+"""
+Engine options and pool metrics for the sync and async SQLAlchemy engines.
+
+Pool size, overflow, timeout, recycle, pre-ping and the statement timeout
+come from Settings (DB_* variables). Each engine gets an instrumented pool
+class that records how long checkouts wait, so pool pressure shows up in
+/health/db-pool instead of as unexplained latency.
+
+With DB_PGBOUNCER=true the engines assume a PgBouncer in transaction
+pooling mode: the app keeps no pool of its own (NullPool), asyncpg does
+not cache or reuse named prepared statements, and no startup parameters
+are sent. Set statement_timeout on the database role in that case, e.g.
+ALTER ROLE fris SET statement_timeout = '30s'.
+"""
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Dict
+from uuid import uuid4
+from sqlalchemy import exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class PoolMetrics:
+    """
+    Checkout counts and wait times for one engine's pool.
+
+    Percentiles are taken over the most recent `window` checkouts.
+    """
+
+    def __init__(self, name: str, window: int = 1000):
+        self.name = name
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self._recent = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.pool = None
+
+    def record_wait(self, seconds: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+            self._recent.append(seconds)
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            recent = sorted(self._recent)
+            stats = {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_ms_avg": round(self.wait_total / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                "wait_ms_max": round(self.wait_max * 1000, 3),
+                "wait_ms_p50": round(recent[len(recent) // 2] * 1000, 3) if recent else 0.0,
+                "wait_ms_p99": round(recent[min(len(recent) - 1, int(len(recent) * 0.99))] * 1000, 3) if recent else 0.0
+            }
+
+        pool = self.pool
+        stats["pool"] = type(pool).__name__ if pool is not None else None
+        if isinstance(pool, QueuePool):
+            capacity = pool.size() + max(pool._max_overflow, 0)
+            stats.update({
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "overflow": pool.overflow(),
+                "capacity": capacity,
+                "utilization": round(pool.checkedout() / capacity, 3) if capacity else 0.0
+            })
+        return stats
+
+
+class _InstrumentedPool:
+    """
+    Pool mixin timing each checkout; `metrics` is set on the generated subclass.
+    """
+    metrics: PoolMetrics
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # recreate() builds a new pool after invalidation; report on the live one
+        self.metrics.pool = self
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.record_timeout()
+            raise
+        self.metrics.record_wait(time.perf_counter() - start)
+        return connection
+
+
+def _instrumented(pool_class, metrics: PoolMetrics):
+    return type(f"Instrumented{pool_class.__name__}", (_InstrumentedPool, pool_class), {"metrics": metrics})
+
+
+def engine_options(url: str, metrics: PoolMetrics, is_async: bool = False) -> Dict[str, Any]:
+    """
+    Keyword arguments for create_engine / create_async_engine from Settings.
+    """
+    url = make_url(url)
+    backend = url.get_backend_name()
+    options: Dict[str, Any] = {"pool_pre_ping": settings.DB_POOL_PRE_PING}
+    connect_args: Dict[str, Any] = {}
+
+    if backend == "sqlite" and url.database in (None, "", ":memory:"):
+        # In-memory databases live in a single connection; keep SQLAlchemy's default pool
+        return options
+
+    if settings.DB_PGBOUNCER:
+        options["poolclass"] = _instrumented(NullPool, metrics)
+        if is_async and backend == "postgresql":
+            # Transaction pooling hands each transaction to any server connection,
+            # so named prepared statements from an earlier one may not exist there
+            connect_args.update({
+                "statement_cache_size": 0,
+                "prepared_statement_cache_size": 0,
+                "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__"
+            })
+        if settings.DB_STATEMENT_TIMEOUT_MS and not is_async:
+            logger.warning("DB_STATEMENT_TIMEOUT_MS is ignored with DB_PGBOUNCER; set statement_timeout on the database role")
+    else:
+        options.update({
+            "poolclass": _instrumented(AsyncAdaptedQueuePool if is_async else QueuePool, metrics),
+            "pool_size": settings.DB_POOL_SIZE,
+            "max_overflow": settings.DB_MAX_OVERFLOW,
+            "pool_timeout": settings.DB_POOL_TIMEOUT,
+            "pool_recycle": settings.DB_POOL_RECYCLE
+        })
+        if settings.DB_STATEMENT_TIMEOUT_MS and backend == "postgresql":
+            if is_async:
+                connect_args["server_settings"] = {"statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)}
+            else:
+                connect_args["options"] = f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"
+
+    if connect_args:
+        options["connect_args"] = connect_args
+    return options
@@ -1,18 +1,15 @@
 from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from .api import auth, users, profile, publications, teaching, extension, authorship, approval, sdg, dolibarr_test, summary
-from .dependencies import get_db
+from .dependencies import get_db, engine_metrics, async_engine_metrics
 from .config import settings
-import logging
+from .services.dolibarr_client import dolibarr_client
+from .services.dolibarr_sync import cancel_sync_jobs
+from .services.dolibarr_outbox import outbox_worker
+from .logging_config import configure_logging
 
 # Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler()
-    ]
-)
+configure_logging()
 
 app = FastAPI(
     title="FRIS API",
@@ -43,6 +40,19 @@ app.include_router(sdg.router, prefix="/sdg", tags=["Sustainable Development Goa
 app.include_router(dolibarr_test.router, prefix="/dolibarr-test", tags=["Dolibarr Test"])
 app.include_router(summary.router, prefix="/summary", tags=["Record Summary"])
 
+@app.on_event("startup")
+async def startup():
+    # Open the pooled Dolibarr HTTP client so requests reuse connections
+    await dolibarr_client.start()
+    if settings.DOLIBARR_OUTBOX_IN_PROCESS:
+        await outbox_worker.start()
+
+@app.on_event("shutdown")
+async def shutdown():
+    await outbox_worker.stop()
+    await cancel_sync_jobs()
+    await dolibarr_client.close()
+
 @app.get("/", tags=["Root"])
 async def root():
     return {"message": "Welcome to FRIS API. See /docs for API documentation."}
@@ -50,3 +60,8 @@ async def root():
 @app.get("/health", tags=["Health"])
 async def health_check():
     return {"status": "healthy"}
+
+@app.get("/health/db-pool", tags=["Health"])
+async def db_pool_health():
+    # Checkout wait times and utilization of the database connection pools
+    return {"sync": engine_metrics.to_dict(), "async": async_engine_metrics.to_dict()}
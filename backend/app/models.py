@@ -1,10 +1,26 @@
-from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, Text, Date, DateTime, Float
+from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, Text, Date, DateTime, Float, Index
+from sqlalchemy import DDL, MetaData, Table, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
 Base = declarative_base()
 
+
+def _approval_steps(record_type: str, record_key: str):
+    """
+    A record's approval steps in path order; they are deleted with the record.
+    Each record type writes its own key into the shared record_id column.
+    """
+    return relationship(
+        "ApprovalStep",
+        primaryjoin=f"and_(ApprovalStep.record_type == '{record_type}', foreign(ApprovalStep.record_id) == {record_key})",
+        order_by="ApprovalStep.step_no",
+        cascade="all, delete-orphan",
+        overlaps="approval_steps"
+    )
+
+
 class User(Base):
     __tablename__ = "users"
     
@@ -13,14 +29,18 @@ class User(Base):
     userEmail = Column(String, unique=True, index=True)
     password = Column(String)  # Hashed password
     rank = Column(String)
-    college = Column(String)
-    department = Column(String)
+    college = Column(String, index=True)
+    department = Column(String, index=True)
     role = Column(String)  # 'faculty', 'admin', etc.
     researchExpDetails = Column(Text)
     isDepartmentHead = Column(Boolean, default=False)
     isDean = Column(Boolean, default=False)
     googleScholarLink = Column(String)
     dolibarr_third_party_id = Column(Integer, nullable=True)  # Link to Dolibarr
+    dolibarr_payload_hash = Column(String(64), nullable=True)  # Hash of the fields mapped to Dolibarr
+    dolibarr_synced_hash = Column(String(64), nullable=True)  # Payload hash at the last successful sync
+    dolibarr_synced_at = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
     degrees = relationship("Degree", back_populates="user")
@@ -37,10 +57,11 @@ class Degree(Base):
     __tablename__ = "degrees"
     
     degreeId = Column(Integer, primary_key=True, index=True)
-    userId = Column(Integer, ForeignKey("users.userId"))
+    userId = Column(Integer, ForeignKey("users.userId"), index=True)
     school = Column(String)
     year = Column(Integer)
     degreeType = Column(String)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
     user = relationship("User", back_populates="degrees")
@@ -50,8 +71,9 @@ class ResearchInterest(Base):
     __tablename__ = "research_interests"
     
     rllId = Column(Integer, primary_key=True, index=True)
-    userId = Column(Integer, ForeignKey("users.userId"))
+    userId = Column(Integer, ForeignKey("users.userId"), index=True)
     resInt = Column(Text)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
     user = relationship("User", back_populates="research_interests")
@@ -61,8 +83,9 @@ class Affiliations(Base):
     __tablename__ = "affiliations"
     
     affId = Column(Integer, primary_key=True, index=True)
-    userId = Column(Integer, ForeignKey("users.userId"))
+    userId = Column(Integer, ForeignKey("users.userId"), index=True)
     affInt = Column(Text)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
     user = relationship("User", back_populates="affiliations")
@@ -72,10 +95,11 @@ class ResearchExperience(Base):
     __tablename__ = "research_experiences"
     
     rElId = Column(Integer, primary_key=True, index=True)
-    userId = Column(Integer, ForeignKey("users.userId"))
+    userId = Column(Integer, ForeignKey("users.userId"), index=True)
     resExpLoc = Column(String)
     startDate = Column(Date)
     endDate = Column(Date, nullable=True)  # Nullable for ongoing experiences
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
     user = relationship("User", back_populates="research_experiences")
@@ -99,14 +123,20 @@ class ResearchActivities(Base):
     supportingDocument = Column(String, nullable=True)  # Path to document
     status = Column(String, default="pending")
     currentApprover = Column(Integer, nullable=True)  # User ID of current approver
-    approvalPath = Column(String, nullable=True)  # JSON string of approval path
-    approverStatus = Column(String, nullable=True)  # JSON string of approver statuses
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
     user = relationship("User", back_populates="research_activities")
     sdgs = relationship("SDG", back_populates="research_activity")
+    approval_steps = _approval_steps("research_activity", "ResearchActivities.raId")
+    
+    __table_args__ = (
+        # Approver inbox: pending items for one approver, oldest first
+        Index("ix_research_activities_approver_status_created", "currentApprover", "status", "created_at"),
+        # Owner lists and summary counts
+        Index("ix_research_activities_user_status", "userId", "status"),
+    )
 
 
 class CourseAndSET(Base):
@@ -130,13 +160,21 @@ class CourseAndSET(Base):
     supportingDocuments = Column(String, nullable=True)  # Path to document
     status = Column(String, default="pending")
     currentApprover = Column(Integer, nullable=True)
-    approvalPath = Column(String, nullable=True)
-    approverStatus = Column(String, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
     user = relationship("User", back_populates="courses")
+    approval_steps = _approval_steps("course", "CourseAndSET.caSId")
+    
+    __table_args__ = (
+        # Approver inbox: pending items for one approver, oldest first
+        Index("ix_courses_and_set_approver_status_created", "currentApprover", "status", "created_at"),
+        # Owner lists and summary counts
+        Index("ix_courses_and_set_user_status", "userId", "status"),
+        # One record per section a faculty member taught; bulk imports upsert on it
+        Index("ux_courses_and_set_user_section", "userId", "academicYear", "term", "courseNum", "section", unique=True),
+    )
 
 
 class Extension(Base):
@@ -153,13 +191,19 @@ class Extension(Base):
     supportingDocument = Column(String, nullable=True)  # Path to document
     status = Column(String, default="pending")
     currentApprover = Column(Integer, nullable=True)
-    approvalPath = Column(String, nullable=True)
-    approverStatus = Column(String, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
     user = relationship("User", back_populates="extensions")
+    approval_steps = _approval_steps("extension", "Extension.extensionId")
+    
+    __table_args__ = (
+        # Approver inbox: pending items for one approver, oldest first
+        Index("ix_extensions_approver_status_created", "currentApprover", "status", "created_at"),
+        # Owner lists and summary counts
+        Index("ix_extensions_user_status", "userId", "status"),
+    )
 
 
 class Authorship(Base):
@@ -178,20 +222,26 @@ class Authorship(Base):
     supportingDocument = Column(String, nullable=True)  # Path to document
     status = Column(String, default="pending")
     currentApprover = Column(Integer, nullable=True)
-    approvalPath = Column(String, nullable=True)
-    approverStatus = Column(String, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
     user = relationship("User", back_populates="authorships")
+    approval_steps = _approval_steps("authorship", "Authorship.authorId")
+    
+    __table_args__ = (
+        # Approver inbox: pending items for one approver, oldest first
+        Index("ix_authorships_approver_status_created", "currentApprover", "status", "created_at"),
+        # Owner lists and summary counts
+        Index("ix_authorships_user_status", "userId", "status"),
+    )
 
 
 class SDG(Base):
     __tablename__ = "sdgs"
     
     sdgId = Column(Integer, primary_key=True, index=True)
-    raId = Column(Integer, ForeignKey("research_activities.raId"))
+    raId = Column(Integer, ForeignKey("research_activities.raId"), index=True)
     sdgNum = Column(Integer)
     sdgDesc = Column(Text)
     
@@ -204,7 +254,7 @@ class SDGSubset(Base):
     __tablename__ = "sdg_subsets"
     
     sdgSId = Column(Integer, primary_key=True, index=True)
-    sdgId = Column(Integer, ForeignKey("sdgs.sdgId"))
+    sdgId = Column(Integer, ForeignKey("sdgs.sdgId"), index=True)
     sdgSNum = Column(Integer)
     sdgSDesc = Column(Text)
     
@@ -224,3 +274,125 @@ class ApprovalPath(Base):
     isDean = Column(Boolean, default=False)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class DolibarrOutbox(Base):
+    __tablename__ = "dolibarr_outbox"
+    
+    outboxId = Column(Integer, primary_key=True, index=True)
+    userId = Column(Integer, index=True)  # No foreign key: delete intents outlive the user row
+    operation = Column(String)  # 'upsert' or 'delete'
+    dolibarr_third_party_id = Column(Integer, nullable=True)  # Target of 'delete' operations
+    user_email = Column(String, nullable=True)  # Looks up the target of a 'delete' queued before the link
+    status = Column(String, default="pending")  # 'pending', 'processing', 'failed'
+    attempts = Column(Integer, default=0)
+    next_attempt_at = Column(DateTime, default=datetime.utcnow)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    __table_args__ = (
+        Index("ix_dolibarr_outbox_status_next_attempt", "status", "next_attempt_at"),
+    )
+
+
+class ApprovalStep(Base):
+    __tablename__ = "approval_steps"
+    
+    stepId = Column(Integer, primary_key=True, index=True)
+    record_type = Column(String, nullable=False)  # Same values as approval_inbox.record_type
+    record_id = Column(Integer, nullable=False)
+    step_no = Column(Integer, nullable=False)  # 1-based position in the approval path
+    approver_id = Column(Integer, ForeignKey("users.userId"), nullable=True)
+    role = Column(String, nullable=True)  # 'Department Head', 'Dean' or 'Approver'
+    status = Column(String, default="pending")  # 'pending', 'approved' or 'rejected'
+    comments = Column(Text, nullable=True)
+    acted_at = Column(DateTime, nullable=True)
+    
+    __table_args__ = (
+        Index("ux_approval_steps_record_step", "record_type", "record_id", "step_no", unique=True),
+        # "What is pending for me": one approver's steps by status
+        Index("ix_approval_steps_approver_status", "approver_id", "status"),
+    )
+
+
+class ApprovalCounter(Base):
+    __tablename__ = "approval_counters"
+    
+    scope_type = Column(String, primary_key=True)  # 'department', 'college' or 'all'
+    scope_value = Column(String, primary_key=True)  # Department or college name; '*' for 'all'
+    record_type = Column(String, primary_key=True)  # Same values as approval_inbox.record_type
+    status = Column(String, primary_key=True)
+    count = Column(Integer, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class DocumentBlob(Base):
+    __tablename__ = "document_blobs"
+    
+    sha256 = Column(String(64), primary_key=True)  # Hex digest; the blob's storage key derives from it
+    size = Column(Integer)
+    refcount = Column(Integer, default=0)  # Records whose supporting document points at this blob
+    uploaded_at = Column(DateTime, default=datetime.utcnow)  # Last upload of this content
+    
+    __table_args__ = (
+        # Garbage collection: unreferenced blobs past the grace period
+        Index("ix_document_blobs_unreferenced", "refcount", "uploaded_at"),
+    )
+
+class SyncState(Base):
+    __tablename__ = "sync_state"
+    
+    key = Column(String, primary_key=True)  # e.g. 'dolibarr_thirdparty_watermark'
+    value = Column(String, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+
+# Unified approval inbox: one row per approvable record across the four
+# record tables. Each branch is served by its (currentApprover, status,
+# created_at) index, so an approver's queue is a merge of index range scans.
+APPROVAL_INBOX_SELECT = """
+SELECT 'research_activity' AS record_type, "raId" AS record_id, "userId" AS submitter_id,
+       "currentApprover" AS current_approver, status, created_at, title
+FROM research_activities
+UNION ALL
+SELECT 'course', "caSId", "userId", "currentApprover", status, created_at,
+       "courseNum" || ' - ' || "courseDesc"
+FROM courses_and_set
+UNION ALL
+SELECT 'extension', "extensionId", "userId", "currentApprover", status, created_at,
+       position || ' at ' || office
+FROM extensions
+UNION ALL
+SELECT 'authorship', "authorId", "userId", "currentApprover", status, created_at, title
+FROM authorships
+"""
+
+event.listen(
+    Base.metadata, "after_create",
+    DDL("CREATE OR REPLACE VIEW approval_inbox AS" + APPROVAL_INBOX_SELECT).execute_if(dialect="postgresql")
+)
+event.listen(
+    Base.metadata, "after_create",
+    DDL("CREATE VIEW IF NOT EXISTS approval_inbox AS" + APPROVAL_INBOX_SELECT).execute_if(dialect="sqlite")
+)
+event.listen(Base.metadata, "before_drop", DDL("DROP VIEW IF EXISTS approval_inbox"))
+
+# Read-only mapping of the view; kept out of Base.metadata so create_all doesn't create a table
+approval_inbox = Table(
+    "approval_inbox", MetaData(),
+    Column("record_type", String),
+    Column("record_id", Integer),
+    Column("submitter_id", Integer),
+    Column("current_approver", Integer),
+    Column("status", String),
+    Column("created_at", DateTime),
+    Column("title", Text)
+)
+
+@event.listens_for(User, "before_insert")
+@event.listens_for(User, "before_update")
+def _update_dolibarr_payload_hash(mapper, connection, target):
+    # Imported lazily to keep models free of service imports at load time
+    from .services.dolibarr_client import dolibarr_user_data, third_party_payload_hash
+    target.dolibarr_payload_hash = third_party_payload_hash(dolibarr_user_data(target))
@@ -235,8 +235,6 @@ class ResearchActivitiesInDB(ResearchActivitiesBase):
     supportingDocument: Optional[str] = None
     status: str
     currentApprover: Optional[int] = None
-    approvalPath: Optional[str] = None
-    approverStatus: Optional[str] = None
     created_at: datetime
     updated_at: datetime
     sdgs: Optional[List[SDGInDB]] = None
@@ -289,8 +287,6 @@ class CourseAndSETInDB(CourseAndSETBase):
     supportingDocuments: Optional[str] = None
     status: str
     currentApprover: Optional[int] = None
-    approvalPath: Optional[str] = None
-    approverStatus: Optional[str] = None
     created_at: datetime
     updated_at: datetime
     
@@ -298,6 +294,41 @@ class CourseAndSETInDB(CourseAndSETBase):
         orm_mode = True
 
 
+class TeachingImportRowError(BaseModel):
+    row: int
+    errors: List[str]
+
+
+class TeachingImportResult(BaseModel):
+    rows: int
+    created: int
+    updated: int
+    unchanged: int
+    failed: int
+    errors: List[TeachingImportRowError]
+
+
+class TeachingScoreGroup(BaseModel):
+    key: str
+    name: Optional[str] = None
+    courses: int
+    scoredCourses: int  # Courses with at least one SET part rated
+    creditedUnits: float
+    teachingPoints: float
+    respondents: int
+    # Respondent-weighted SET averages; None without rated courses
+    setAverage: Optional[float] = None
+    partOneStudent: Optional[float] = None
+    partTwoCourse: Optional[float] = None
+    partThreeTeaching: Optional[float] = None
+
+
+class TeachingScoresResponse(BaseModel):
+    groupBy: str
+    groups: List[TeachingScoreGroup]
+    totals: Optional[TeachingScoreGroup] = None
+
+
 # Extension schemas
 class ExtensionBase(BaseModel):
     position: str
@@ -328,8 +359,6 @@ class ExtensionInDB(ExtensionBase):
     supportingDocument: Optional[str] = None
     status: str
     currentApprover: Optional[int] = None
-    approvalPath: Optional[str] = None
-    approverStatus: Optional[str] = None
     created_at: datetime
     updated_at: datetime
     
@@ -371,8 +400,6 @@ class AuthorshipInDB(AuthorshipBase):
     supportingDocument: Optional[str] = None
     status: str
     currentApprover: Optional[int] = None
-    approvalPath: Optional[str] = None
-    approverStatus: Optional[str] = None
     created_at: datetime
     updated_at: datetime
     
@@ -410,6 +437,22 @@ class ApprovalPathInDB(ApprovalPathBase):
         orm_mode = True
 
 
+# Approval step schema
+class ApprovalStepInDB(BaseModel):
+    stepId: int
+    record_type: str
+    record_id: int
+    step_no: int
+    approver_id: Optional[int] = None
+    role: Optional[str] = None
+    status: str
+    comments: Optional[str] = None
+    acted_at: Optional[datetime] = None
+    
+    class Config:
+        orm_mode = True
+
+
 # Profile schemas for combined user data
 class ProfileResponse(BaseModel):
     user: UserResponse
@@ -424,10 +467,38 @@ class ProfileResponse(BaseModel):
 
 # Approval status update schema
 class ApprovalStatusUpdate(BaseModel):
-    status: str = Field(..., description="Status can be 'approved', 'rejected', or 'pending'")
+    status: str = Field(..., description="Status can be 'approved' or 'rejected'")
     comments: Optional[str] = None
 
 
+# Batch approval schemas
+class ApprovalBatchItem(BaseModel):
+    record_type: str
+    record_id: int
+    decision: str = Field(..., description="'approved' or 'rejected'")
+    comment: Optional[str] = None
+
+
+class ApprovalBatchRequest(BaseModel):
+    items: List[ApprovalBatchItem]
+
+
+class ApprovalBatchItemResult(BaseModel):
+    record_type: str
+    record_id: int
+    ok: bool
+    status_code: int
+    status: Optional[str] = None
+    current_approver: Optional[int] = None
+    error: Optional[str] = None
+
+
+class ApprovalBatchResponse(BaseModel):
+    results: List[ApprovalBatchItemResult]
+    succeeded: int
+    failed: int
+
+
 # Record summary schema
 class RecordCountInfo(BaseModel):
     count: int
@@ -440,3 +511,22 @@ class RecordSummaryResponse(BaseModel):
     extensions: RecordCountInfo
     authorships: RecordCountInfo
     pendingApprovals: int
+
+
+# Dolibarr bulk sync job schema
+class SyncJobResponse(BaseModel):
+    job_id: str
+    status: str
+    full: bool = False
+    total: int = 0
+    processed: int = 0
+    created: int = 0
+    updated: int = 0
+    skipped: int = 0
+    pulled: int = 0
+    failed: int = 0
+    errors: List[Dict[str, Any]] = []
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    metrics: Dict[str, int] = {}
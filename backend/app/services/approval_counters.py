@@ -0,0 +1,215 @@
+"""
+Precomputed record counts per department, college and for all of FRIS.
+
+approval_counters holds one row per (scope_type, scope_value, record_type,
+status). Flushes through SessionLocal adjust the rows in the same
+transaction as the change itself:
+
+  * a new record adds one to its status in each scope of its submitter
+  * a deleted record subtracts one
+  * a status change moves one from the old status to the new one
+  * a submitter moving department or college moves all their counts
+
+Writes that bypass the ORM unit of work (bulk query updates, raw SQL)
+are not tracked; run `python -m app.services.approval_counters` to
+rebuild the table from the record tables.
+"""
+import logging
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+from sqlalchemy import and_, delete, event, func, inspect, insert, literal, select, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from ..dependencies import SessionLocal
+from ..logging_config import configure_logging
+from ..models import (
+    User, ResearchActivities, CourseAndSET, Extension, Authorship,
+    ApprovalCounter, approval_inbox
+)
+
+logger = logging.getLogger(__name__)
+
+SCOPE_ALL = "*"
+
+RECORD_TYPES = {
+    ResearchActivities: "research_activity",
+    CourseAndSET: "course",
+    Extension: "extension",
+    Authorship: "authorship"
+}
+
+CounterKey = Tuple[str, str, str, str]
+
+
+def _scopes(department: Optional[str], college: Optional[str]):
+    if department is not None:
+        yield "department", department
+    if college is not None:
+        yield "college", college
+    yield "all", SCOPE_ALL
+
+
+def _add(deltas: Counter, scope: Tuple[Optional[str], Optional[str]], record_type: str,
+         record_status: Optional[str], amount: int) -> None:
+    for scope_type, scope_value in _scopes(*scope):
+        deltas[(scope_type, scope_value, record_type, record_status or "pending")] += amount
+
+
+def _previous_value(state, key: str):
+    """
+    Value of an attribute before the flush that is being processed.
+    """
+    history = state.attrs[key].history
+    if history.deleted:
+        return history.deleted[0]
+    if history.unchanged:
+        return history.unchanged[0]
+    return history.added[0] if history.added else None
+
+
+def _apply(connection: Connection, deltas: Dict[CounterKey, int]) -> None:
+    table = ApprovalCounter.__table__
+    now = datetime.utcnow()
+    rows = [
+        {"scope_type": key[0], "scope_value": key[1], "record_type": key[2], "status": key[3],
+         "count": amount, "updated_at": now}
+        for key, amount in deltas.items() if amount
+    ]
+    if not rows:
+        return
+
+    dialect = connection.dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as upsert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as upsert
+        for row in rows:
+            statement = upsert(table).values(**row)
+            connection.execute(statement.on_conflict_do_update(
+                index_elements=[table.c.scope_type, table.c.scope_value, table.c.record_type, table.c.status],
+                set_={"count": table.c.count + statement.excluded.count, "updated_at": now}
+            ))
+        return
+
+    # Portable fallback: update, then insert the rows that didn't exist yet
+    for row in rows:
+        result = connection.execute(update(table).where(and_(
+            table.c.scope_type == row["scope_type"],
+            table.c.scope_value == row["scope_value"],
+            table.c.record_type == row["record_type"],
+            table.c.status == row["status"]
+        )).values(count=table.c.count + row["count"], updated_at=now))
+        if result.rowcount == 0:
+            connection.execute(insert(table).values(**row))
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _track_counter_changes(session: Session, flush_context) -> None:
+    connection = session.connection()
+    deltas: Counter = Counter()
+    scopes: Dict[int, Tuple[Optional[str], Optional[str]]] = {}
+    moved: Dict[int, Tuple[Tuple, Tuple]] = {}
+
+    # Submitters whose department or college changed in this flush. Per-record
+    # changes below are charged to their old scope, then everything moves over.
+    for instance in session.dirty:
+        if not isinstance(instance, User):
+            continue
+        state = inspect(instance)
+        before = (_previous_value(state, "department"), _previous_value(state, "college"))
+        after = (instance.department, instance.college)
+        scopes[instance.userId] = before
+        if before != after:
+            moved[instance.userId] = (before, after)
+
+    def scope_of(user_id: Optional[int]):
+        if user_id not in scopes:
+            row = connection.execute(
+                select(User.department, User.college).where(User.userId == user_id)
+            ).first()
+            scopes[user_id] = (row.department, row.college) if row else (None, None)
+        return scopes[user_id]
+
+    for instance in session.new:
+        record_type = RECORD_TYPES.get(type(instance))
+        if record_type:
+            _add(deltas, scope_of(instance.userId), record_type, instance.status, 1)
+
+    for instance in session.deleted:
+        record_type = RECORD_TYPES.get(type(instance))
+        if record_type:
+            state = inspect(instance)
+            _add(deltas, scope_of(instance.userId), record_type, _previous_value(state, "status"), -1)
+
+    for instance in session.dirty:
+        record_type = RECORD_TYPES.get(type(instance))
+        if not record_type:
+            continue
+        history = inspect(instance).attrs.status.history
+        if history.added or history.deleted:
+            old_status = history.deleted[0] if history.deleted else None
+            new_status = history.added[0] if history.added else None
+            if (old_status or "pending") != (new_status or "pending"):
+                scope = scope_of(instance.userId)
+                _add(deltas, scope, record_type, old_status, -1)
+                _add(deltas, scope, record_type, new_status, 1)
+
+    for user_id, (before, after) in moved.items():
+        rows = connection.execute(
+            select(approval_inbox.c.record_type, approval_inbox.c.status, func.count())
+            .where(approval_inbox.c.submitter_id == user_id)
+            .group_by(approval_inbox.c.record_type, approval_inbox.c.status)
+        ).all()
+        for record_type, record_status, count in rows:
+            _add(deltas, before, record_type, record_status, -count)
+            _add(deltas, after, record_type, record_status, count)
+
+    _apply(connection, deltas)
+
+
+def scope_count(db: Session, scope_type: str, scope_value: Optional[str], record_status: str = "pending") -> int:
+    """
+    Records in one status for a scope, summed over the record types.
+    """
+    total = db.query(func.sum(ApprovalCounter.count)).filter(
+        ApprovalCounter.scope_type == scope_type,
+        ApprovalCounter.scope_value == (SCOPE_ALL if scope_type == "all" else scope_value),
+        ApprovalCounter.status == record_status
+    ).scalar()
+    return int(total or 0)
+
+
+def rebuild_approval_counters(db: Session) -> None:
+    """
+    Recompute every counter from the record tables and commit.
+    """
+    table = ApprovalCounter.__table__
+    now = datetime.utcnow()
+    record_status = func.coalesce(approval_inbox.c.status, "pending")
+    db.execute(delete(table))
+    for scope_type, scope_column in (("department", User.department), ("college", User.college), ("all", None)):
+        scope_value = literal(SCOPE_ALL) if scope_column is None else scope_column
+        source = select(
+            literal(scope_type), scope_value, approval_inbox.c.record_type, record_status,
+            func.count(), literal(now)
+        ).select_from(
+            approval_inbox.join(User, User.userId == approval_inbox.c.submitter_id)
+        ).group_by(approval_inbox.c.record_type, record_status)
+        if scope_column is not None:
+            source = source.where(scope_column.isnot(None)).group_by(scope_column)
+        db.execute(insert(table).from_select(
+            ["scope_type", "scope_value", "record_type", "status", "count", "updated_at"], source
+        ))
+    db.commit()
+    logger.info("Rebuilt approval counters (%s rows)", db.query(ApprovalCounter).count())
+
+
+if __name__ == "__main__":
+    configure_logging()
+    db = SessionLocal()
+    try:
+        rebuild_approval_counters(db)
+    finally:
+        db.close()
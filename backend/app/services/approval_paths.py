@@ -0,0 +1,183 @@
+"""
+Approval path resolution per department and college, with a cache.
+
+A submitter's approval path is the approval_paths rows configured for
+their (department, college), each resolved to the user with the
+approver's email. Without configured rows it falls back to the
+department head, then the dean. resolve_approval_path() reads the
+configured rows and the fallback approvers in one query, and caches the
+result per (department, college) for APPROVAL_PATH_CACHE_TTL seconds.
+
+Commits through SessionLocal that change approval_paths or the user
+columns a path depends on (department, college, department head and dean
+flags, email, users added or removed) clear the whole cache. Such edits
+are rare admin actions, so the TTL only bounds staleness across processes.
+"""
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import event, func, inspect, literal, select, union_all
+from sqlalchemy.orm import Session
+from ..cache import TTLCache
+from ..config import settings
+from ..dependencies import SessionLocal
+from ..models import ApprovalPath, User
+
+logger = logging.getLogger(__name__)
+
+# (department, college) -> tuple of resolved steps
+approval_path_cache = TTLCache(settings.APPROVAL_PATH_CACHE_MAX_ENTRIES, settings.APPROVAL_PATH_CACHE_TTL)
+# Bumped on every invalidation; paths loaded under an older generation are not cached
+_generation = 0
+
+# User columns that decide who approves for a department or college
+PATH_USER_COLUMNS = ("department", "college", "isDepartmentHead", "isDean", "userEmail")
+
+
+def _step(approver_id: int, role: str, email: str) -> Dict[str, Any]:
+    return {"approver_id": approver_id, "role": role, "email": email, "status": "pending"}
+
+
+def load_approval_path(db: Session, department: Optional[str], college: Optional[str]) -> List[Dict[str, Any]]:
+    """
+    Resolve an approval path from the database, in one query.
+    """
+    configured = select(
+        literal("path", literal_execute=True).label("source"),
+        ApprovalPath.approval_number.label("position"),
+        ApprovalPath.approvalPathId.label("tiebreak"),
+        ApprovalPath.isDeptHead.label("is_dept_head"),
+        ApprovalPath.isDean.label("is_dean"),
+        User.userId.label("user_id"),
+        User.userEmail.label("email")
+    ).outerjoin(
+        User, User.userEmail == ApprovalPath.approver_email
+    ).where(
+        ApprovalPath.department == department,
+        ApprovalPath.college == college
+    )
+
+    def fallback(source: str, position: int, *criteria):
+        first_user = select(func.min(User.userId)).where(*criteria).scalar_subquery()
+        return select(
+            literal(source, literal_execute=True).label("source"),
+            literal(position, literal_execute=True).label("position"),
+            literal(0, literal_execute=True).label("tiebreak"),
+            literal(source == "head", literal_execute=True).label("is_dept_head"),
+            literal(source == "dean", literal_execute=True).label("is_dean"),
+            User.userId.label("user_id"),
+            User.userEmail.label("email")
+        ).where(User.userId == first_user)
+
+    query = union_all(
+        configured,
+        fallback("head", 0, User.department == department, User.isDepartmentHead == True),
+        fallback("dean", 1, User.college == college, User.isDean == True)
+    ).subquery()
+    rows = db.execute(select(query).order_by(query.c.source, query.c.position, query.c.tiebreak)).all()
+
+    configured_rows = [row for row in rows if row.source == "path"]
+    if configured_rows:
+        approval_path = []
+        for row in configured_rows:
+            # Steps whose approver email has no user are skipped
+            if row.user_id is None:
+                continue
+            role = "Approver"
+            if row.is_dept_head:
+                role = "Department Head"
+            elif row.is_dean:
+                role = "Dean"
+            approval_path.append(_step(row.user_id, role, row.email))
+        return approval_path
+
+    # Fallback to default approval path: department head, then dean
+    fallback_roles = {"head": "Department Head", "dean": "Dean"}
+    return [
+        _step(row.user_id, fallback_roles[row.source], row.email)
+        for row in sorted(rows, key=lambda row: row.position)
+    ]
+
+
+def resolve_approval_path(db: Session, department: Optional[str], college: Optional[str]) -> List[Dict[str, Any]]:
+    """
+    Approval path for a submitter in `department` and `college`, from the cache when possible.
+    Returns fresh step dicts the caller may modify.
+    """
+    key: Tuple[Optional[str], Optional[str]] = (department, college)
+    cached = approval_path_cache.get(key)
+    if cached is None:
+        generation = _generation
+        cached = tuple(load_approval_path(db, department, college))
+        if generation == _generation:
+            approval_path_cache.set(key, cached)
+    return [dict(step) for step in cached]
+
+
+def invalidate_approval_paths() -> None:
+    """
+    Drop every cached approval path.
+
+    Commits through SessionLocal call this automatically; use it directly
+    after writes that bypass the ORM unit of work (raw SQL, other processes' scripts).
+    """
+    global _generation
+    _generation += 1
+    approval_path_cache.clear()
+
+
+def _affects_paths(instance, dirty: bool) -> bool:
+    if isinstance(instance, ApprovalPath):
+        return True
+    if not isinstance(instance, User):
+        return False
+    if not dirty:
+        return True
+    state = inspect(instance)
+    return any(state.attrs[column].history.has_changes() for column in PATH_USER_COLUMNS)
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _collect_path_changes(session: Session, flush_context) -> None:
+    if session.info.get("approval_paths_changed"):
+        return
+    if (
+        any(_affects_paths(instance, False) for instance in (*session.new, *session.deleted))
+        or any(_affects_paths(instance, True) for instance in session.dirty)
+    ):
+        session.info["approval_paths_changed"] = True
+
+
+def _updated_columns(statement) -> set:
+    values = statement._values or dict(statement._ordered_values or ())
+    return {getattr(column, "key", column) for column in values}
+
+
+@event.listens_for(SessionLocal, "do_orm_execute")
+def _collect_bulk_path_writes(orm_execute_state) -> None:
+    # Bulk query().update()/delete() skip the flush. User updates only
+    # matter when they set a column paths depend on; the Dolibarr sync's
+    # bookkeeping updates don't.
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is None or mapper.class_ not in (User, ApprovalPath):
+        return
+    if (
+        mapper.class_ is User
+        and orm_execute_state.is_update
+        and not _updated_columns(orm_execute_state.statement) & set(PATH_USER_COLUMNS)
+    ):
+        return
+    orm_execute_state.session.info["approval_paths_changed"] = True
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _invalidate_after_commit(session: Session) -> None:
+    if session.info.pop("approval_paths_changed", False):
+        invalidate_approval_paths()
+        logger.debug("Approval path cache cleared")
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _discard_after_rollback(session: Session) -> None:
+    session.info.pop("approval_paths_changed", None)
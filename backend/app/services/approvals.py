@@ -0,0 +1,297 @@
+"""
+Approval state machine for research activities, courses, extensions and authorships.
+
+A record's approval path is its approval_steps rows in step order. The
+record's currentApprover is the approver of the first pending step. An
+approval moves the record to the next pending step, or to "approved" after
+the last one. A rejection marks the record "rejected" until the submitter
+edits it, which puts every step back to pending (resubmit).
+
+Everything here works on loaded ORM objects and leaves committing to the
+caller. Async handlers call it through AsyncSession.run_sync, so a record's
+approval_steps can lazy load. batch_decide() locks the records with
+SELECT ... FOR UPDATE SKIP LOCKED and applies every decision in the
+caller's transaction.
+"""
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from fastapi import HTTPException, status
+from sqlalchemy import inspect, select
+from sqlalchemy.orm import Session, selectinload
+from ..models import ResearchActivities, CourseAndSET, Extension, Authorship, ApprovalStep
+
+# Record type, as in the approval_inbox view -> model
+RECORD_MODELS = {
+    "research_activity": ResearchActivities,
+    "course": CourseAndSET,
+    "extension": Extension,
+    "authorship": Authorship
+}
+
+DECISIONS = ("approved", "rejected")
+
+
+def record_model(record_type: str):
+    """
+    Model for a record type; 400 for unknown types.
+    """
+    model = RECORD_MODELS.get(record_type)
+    if model is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid record type: {record_type}"
+        )
+    return model
+
+
+def record_key(model):
+    """
+    Primary key column attribute of a record model.
+    """
+    return getattr(model, inspect(model).primary_key[0].key)
+
+
+def new_approval_steps(record_type: str, approval_path: List[Dict[str, Any]]) -> List[ApprovalStep]:
+    """
+    Approval step rows for a new record from a generated approval path.
+
+    Args:
+        record_type: Record type, as in the approval_inbox view
+        approval_path: Steps from generate_approval_path
+
+    Returns:
+        Pending ApprovalStep objects, to assign to the record's approval_steps
+    """
+    return [
+        ApprovalStep(
+            record_type=record_type,
+            step_no=step_no,
+            approver_id=step["approver_id"],
+            role=step["role"],
+            status="pending"
+        )
+        for step_no, step in enumerate(approval_path, start=1)
+    ]
+
+
+def get_current_approver(steps: List[ApprovalStep]) -> Optional[int]:
+    """
+    Get the current approver ID from a record's approval steps.
+
+    Args:
+        steps: Approval steps in path order
+
+    Returns:
+        Current approver ID or None if no pending approvers
+    """
+    for step in steps:
+        if step.status == "pending":
+            return step.approver_id
+
+    return None
+
+
+def update_approval_status(steps: List[ApprovalStep], approver_id: int, status: str, comments: Optional[str] = None) -> Optional[ApprovalStep]:
+    """
+    Record an approver's decision on their pending step.
+
+    Args:
+        steps: Approval steps in path order
+        approver_id: ID of the approver acting
+        status: New status ('approved', 'rejected')
+        comments: Approver's comments
+
+    Returns:
+        The updated step, or None if the approver has no pending step
+    """
+    for step in steps:
+        if step.approver_id == approver_id and step.status == "pending":
+            step.status = status
+            step.comments = comments
+            step.acted_at = datetime.utcnow()
+            return step
+
+    return None
+
+
+def reset_approval_steps(steps: List[ApprovalStep]) -> Optional[int]:
+    """
+    Put every step back to pending, e.g. when a rejected record is edited.
+
+    Returns:
+        The first approver's ID, or None for an empty path
+    """
+    for step in steps:
+        step.status = "pending"
+        step.comments = None
+        step.acted_at = None
+
+    return get_current_approver(steps)
+
+
+def get_overall_approval_status(steps: List[ApprovalStep]) -> str:
+    """
+    Get the overall approval status from a record's approval steps.
+
+    Args:
+        steps: Approval steps in path order
+
+    Returns:
+        Overall status ('approved', 'rejected', 'pending')
+    """
+    if not steps:
+        return "pending"
+
+    # If any step is rejected, the overall status is rejected
+    if any(step.status == "rejected" for step in steps):
+        return "rejected"
+
+    # If any step is pending, the overall status is pending
+    if any(step.status == "pending" for step in steps):
+        return "pending"
+
+    # If all steps are approved, the overall status is approved
+    return "approved"
+
+
+def apply_decision(record, approver_id: int, decision: str, comments: Optional[str] = None) -> None:
+    """
+    Apply an approver's decision to a record and advance its approval state.
+
+    Raises 403 if `approver_id` is not the record's current approver, and
+    400 for an unknown decision, a record that is not pending or an
+    approver without a pending step.
+    Nothing is changed when it raises.
+    """
+    if decision not in DECISIONS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Status must be 'approved' or 'rejected'"
+        )
+    if record.currentApprover != approver_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You are not authorized to approve this record"
+        )
+    if record.status != "pending":
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Record is {record.status}, not pending approval"
+        )
+
+    steps = record.approval_steps
+    if not steps:
+        # No approval path defined, the decision is final
+        record.status = decision
+        record.currentApprover = None
+        return
+
+    if update_approval_status(steps, approver_id, decision, comments) is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="You are not in the approval path for this record"
+        )
+
+    overall_status = get_overall_approval_status(steps)
+    if overall_status == "approved":
+        # All approvers have approved
+        record.status = "approved"
+        record.currentApprover = None
+    elif overall_status == "rejected":
+        record.status = "rejected"
+    else:
+        # Move to the next pending approver
+        record.currentApprover = get_current_approver(steps)
+
+
+def resubmit(record) -> None:
+    """
+    Send a rejected record back through its whole approval path after an edit.
+    """
+    if record.status == "rejected":
+        record.currentApprover = reset_approval_steps(record.approval_steps)
+        record.status = "pending"
+
+
+def _lock_records(db: Session, keys: Sequence[Tuple[str, int]]) -> Tuple[Dict[Tuple[str, int], Any], set]:
+    """
+    Load and lock the requested records with their approval steps, one query per record type.
+
+    Returns the locked records by (record_type, record_id), and the keys of
+    records that exist but are locked by another transaction (SKIP LOCKED).
+    """
+    ids_by_type: Dict[str, List[int]] = {}
+    for record_type, record_id in keys:
+        ids_by_type.setdefault(record_type, []).append(record_id)
+
+    records = {}
+    busy = set()
+    for record_type, ids in ids_by_type.items():
+        model = RECORD_MODELS[record_type]
+        key = record_key(model)
+        rows = db.scalars(
+            select(model)
+            .where(key.in_(sorted(ids)))
+            .order_by(key)
+            .options(selectinload(model.approval_steps))
+            .with_for_update(of=model, skip_locked=True)
+        )
+        for record in rows:
+            records[(record_type, getattr(record, key.key))] = record
+
+        missing = [record_id for record_id in ids if (record_type, record_id) not in records]
+        if missing:
+            busy.update((record_type, record_id) for record_id in db.scalars(select(key).where(key.in_(missing))))
+    return records, busy
+
+
+def batch_decide(db: Session, items: Sequence[Any], approver_id: int) -> List[Dict[str, Any]]:
+    """
+    Apply many approvers' decisions in the session's transaction, without committing.
+
+    `items` have record_type, record_id, decision and comment. Returns one
+    result per item, in order: ok, the record's resulting status and
+    current approver, or the HTTP status code and reason it was skipped.
+    An item failing does not affect the others.
+    """
+    results: List[Dict[str, Any]] = []
+    valid_keys = []
+    seen = set()
+    for item in items:
+        result = {"record_type": item.record_type, "record_id": item.record_id, "ok": False}
+        results.append(result)
+        key = (item.record_type, item.record_id)
+        if item.record_type not in RECORD_MODELS:
+            result.update(status_code=status.HTTP_400_BAD_REQUEST, error=f"Invalid record type: {item.record_type}")
+        elif key in seen:
+            result.update(status_code=status.HTTP_400_BAD_REQUEST, error="Record listed more than once")
+        else:
+            seen.add(key)
+            valid_keys.append(key)
+
+    records, busy = _lock_records(db, valid_keys) if valid_keys else ({}, set())
+
+    for item, result in zip(items, results):
+        if "error" in result:
+            continue
+        key = (item.record_type, item.record_id)
+        if key in busy:
+            result.update(status_code=status.HTTP_409_CONFLICT, error="Record is being updated by another request")
+            continue
+        record = records.get(key)
+        if record is None:
+            result.update(status_code=status.HTTP_404_NOT_FOUND, error="Record not found")
+            continue
+        try:
+            apply_decision(record, approver_id, item.decision, item.comment)
+        except HTTPException as e:
+            result.update(status_code=e.status_code, error=e.detail)
+            continue
+        result.update(
+            ok=True,
+            status_code=status.HTTP_200_OK,
+            status=record.status,
+            current_approver=record.currentApprover
+        )
+
+    return results
@@ -0,0 +1,303 @@
+"""
+Content-addressed, reference-counted supporting documents.
+
+Uploads are stored once per distinct content: the blob key is the SHA-256
+of the file, sharded as ab/cd/<sha256>, in the backend chosen by
+DOCUMENT_STORAGE (see app.storage). Records keep the path
+blobs/ab/cd/<sha256><ext>, so re-uploading the same SET form or
+certificate for several records costs no extra space.
+
+document_blobs holds one row per blob with the number of records pointing
+at it. Flushes through SessionLocal adjust the counts in the same
+transaction as the record change: setting or replacing a supporting
+document, or deleting the record. After a commit that released blobs,
+unreferenced ones are removed on a background thread.
+
+A blob uploaded less than DOCUMENT_GC_GRACE_SECONDS ago is never removed,
+so an upload can't lose its blob between storing it and the record's
+commit. Run `python -m app.services.documents` periodically: it recounts
+references from the record tables (repairing writes that bypassed the ORM
+unit of work, like approval_counters) and collects what the hooks left,
+including uploads that never got attached to a record.
+"""
+import hashlib
+import logging
+import os
+import re
+import tempfile
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import BinaryIO, Iterable, Optional, Tuple
+import httpx
+from fastapi import HTTPException, UploadFile
+from sqlalchemy import delete, event, insert, inspect, or_, select, update
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from ..config import settings
+from ..dependencies import SessionLocal, engine
+from ..logging_config import configure_logging
+from ..models import ResearchActivities, CourseAndSET, Extension, Authorship, DocumentBlob
+from ..storage import create_storage
+
+logger = logging.getLogger(__name__)
+
+storage = create_storage()
+
+DOCUMENT_PREFIX = "blobs"
+
+# Record model -> column holding its supporting document path
+DOCUMENT_COLUMNS = {
+    ResearchActivities: "supportingDocument",
+    CourseAndSET: "supportingDocuments",
+    Extension: "supportingDocument",
+    Authorship: "supportingDocument"
+}
+
+_DOCUMENT_PATH = re.compile(rf"^{DOCUMENT_PREFIX}/([0-9a-f]{{2}})/([0-9a-f]{{2}})/([0-9a-f]{{64}})(\.[a-z0-9]{{1,10}})?$")
+_EXTENSION = re.compile(r"^\.[a-z0-9]{1,10}$")
+
+_gc_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="document-gc")
+
+
+def blob_key(sha256: str) -> str:
+    return f"{sha256[:2]}/{sha256[2:4]}/{sha256}"
+
+
+def document_path(sha256: str, extension: str = "") -> str:
+    """
+    Path stored on a record for a blob; keeps the upload's extension for display.
+    """
+    return f"{DOCUMENT_PREFIX}/{blob_key(sha256)}{extension}"
+
+
+def document_digest(path: Optional[str]) -> Optional[str]:
+    """
+    SHA-256 of the blob a record's document path points at, or None for other paths.
+    """
+    match = _DOCUMENT_PATH.match(path or "")
+    if match is None or match.group(3)[:2] != match.group(1) or match.group(3)[2:4] != match.group(2):
+        return None
+    return match.group(3)
+
+
+def _stage(source: BinaryIO) -> Tuple[str, int, str]:
+    """
+    Copy `source` to a temp file in UPLOAD_CHUNK_SIZE chunks, hashing as it goes.
+
+    Returns the temp file's path, size and SHA-256. Raises 413 as soon as
+    the copy passes MAX_UPLOAD_SIZE.
+    """
+    staging_dir = os.path.join(settings.UPLOAD_DIRECTORY, ".staging")
+    os.makedirs(staging_dir, exist_ok=True)
+    digest = hashlib.sha256()
+    size = 0
+    fd, temp_path = tempfile.mkstemp(dir=staging_dir, prefix="upload-", suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = source.read(settings.UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > settings.MAX_UPLOAD_SIZE:
+                    raise HTTPException(status_code=413, detail="File too large")
+                digest.update(chunk)
+                out.write(chunk)
+            out.flush()
+            os.fsync(out.fileno())
+    except BaseException:
+        _discard(temp_path)
+        raise
+    return temp_path, size, digest.hexdigest()
+
+
+def _discard(path: str) -> None:
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+def _touch_blob(sha256: str, size: int) -> None:
+    """
+    Create the blob's row, or mark it as just uploaded, in its own transaction.
+    """
+    table = DocumentBlob.__table__
+    now = datetime.utcnow()
+    with engine.begin() as connection:
+        dialect = connection.dialect.name
+        if dialect in ("postgresql", "sqlite"):
+            if dialect == "postgresql":
+                from sqlalchemy.dialects.postgresql import insert as upsert
+            else:
+                from sqlalchemy.dialects.sqlite import insert as upsert
+            statement = upsert(table).values(sha256=sha256, size=size, refcount=0, uploaded_at=now)
+            connection.execute(statement.on_conflict_do_update(
+                index_elements=[table.c.sha256], set_={"uploaded_at": now}
+            ))
+            return
+
+        # Portable fallback: update, then insert if the row didn't exist yet
+        result = connection.execute(update(table).where(table.c.sha256 == sha256).values(uploaded_at=now))
+        if result.rowcount == 0:
+            connection.execute(insert(table).values(sha256=sha256, size=size, refcount=0, uploaded_at=now))
+
+
+def _store(source: BinaryIO, extension: str) -> str:
+    temp_path, size, sha256 = _stage(source)
+    try:
+        # The row is touched before the blob is written, so a concurrent
+        # collection either finishes first or skips this blob as recent
+        _touch_blob(sha256, size)
+        key = blob_key(sha256)
+        if storage.exists(key):
+            _discard(temp_path)
+            logger.debug("Reused document blob %s (%s bytes)", sha256, size)
+        else:
+            storage.put_file(key, temp_path, sha256)
+            logger.debug("Stored document blob %s (%s bytes)", sha256, size)
+    except BaseException:
+        _discard(temp_path)
+        raise
+    return document_path(sha256, extension)
+
+
+async def store_document(file: UploadFile) -> str:
+    """
+    Store an uploaded file as a content-addressed blob and return the record path for it.
+
+    The file is copied and hashed in fixed-size chunks on a worker thread.
+    The blob is only referenced once a record with the returned path is flushed.
+    """
+    if file.size is not None and file.size > settings.MAX_UPLOAD_SIZE:
+        raise HTTPException(status_code=413, detail="File too large")
+
+    extension = os.path.splitext(file.filename or "")[1].lower()
+    if not _EXTENSION.match(extension):
+        extension = ""
+
+    try:
+        await file.seek(0)
+        return await run_in_threadpool(_store, file.file, extension)
+    except (OSError, httpx.HTTPError) as e:
+        raise HTTPException(status_code=500, detail=f"Could not save file: {str(e)}")
+
+
+def collect_garbage(digests: Optional[Iterable[str]] = None) -> int:
+    """
+    Remove unreferenced blobs past the grace period, optionally only among `digests`.
+
+    Each blob's row is deleted and its object removed in one transaction, so
+    an upload of the same content waits for the row and then writes it again.
+    """
+    table = DocumentBlob.__table__
+    cutoff = datetime.utcnow() - timedelta(seconds=settings.DOCUMENT_GC_GRACE_SECONDS)
+    collectable = (table.c.refcount <= 0) & or_(table.c.uploaded_at.is_(None), table.c.uploaded_at < cutoff)
+
+    query = select(table.c.sha256).where(collectable)
+    if digests is not None:
+        query = query.where(table.c.sha256.in_(list(digests)))
+    with engine.connect() as connection:
+        candidates = connection.execute(query).scalars().all()
+
+    collected = 0
+    for sha256 in candidates:
+        with engine.begin() as connection:
+            result = connection.execute(delete(table).where(table.c.sha256 == sha256, collectable))
+            if result.rowcount:
+                storage.delete(blob_key(sha256))
+                collected += 1
+    if collected:
+        logger.info("Collected %s unreferenced document blobs", collected)
+    return collected
+
+
+def _collect_in_background(digests: Iterable[str]) -> None:
+    try:
+        collect_garbage(digests)
+    except Exception:
+        logger.exception("Document blob collection failed")
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _track_document_references(session: Session, flush_context) -> None:
+    deltas: Counter = Counter()
+
+    for instance in session.new:
+        column = DOCUMENT_COLUMNS.get(type(instance))
+        if column is not None:
+            deltas[document_digest(getattr(instance, column))] += 1
+
+    for instance in session.dirty:
+        column = DOCUMENT_COLUMNS.get(type(instance))
+        if column is None:
+            continue
+        history = inspect(instance).attrs[column].history
+        for path in history.added:
+            deltas[document_digest(path)] += 1
+        for path in history.deleted:
+            deltas[document_digest(path)] -= 1
+
+    for instance in session.deleted:
+        column = DOCUMENT_COLUMNS.get(type(instance))
+        if column is not None:
+            history = inspect(instance).attrs[column].history
+            for path in history.deleted or history.unchanged:
+                deltas[document_digest(path)] -= 1
+
+    deltas.pop(None, None)
+    if not any(deltas.values()):
+        return
+
+    table = DocumentBlob.__table__
+    connection = session.connection()
+    for sha256, amount in deltas.items():
+        if amount:
+            connection.execute(
+                update(table).where(table.c.sha256 == sha256).values(refcount=table.c.refcount + amount)
+            )
+    released = {sha256 for sha256, amount in deltas.items() if amount < 0}
+    if released:
+        session.info.setdefault("document_released", set()).update(released)
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _collect_after_commit(session: Session) -> None:
+    released = session.info.pop("document_released", None)
+    if released:
+        _gc_executor.submit(_collect_in_background, released)
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _discard_after_rollback(session: Session) -> None:
+    session.info.pop("document_released", None)
+
+
+def recount_references(db: Session) -> None:
+    """
+    Recompute every blob's refcount from the record tables and commit.
+    Repairs counts after writes that bypassed the ORM unit of work.
+    """
+    counts: Counter = Counter()
+    for model, column in DOCUMENT_COLUMNS.items():
+        attribute = getattr(model, column)
+        for path in db.execute(select(attribute).where(attribute.like(f"{DOCUMENT_PREFIX}/%"))).scalars():
+            counts[document_digest(path)] += 1
+    counts.pop(None, None)
+
+    table = DocumentBlob.__table__
+    for sha256, refcount in db.execute(select(table.c.sha256, table.c.refcount)).all():
+        if refcount != counts[sha256]:
+            db.execute(update(table).where(table.c.sha256 == sha256).values(refcount=counts[sha256]))
+    db.commit()
+
+
+if __name__ == "__main__":
+    configure_logging()
+    db = SessionLocal()
+    try:
+        recount_references(db)
+    finally:
+        db.close()
+    collect_garbage()
@@ -1,15 +1,208 @@
 import httpx
+import hashlib
 import json
 import logging
 import asyncio
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
 from typing import Dict, Any, Optional, List
+from ..cache import TTLCache
 from ..config import settings
 
 logger = logging.getLogger(__name__)
 
+
+def _http2_available() -> bool:
+    """HTTP/2 support in httpx needs the optional h2 package."""
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+class DolibarrMetrics:
+    """
+    Counters for Dolibarr API usage.
+    
+    "requests" counts HTTP round trips actually made; "round_trips_saved"
+    counts the ones avoided by lean writes and cache hits.
+    """
+    
+    def __init__(self):
+        self.counts = Counter()
+    
+    def incr(self, key: str, amount: int = 1) -> None:
+        self.counts[key] += amount
+    
+    def to_dict(self) -> Dict[str, int]:
+        return dict(self.counts)
+
+
+# Metrics of the operation running in the current task (e.g. a sync job);
+# tasks spawned from it inherit the same collector
+_scoped_metrics: ContextVar[Optional[DolibarrMetrics]] = ContextVar("dolibarr_metrics", default=None)
+
+
+@contextmanager
+def track_metrics(metrics: DolibarrMetrics):
+    """
+    Additionally record every Dolibarr call made inside the block into `metrics`.
+    """
+    token = _scoped_metrics.set(metrics)
+    try:
+        yield metrics
+    finally:
+        _scoped_metrics.reset(token)
+
+
+def dolibarr_user_data(user) -> Dict[str, Any]:
+    """
+    Map a FRIS user to the user data dict expected by the third party methods.
+    """
+    return {
+        "userName": user.userName,
+        "userEmail": user.userEmail,
+        "department": user.department,
+        "college": user.college,
+        "rank": user.rank
+    }
+
+
+def third_party_fields(user_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Map user data to the Dolibarr third party fields FRIS keeps in sync.
+    """
+    third_party_data = {
+        "name": user_data.get("userName") or user_data.get("full_name", ""),
+        "name_alias": f"Faculty - {user_data.get('department')}",
+        "email": user_data.get("userEmail") or user_data.get("email", ""),
+    }
+    
+    # Add department and college as a note
+    if user_data.get('department') or user_data.get('college') or user_data.get('rank'):
+        third_party_data["note_private"] = f"Department: {user_data.get('department', '')}\nCollege: {user_data.get('college', '')}\nRank: {user_data.get('rank', '')}"
+    
+    # Add department as a custom field if available
+    if user_data.get('department'):
+        third_party_data["array_options"] = {
+            "options_department": user_data.get('department')
+        }
+    
+    return third_party_data
+
+
+def third_party_payload_hash(user_data: Dict[str, Any]) -> str:
+    """
+    Stable content hash of the third party fields mapped from user data.
+    """
+    encoded = json.dumps(third_party_fields(user_data), sort_keys=True, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def third_party_matches(record: Dict[str, Any], user_data: Dict[str, Any]) -> bool:
+    """
+    Whether a Dolibarr record already holds the fields FRIS would push for this user.
+    
+    Fields missing from the record (e.g. not exposed by the list endpoint) are not compared.
+    """
+    expected = third_party_fields(user_data)
+    for key, value in expected.items():
+        if key not in record:
+            continue
+        if key == "array_options":
+            remote = (record.get("array_options") or {}).get("options_department")
+            if (remote or "") != (value.get("options_department") or ""):
+                return False
+        elif (record.get(key) or "") != (value or ""):
+            return False
+    return True
+
+
+class ThirdPartyCache:
+    """
+    Local read-through mirror of Dolibarr third parties.
+    
+    Records are keyed by ID, with a secondary index from lowercased email
+    to ID. Both indexes share the same TTL and LRU bound.
+    """
+    
+    def __init__(self, max_entries: int, ttl: float):
+        self._by_id = TTLCache(max_entries, ttl)
+        self._by_email = TTLCache(max_entries, ttl)
+    
+    @staticmethod
+    def _key(third_party_id: Any) -> Optional[int]:
+        try:
+            return int(third_party_id)
+        except (TypeError, ValueError):
+            return None
+    
+    def get(self, third_party_id: Any, allow_partial: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Return a cached record. Records built from lean writes only hold the
+        fields we sent, so they are skipped unless allow_partial is set.
+        """
+        key = self._key(third_party_id)
+        if key is None:
+            return None
+        entry = self._by_id.get(key)
+        if entry is None:
+            return None
+        record, partial = entry
+        if partial and not allow_partial:
+            return None
+        return dict(record)
+    
+    def get_by_email(self, email: str, allow_partial: bool = False) -> Optional[Dict[str, Any]]:
+        if not email:
+            return None
+        third_party_id = self._by_email.get(email.lower())
+        if third_party_id is None:
+            return None
+        record = self.get(third_party_id, allow_partial=True)
+        if record is None or (record.get("email") or "").lower() != email.lower():
+            # The record expired or its email changed since it was indexed
+            self._by_email.pop(email.lower())
+            return None
+        if not allow_partial and self.get(third_party_id) is None:
+            return None
+        return record
+    
+    def put(self, record: Dict[str, Any], partial: bool = False) -> None:
+        key = self._key(record.get("id"))
+        if key is None:
+            return
+        self._by_id.set(key, (dict(record), partial))
+        if record.get("email"):
+            self._by_email.set(record["email"].lower(), key)
+    
+    def invalidate(self, third_party_id: Any) -> None:
+        key = self._key(third_party_id)
+        if key is None:
+            return
+        entry = self._by_id.pop(key)
+        if entry and entry[0].get("email"):
+            self._by_email.pop(entry[0]["email"].lower())
+    
+    def clear(self) -> None:
+        self._by_id.clear()
+        self._by_email.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        return {"by_id": self._by_id.stats(), "by_email": self._by_email.stats()}
+
+
 class DolibarrClient:
     """
     Client for interacting with Dolibarr API, specifically for Third Party management.
+    
+    All requests go through a single pooled httpx.AsyncClient so that
+    connections (and their TCP/TLS handshakes) are reused between calls.
+    Call start() on application startup and close() on shutdown; the pool
+    is also created lazily on first use for scripts that skip start().
     """
     
     def __init__(self):
@@ -19,127 +212,205 @@ class DolibarrClient:
             "Accept": "application/json",
             "Content-Type": "application/json"
         }
-        logger.info(f"Initialized Dolibarr client with API URL: {self.base_url}")
-        logger.info(f"Using API key: {settings.DOLIBARR_API_KEY[:5]}...")
+        self.timeout = httpx.Timeout(settings.DOLIBARR_TIMEOUT)
+        self.limits = httpx.Limits(
+            max_connections=settings.DOLIBARR_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.DOLIBARR_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.DOLIBARR_KEEPALIVE_EXPIRY
+        )
+        self.http2 = settings.DOLIBARR_HTTP2 and _http2_available()
+        self._client: Optional[httpx.AsyncClient] = None
+        self.cache = ThirdPartyCache(settings.DOLIBARR_CACHE_MAX_ENTRIES, settings.DOLIBARR_CACHE_TTL)
+        self.lean_writes = settings.DOLIBARR_LEAN_WRITES
+        self.metrics = DolibarrMetrics()
+        self._warmup_task: Optional[asyncio.Task] = None
+        logger.info("Initialized Dolibarr client with API URL: %s", self.base_url)
+        logger.debug("Using API key: %s...", settings.DOLIBARR_API_KEY[:5])
+
+    async def start(self) -> None:
+        """
+        Open the shared connection pool and, if enabled, warm the cache in the background.
+        """
+        self._get_client()
+        if settings.DOLIBARR_CACHE_WARMUP and self._warmup_task is None:
+            self._warmup_task = asyncio.create_task(self.warm_cache())
+    
+    async def close(self) -> None:
+        """
+        Close the shared connection pool and release all open connections.
+        """
+        if self._warmup_task is not None:
+            self._warmup_task.cancel()
+            await asyncio.gather(self._warmup_task, return_exceptions=True)
+            self._warmup_task = None
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+            logger.info("Closed Dolibarr connection pool")
+        self._client = None
+    
+    def _get_client(self) -> httpx.AsyncClient:
+        """
+        Return the shared client, creating the pool if it is not open yet.
+        """
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                headers=self.headers,
+                timeout=self.timeout,
+                limits=self.limits,
+                http2=self.http2,
+                event_hooks={"request": [self._on_request]}
+            )
+            logger.info(
+                "Opened Dolibarr connection pool (max_connections=%s, max_keepalive=%s, http2=%s)",
+                self.limits.max_connections, self.limits.max_keepalive_connections, self.http2
+            )
+        return self._client
+    
+    def _count(self, key: str, amount: int = 1) -> None:
+        self.metrics.incr(key, amount)
+        scoped = _scoped_metrics.get()
+        if scoped is not None:
+            scoped.incr(key, amount)
+    
+    async def _on_request(self, request: httpx.Request) -> None:
+        self._count("requests")
+        self._count(request.method.lower())
+    
+    def _saved_round_trip(self, reason: str) -> None:
+        self._count("round_trips_saved")
+        self._count(f"saved_by_{reason}")
+    
+    async def _make_request(self, method: str, path: str, **kwargs) -> Any:
+        """
+        Send a request relative to the API base URL and return the decoded JSON body.
+        
+        Errors are returned as {"error": message} rather than raised.
+        """
+        url = f"{self.base_url}/{path.lstrip('/')}"
+        logger.debug("%s request to: %s", method, url)
+        
+        try:
+            response = await self._get_client().request(method, url, **kwargs)
+            response.raise_for_status()
+            return response.json()
+        except httpx.HTTPStatusError as e:
+            logger.error("HTTP error occurred during %s %s: %s", method, url, e)
+            logger.error("Response content: %s", e.response.text)
+            return {"error": str(e)}
+        except Exception as e:
+            logger.error("Error during %s %s: %s", method, url, e)
+            return {"error": str(e)}
 
     
-    async def create_third_party(self, user_data: Dict[str, Any]) -> Dict[str, Any]:
+    async def create_third_party(self, user_data: Dict[str, Any], fetch: Optional[bool] = None) -> Dict[str, Any]:
         """
         Create a new third party in Dolibarr based on user data.
         
         Args:
             user_data: User data including name, email, etc.
+            fetch: Re-fetch the full record after creating it. Defaults to
+                the opposite of DOLIBARR_LEAN_WRITES; lean results contain
+                the fields we sent plus the new ID.
             
         Returns:
             Created third party data including ID
         """
         # Map user data to Dolibarr third party fields
         third_party_data = {
-            "name": user_data.get("userName") or user_data.get("full_name", ""),
-            "name_alias": f"Faculty - {user_data.get('department')}",
             "address": "",
             "zip": "",
             "town": "",
-            "email": user_data.get("userEmail") or user_data.get("email", ""),
             "phone": user_data.get("phone", ""),
             "client": 0,  # Not a client
             "fournisseur": 0,  # Not a supplier
             "status": 1,  # Active
+            **third_party_fields(user_data)
         }
         
-        # Add department and college as a note
-        if user_data.get('department') or user_data.get('college') or user_data.get('rank'):
-            third_party_data["note_private"] = f"Department: {user_data.get('department', '')}\nCollege: {user_data.get('college', '')}\nRank: {user_data.get('rank', '')}"
-        
-        # Add department as a custom field if available
-        if user_data.get('department'):
-            third_party_data["array_options"] = {
-                "options_department": user_data.get('department')
-            }
-        
         url = f"{self.base_url}/thirdparties"
-        logger.info(f"Creating third party with data: {third_party_data}")
-        logger.info(f"POST request to: {url}")
+        logger.debug("Creating third party with data: %s", third_party_data)
+        logger.debug("POST request to: %s", url)
         
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    url, 
-                    json=third_party_data, 
-                    headers=self.headers,
-                    timeout=30.0
-                )
-                response.raise_for_status()
-                
-                # Dolibarr returns the ID as a string/number
-                dolibarr_id = response.text
-                logger.info(f"Successfully created third party with ID: {dolibarr_id}")
-                
+            client = self._get_client()
+            response = await client.post(url, json=third_party_data)
+            response.raise_for_status()
+            
+            # Dolibarr returns the ID as a string/number
+            dolibarr_id = int(response.text.strip().strip('"'))
+            logger.info("Successfully created third party with ID: %s", dolibarr_id)
+            
+            if fetch is None:
+                fetch = not self.lean_writes
+            if fetch:
                 # Fetch the created third party to return complete data
-                return await self.get_third_party(int(dolibarr_id))
-                
+                return await self.get_third_party(dolibarr_id)
+            
+            self._saved_round_trip("lean_write")
+            result = {**third_party_data, "id": dolibarr_id}
+            self.cache.put(result, partial=True)
+            return result
+            
         except httpx.HTTPStatusError as e:
-            logger.error(f"HTTP error occurred while creating third party: {e}")
-            logger.error(f"Response content: {e.response.text}")
-            logger.error(f"Request data: {third_party_data}")
+            logger.error("HTTP error occurred while creating third party: %s", e)
+            logger.error("Response content: %s", e.response.text)
+            logger.error("Request data: %s", third_party_data)
             raise
         except Exception as e:
-            logger.error(f"Error creating third party in Dolibarr: {str(e)}")
+            logger.error("Error creating third party in Dolibarr: %s", e)
             raise
     
-    async def update_third_party(self, third_party_id: int, user_data: Dict[str, Any]) -> Dict[str, Any]:
+    async def update_third_party(self, third_party_id: int, user_data: Dict[str, Any],
+                                 fetch: Optional[bool] = None) -> Dict[str, Any]:
         """
         Update an existing third party in Dolibarr.
         
         Args:
             third_party_id: Dolibarr third party ID
             user_data: Updated user data
+            fetch: Re-fetch the full record after updating it. Defaults to
+                the opposite of DOLIBARR_LEAN_WRITES; lean results merge the
+                fields we sent into the previously cached record.
             
         Returns:
             Updated third party data
         """
         # Map user data to Dolibarr third party fields
-        third_party_data = {
-            "name": user_data.get("userName") or user_data.get("full_name", ""),
-            "name_alias": f"Faculty - {user_data.get('department')}",
-            "email": user_data.get("userEmail") or user_data.get("email", ""),
-        }
-        
-        # Add department and college as a note
-        if user_data.get('department') or user_data.get('college') or user_data.get('rank'):
-            third_party_data["note_private"] = f"Department: {user_data.get('department', '')}\nCollege: {user_data.get('college', '')}\nRank: {user_data.get('rank', '')}"
-        
-        # Add department as a custom field if available
-        if user_data.get('department'):
-            third_party_data["array_options"] = {
-                "options_department": user_data.get('department')
-            }
+        third_party_data = third_party_fields(user_data)
         
         url = f"{self.base_url}/thirdparties/{third_party_id}"
-        logger.info(f"Updating third party {third_party_id} with data: {third_party_data}")
-        logger.info(f"PUT request to: {url}")
+        logger.debug("Updating third party %s with data: %s", third_party_id, third_party_data)
+        logger.debug("PUT request to: %s", url)
+        
+        # Drop the cached copy before writing so readers never see the old record
+        previous = self.cache.get(third_party_id, allow_partial=True)
+        previous_is_full = self.cache.get(third_party_id) is not None
+        self.cache.invalidate(third_party_id)
         
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.put(
-                    url, 
-                    json=third_party_data, 
-                    headers=self.headers,
-                    timeout=30.0
-                )
-                response.raise_for_status()
-                logger.info(f"Successfully updated third party with ID: {third_party_id}")
-                
+            client = self._get_client()
+            response = await client.put(url, json=third_party_data)
+            response.raise_for_status()
+            logger.info("Successfully updated third party with ID: %s", third_party_id)
+            
+            if fetch is None:
+                fetch = not self.lean_writes
+            if fetch:
                 # Return the updated third party
                 return await self.get_third_party(third_party_id)
-                
+            
+            self._saved_round_trip("lean_write")
+            result = {**(previous or {}), **third_party_data, "id": third_party_id}
+            self.cache.put(result, partial=not previous_is_full)
+            return result
+            
         except httpx.HTTPStatusError as e:
-            logger.error(f"HTTP error occurred while updating third party: {e}")
-            logger.error(f"Response content: {e.response.text}")
-            logger.error(f"Request data: {third_party_data}")
+            logger.error("HTTP error occurred while updating third party: %s", e)
+            logger.error("Response content: %s", e.response.text)
+            logger.error("Request data: %s", third_party_data)
             raise
         except Exception as e:
-            logger.error(f"Error updating third party in Dolibarr: {str(e)}")
+            logger.error("Error updating third party in Dolibarr: %s", e)
             raise
     
     async def get_third_party(self, third_party_id: int) -> Dict[str, Any]:
@@ -152,28 +423,32 @@ class DolibarrClient:
         Returns:
             Third party data
         """
+        cached = self.cache.get(third_party_id)
+        if cached is not None:
+            logger.debug("Third party %s served from cache", third_party_id)
+            self._saved_round_trip("cache")
+            return cached
+        
         url = f"{self.base_url}/thirdparties/{third_party_id}"
-        logger.info(f"Fetching third party with ID: {third_party_id}")
-        logger.info(f"GET request to: {url}")
+        logger.debug("Fetching third party with ID: %s", third_party_id)
+        logger.debug("GET request to: %s", url)
         
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    url, 
-                    headers=self.headers,
-                    timeout=30.0
-                )
-                response.raise_for_status()
-                data = response.json()
-                logger.info(f"Successfully retrieved third party with ID: {third_party_id}")
-                return data
-                
+            client = self._get_client()
+            response = await client.get(url)
+            response.raise_for_status()
+            data = response.json()
+            logger.debug("Successfully retrieved third party with ID: %s", third_party_id)
+            if isinstance(data, dict):
+                self.cache.put(data)
+            return data
+            
         except httpx.HTTPStatusError as e:
-            logger.error(f"HTTP error occurred while getting third party: {e}")
-            logger.error(f"Response content: {e.response.text}")
+            logger.error("HTTP error occurred while getting third party: %s", e)
+            logger.error("Response content: %s", e.response.text)
             raise
         except Exception as e:
-            logger.error(f"Error getting third party from Dolibarr: {str(e)}")
+            logger.error("Error getting third party from Dolibarr: %s", e)
             raise
     
     async def get_third_party_by_email(self, email: str) -> Optional[Dict[str, Any]]:
@@ -186,36 +461,40 @@ class DolibarrClient:
         Returns:
             Third party data if found, None otherwise
         """
+        # Callers only need the ID from an email match, so lean records are fine here
+        cached = self.cache.get_by_email(email, allow_partial=True)
+        if cached is not None:
+            logger.debug("Third party with email %s served from cache: ID=%s", email, cached.get('id'))
+            self._saved_round_trip("cache")
+            return cached
+        
         # URL encode the email for safety
         encoded_email = email.replace('@', '%40')
         url = f"{self.base_url}/thirdparties?sqlfilters=(t.email:=:'{encoded_email}')"
         
-        logger.info(f"Searching for third party with email: {email}")
-        logger.info(f"GET request to: {url}")
+        logger.debug("Searching for third party with email: %s", email)
+        logger.debug("GET request to: %s", url)
         
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    url, 
-                    headers=self.headers,
-                    timeout=30.0
-                )
-                response.raise_for_status()
-                data = response.json()
-                
-                if isinstance(data, list) and len(data) > 0:
-                    logger.info(f"Found third party with email {email}: ID={data[0].get('id')}")
-                    return data[0]
-                    
-                logger.info(f"No third party found with email: {email}")
-                return None
+            client = self._get_client()
+            response = await client.get(url)
+            response.raise_for_status()
+            data = response.json()
+            
+            if isinstance(data, list) and len(data) > 0:
+                logger.info("Found third party with email %s: ID=%s", email, data[0].get('id'))
+                self.cache.put(data[0])
+                return data[0]
                 
+            logger.info("No third party found with email: %s", email)
+            return None
+            
         except httpx.HTTPStatusError as e:
-            logger.error(f"HTTP error occurred while searching for third party by email: {e}")
-            logger.error(f"Response content: {e.response.text}")
+            logger.error("HTTP error occurred while searching for third party by email: %s", e)
+            logger.error("Response content: %s", e.response.text)
             return None
         except Exception as e:
-            logger.error(f"Error searching for third party by email: {str(e)}")
+            logger.error("Error searching for third party by email: %s", e)
             return None
     
     async def delete_third_party(self, third_party_id: int) -> bool:
@@ -229,43 +508,95 @@ class DolibarrClient:
             True if deletion was successful
         """
         url = f"{self.base_url}/thirdparties/{third_party_id}"
-        logger.info(f"Deleting third party with ID: {third_party_id}")
-        logger.info(f"DELETE request to: {url}")
+        logger.debug("Deleting third party with ID: %s", third_party_id)
+        logger.debug("DELETE request to: %s", url)
+        
+        self.cache.invalidate(third_party_id)
         
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.delete(
-                    url, 
-                    headers=self.headers,
-                    timeout=30.0
-                )
-                response.raise_for_status()
-                logger.info(f"Successfully deleted third party with ID: {third_party_id}")
-                return True
-                
+            client = self._get_client()
+            response = await client.delete(url)
+            response.raise_for_status()
+            logger.info("Successfully deleted third party with ID: %s", third_party_id)
+            return True
+            
         except httpx.HTTPStatusError as e:
-            logger.error(f"HTTP error occurred while deleting third party: {e}")
-            logger.error(f"Response content: {e.response.text}")
+            logger.error("HTTP error occurred while deleting third party: %s", e)
+            logger.error("Response content: %s", e.response.text)
             raise
         except Exception as e:
-            logger.error(f"Error deleting third party from Dolibarr: {str(e)}")
+            logger.error("Error deleting third party from Dolibarr: %s", e)
             raise
     
     async def list_third_parties(self, limit: int = 100, offset: int = 0) -> List[Dict[str, Any]]:
-        logger.info(f"Listing third parties with limit={limit}, offset={offset}")
+        logger.debug("Listing third parties with limit=%s, offset=%s", limit, offset)
         
         response = await self._make_request("GET", f"thirdparties?limit={limit}&page={offset//limit}")
         
         if "error" in response:
-            logger.error(f"Error listing third parties: {response['error']}")
+            logger.error("Error listing third parties: %s", response['error'])
             return []
         
         if isinstance(response, list):
-            logger.info(f"Successfully retrieved {len(response)} third parties")
+            logger.info("Successfully retrieved %s third parties", len(response))
+            for record in response:
+                if isinstance(record, dict):
+                    self.cache.put(record)
             return response
             
-        logger.warning(f"Unexpected response format from Dolibarr API: {type(response)}")
+        logger.warning("Unexpected response format from Dolibarr API: %s", type(response))
         return []
+    
+    async def list_third_parties_modified_since(self, since: datetime, limit: int = 100,
+                                                page: int = 0) -> List[Dict[str, Any]]:
+        """
+        List third parties modified after `since` (UTC), oldest change first.
+        """
+        stamp = since.strftime("%Y-%m-%d %H:%M:%S")
+        logger.debug("Listing third parties modified since %s (page %s)", stamp, page)
+        
+        response = await self._make_request(
+            "GET",
+            "thirdparties",
+            params={
+                "sortfield": "t.tms",
+                "sortorder": "ASC",
+                "limit": limit,
+                "page": page,
+                "sqlfilters": f"(t.tms:>:'{stamp}')"
+            }
+        )
+        
+        if isinstance(response, list):
+            for record in response:
+                if isinstance(record, dict):
+                    self.cache.put(record)
+            return response
+        
+        # Dolibarr answers 404 when nothing matches the filter
+        if isinstance(response, dict) and "404" in str(response.get("error", "")):
+            return []
+        if isinstance(response, dict) and "error" in response:
+            raise RuntimeError(f"Error listing modified third parties: {response['error']}")
+        return []
+    
+    async def warm_cache(self, page_size: int = 100) -> int:
+        """
+        Page through all third parties and load them into the local cache.
+        
+        Returns:
+            Number of third parties loaded
+        """
+        loaded = 0
+        offset = 0
+        while loaded < settings.DOLIBARR_CACHE_MAX_ENTRIES:
+            page = await self.list_third_parties(limit=page_size, offset=offset)
+            loaded += len(page)
+            if len(page) < page_size:
+                break
+            offset += page_size
+        logger.info("Warmed Dolibarr third party cache with %s records", loaded)
+        return loaded
 
 # Create a singleton instance
 dolibarr_client = DolibarrClient()
@@ -0,0 +1,307 @@
+"""
+Transactional outbox for Dolibarr third party sync.
+
+User writes record a sync intent with enqueue_user_sync() in the same
+database transaction as the user change. OutboxWorker drains the table in
+the background with retries and exponential backoff, so API latency does
+not depend on Dolibarr.
+
+The worker runs inside the API process by default. To run it separately,
+set DOLIBARR_OUTBOX_IN_PROCESS=false for the API and start:
+
+    python -m app.services.dolibarr_outbox
+"""
+import asyncio
+import logging
+import random
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, Any, Optional, List
+import httpx
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+from ..config import settings
+from ..dependencies import SessionLocal
+from ..logging_config import configure_logging
+from ..models import User, DolibarrOutbox
+from .dolibarr_client import dolibarr_client, dolibarr_user_data, third_party_payload_hash
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_user_sync(db: Session, user_id: int, operation: str = "upsert",
+                      third_party_id: Optional[int] = None, email: Optional[str] = None) -> DolibarrOutbox:
+    """
+    Record a pending Dolibarr sync for a user without committing.
+
+    Repeated upserts for the same user coalesce into the pending row, and a
+    delete supersedes any upserts still waiting for that user. A delete
+    without a third party ID keeps the user's email, so the worker can find
+    a third party created by an upsert that was already in flight.
+    """
+    # Sessions don't autoflush, so make earlier intents in this transaction visible
+    db.flush()
+    if operation == "upsert":
+        existing = db.query(DolibarrOutbox).filter(
+            DolibarrOutbox.userId == user_id,
+            DolibarrOutbox.operation == "upsert",
+            DolibarrOutbox.status == "pending"
+        ).first()
+        if existing:
+            return existing
+    elif operation == "delete":
+        db.query(DolibarrOutbox).filter(
+            DolibarrOutbox.userId == user_id,
+            DolibarrOutbox.operation == "upsert",
+            DolibarrOutbox.status.in_(["pending", "failed"])
+        ).delete(synchronize_session=False)
+    else:
+        raise ValueError(f"Unknown outbox operation: {operation}")
+
+    entry = DolibarrOutbox(
+        userId=user_id,
+        operation=operation,
+        dolibarr_third_party_id=third_party_id,
+        user_email=email if third_party_id is None else None,
+        status="pending",
+        attempts=0,
+        next_attempt_at=datetime.utcnow()
+    )
+    db.add(entry)
+    return entry
+
+
+def _backoff_seconds(attempts: int) -> float:
+    delay = settings.DOLIBARR_OUTBOX_BACKOFF_BASE * (2 ** max(0, attempts - 1))
+    delay = min(delay, settings.DOLIBARR_OUTBOX_BACKOFF_MAX)
+    # Jitter so failed entries don't retry in lockstep
+    return delay * random.uniform(0.8, 1.2)
+
+
+async def _sync_upsert(user: Dict[str, Any]) -> Optional[int]:
+    """
+    Push a user snapshot to Dolibarr. Returns a newly linked third party ID.
+    """
+    if user["dolibarr_third_party_id"]:
+        await dolibarr_client.update_third_party(user["dolibarr_third_party_id"], user["data"])
+        return None
+
+    existing_third_party = await dolibarr_client.get_third_party_by_email(user["data"]["userEmail"])
+    if existing_third_party and "id" in existing_third_party:
+        await dolibarr_client.update_third_party(existing_third_party["id"], user["data"])
+        return int(existing_third_party["id"])
+
+    third_party = await dolibarr_client.create_third_party(user["data"])
+    if third_party and "id" in third_party:
+        return int(third_party["id"])
+    return None
+
+
+async def _sync_delete(third_party_id: Optional[int], email: Optional[str] = None) -> None:
+    if not third_party_id and email:
+        existing_third_party = await dolibarr_client.get_third_party_by_email(email)
+        if existing_third_party and "id" in existing_third_party:
+            third_party_id = int(existing_third_party["id"])
+    if not third_party_id:
+        return
+    try:
+        await dolibarr_client.delete_third_party(third_party_id)
+    except httpx.HTTPStatusError as e:
+        # Already gone in Dolibarr counts as done
+        if e.response.status_code != 404:
+            raise
+
+
+def _claim_batch(db: Session) -> List[DolibarrOutbox]:
+    """
+    Lock and mark a batch of due entries as processing.
+
+    SKIP LOCKED lets several worker processes drain the table at once;
+    entries stuck in 'processing' past the lock timeout are picked up again.
+    """
+    now = datetime.utcnow()
+    stale = now - timedelta(seconds=settings.DOLIBARR_OUTBOX_LOCK_TIMEOUT)
+    entries = db.query(DolibarrOutbox).filter(
+        or_(
+            and_(DolibarrOutbox.status == "pending", DolibarrOutbox.next_attempt_at <= now),
+            and_(DolibarrOutbox.status == "processing", DolibarrOutbox.updated_at <= stale)
+        )
+    ).order_by(DolibarrOutbox.outboxId).limit(
+        settings.DOLIBARR_OUTBOX_BATCH_SIZE
+    ).with_for_update(skip_locked=True).all()
+
+    for entry in entries:
+        entry.status = "processing"
+    db.commit()
+    return entries
+
+
+async def drain_outbox_once() -> int:
+    """
+    Process one batch of due outbox entries. Returns the number claimed.
+    """
+    db = SessionLocal()
+    try:
+        entries = _claim_batch(db)
+        if not entries:
+            return 0
+
+        # Coalesce per user: one Dolibarr call covers every entry for that user,
+        # and the latest delete wins over earlier upserts
+        groups: "OrderedDict[int, List[DolibarrOutbox]]" = OrderedDict()
+        for entry in entries:
+            groups.setdefault(entry.userId, []).append(entry)
+
+        work = []
+        for user_id, group in groups.items():
+            deletes = [entry for entry in group if entry.operation == "delete"]
+            lead = deletes[-1] if deletes else group[-1]
+            snapshot = None
+            if lead.operation == "upsert":
+                user = db.query(User).filter(User.userId == user_id).first()
+                if user is not None:
+                    snapshot = {
+                        "userId": user.userId,
+                        "dolibarr_third_party_id": user.dolibarr_third_party_id,
+                        "data": dolibarr_user_data(user)
+                    }
+            work.append((lead, group, snapshot))
+
+        semaphore = asyncio.Semaphore(max(1, settings.DOLIBARR_SYNC_CONCURRENCY))
+
+        async def run(lead: DolibarrOutbox, snapshot: Optional[Dict[str, Any]]):
+            async with semaphore:
+                if lead.operation == "delete":
+                    await _sync_delete(lead.dolibarr_third_party_id, lead.user_email)
+                    return None
+                if snapshot is None:
+                    # User was deleted before the upsert ran
+                    return None
+                return await _sync_upsert(snapshot)
+
+        results = await asyncio.gather(
+            *(run(lead, snapshot) for lead, _, snapshot in work),
+            return_exceptions=True
+        )
+
+        orphaned = []
+        for (lead, group, snapshot), result in zip(work, results):
+            if isinstance(result, Exception):
+                lead.attempts = (lead.attempts or 0) + 1
+                lead.last_error = str(result)
+                if lead.attempts >= settings.DOLIBARR_OUTBOX_MAX_ATTEMPTS:
+                    lead.status = "failed"
+                    logger.error(
+                        "Dolibarr %s for user %s failed permanently after %s attempts: %s",
+                        lead.operation, lead.userId, lead.attempts, result
+                    )
+                else:
+                    lead.status = "pending"
+                    lead.next_attempt_at = datetime.utcnow() + timedelta(seconds=_backoff_seconds(lead.attempts))
+                    logger.warning(
+                        "Dolibarr %s for user %s failed (attempt %s), retrying at %s: %s",
+                        lead.operation, lead.userId, lead.attempts, lead.next_attempt_at, result
+                    )
+                for entry in group:
+                    if entry is not lead:
+                        db.delete(entry)
+                continue
+
+            if snapshot is not None:
+                # Record what was pushed so delta syncs skip this user until it changes
+                values = {
+                    User.dolibarr_synced_hash: third_party_payload_hash(snapshot["data"]),
+                    User.dolibarr_synced_at: datetime.utcnow()
+                }
+                if result is not None:
+                    values[User.dolibarr_third_party_id] = result
+                updated = db.query(User).filter(User.userId == snapshot["userId"]).update(
+                    values,
+                    synchronize_session=False
+                )
+                if not updated and result is not None:
+                    # The user was deleted while the upsert ran, before its third party was linked
+                    orphaned.append((snapshot["userId"], result))
+            for entry in group:
+                db.delete(entry)
+
+        for user_id, third_party_id in orphaned:
+            logger.info("User %s was deleted during its Dolibarr upsert, queueing delete of third party %s",
+                        user_id, third_party_id)
+            enqueue_user_sync(db, user_id, "delete", third_party_id)
+
+        db.commit()
+        if orphaned:
+            outbox_worker.notify()
+        return len(entries)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+class OutboxWorker:
+    """
+    Background asyncio task that drains the Dolibarr outbox.
+    """
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+    async def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self.run())
+            logger.info("Started Dolibarr outbox worker")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+            logger.info("Stopped Dolibarr outbox worker")
+
+    def notify(self) -> None:
+        """
+        Wake the worker after new entries were committed.
+        """
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def run(self) -> None:
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        while True:
+            self._wakeup.clear()
+            try:
+                claimed = await drain_outbox_once()
+            except Exception as e:
+                logger.error("Error draining Dolibarr outbox: %s", e)
+                claimed = 0
+
+            # A full batch means there is probably more work waiting
+            if claimed >= settings.DOLIBARR_OUTBOX_BATCH_SIZE:
+                continue
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=settings.DOLIBARR_OUTBOX_POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+
+
+# Create a singleton instance
+outbox_worker = OutboxWorker()
+
+
+async def main():
+    await dolibarr_client.start()
+    try:
+        await outbox_worker.run()
+    finally:
+        await dolibarr_client.close()
+
+
+if __name__ == "__main__":
+    configure_logging()
+    asyncio.run(main())
@@ -0,0 +1,411 @@
+import asyncio
+import json
+import logging
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, Any, Optional, List
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+from ..config import settings
+from ..dependencies import SessionLocal, invalidate_cached_user
+from ..models import User, SyncState
+from .dolibarr_client import (
+    dolibarr_client, dolibarr_user_data, third_party_payload_hash, third_party_matches,
+    DolibarrMetrics, track_metrics
+)
+
+logger = logging.getLogger(__name__)
+
+# Keep at most this many finished jobs around for status lookups
+MAX_FINISHED_JOBS = 50
+# Cap on per-job error details returned to clients
+MAX_JOB_ERRORS = 100
+# sync_state key holding the last Dolibarr modification time we pulled
+PULL_WATERMARK_KEY = "dolibarr_thirdparty_watermark"
+# sync_state key prefix of each job's last saved status, readable from every worker
+JOB_STATE_KEY_PREFIX = "dolibarr_sync_job:"
+WATERMARK_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+class TokenBucket:
+    """
+    Async token bucket rate limiter.
+
+    Tokens refill continuously at `rate` per second up to `capacity`;
+    acquire() waits until a token is available.
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        async with self.lock:
+            self._refill()
+            while self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= 1
+
+
+class SyncJob:
+    """
+    State of a single bulk sync run, exposed through the sync job endpoints.
+    """
+
+    def __init__(self, full: bool = False):
+        self.job_id = uuid.uuid4().hex
+        self.status = "queued"
+        self.full = full
+        self.total = 0
+        self.processed = 0
+        self.created = 0
+        self.updated = 0
+        self.skipped = 0
+        self.pulled = 0
+        self.failed = 0
+        self.errors: List[Dict[str, Any]] = []
+        self.created_at = datetime.utcnow()
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self.task: Optional[asyncio.Task] = None
+        # Dolibarr calls made by this job, including round trips saved
+        self.metrics = DolibarrMetrics()
+
+    def record_error(self, user_name: str, error: str) -> None:
+        self.failed += 1
+        if len(self.errors) < MAX_JOB_ERRORS:
+            self.errors.append({"user": user_name, "error": error})
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "full": self.full,
+            "total": self.total,
+            "processed": self.processed,
+            "created": self.created,
+            "updated": self.updated,
+            "skipped": self.skipped,
+            "pulled": self.pulled,
+            "failed": self.failed,
+            "errors": self.errors,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "metrics": self.metrics.to_dict()
+        }
+
+
+# In-process job registry, keyed by job ID. Jobs also save their status to
+# sync_state, so a status poll landing on another worker process finds them.
+sync_jobs: Dict[str, SyncJob] = {}
+
+
+def _job_state_key(job_id: str) -> str:
+    return JOB_STATE_KEY_PREFIX + job_id
+
+
+def save_sync_job(db: Session, job: SyncJob) -> None:
+    """
+    Store the job's current status in sync_state; the caller commits.
+    """
+    key = _job_state_key(job.job_id)
+    state = db.get(SyncState, key)
+    if state is None:
+        state = SyncState(key=key)
+        db.add(state)
+    state.value = json.dumps(job.to_dict(), default=lambda value: value.isoformat())
+
+
+def _prune_saved_jobs(db: Session) -> None:
+    # Saved statuses beyond the newest MAX_FINISHED_JOBS, from any worker
+    stale = db.query(SyncState.key).filter(
+        SyncState.key.startswith(JOB_STATE_KEY_PREFIX)
+    ).order_by(SyncState.updated_at.desc()).offset(MAX_FINISHED_JOBS).all()
+    if stale:
+        db.query(SyncState).filter(SyncState.key.in_([key for key, in stale])).delete(synchronize_session=False)
+
+
+def get_sync_job(db: Session, job_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Status of a sync job started by this or any other worker process.
+    """
+    job = sync_jobs.get(job_id)
+    if job is not None:
+        return job.to_dict()
+    state = db.get(SyncState, _job_state_key(job_id))
+    if state is None or not state.value:
+        return None
+    return json.loads(state.value)
+
+
+def _prune_finished_jobs() -> None:
+    finished = [job for job in sync_jobs.values() if job.status in ("completed", "failed")]
+    finished.sort(key=lambda job: job.finished_at or job.created_at)
+    for job in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+        del sync_jobs[job.job_id]
+
+
+def start_sync_all_job(full: bool = False) -> SyncJob:
+    """
+    Schedule a bulk sync and return immediately with the job.
+
+    By default only users whose Dolibarr payload changed since their last
+    successful sync are pushed; full=True pushes every user.
+    """
+    _prune_finished_jobs()
+    job = SyncJob(full=full)
+    sync_jobs[job.job_id] = job
+    with SessionLocal() as db:
+        save_sync_job(db, job)
+        db.commit()
+    with track_metrics(job.metrics):
+        # The task copies the current context, so its Dolibarr calls count towards the job
+        job.task = asyncio.create_task(run_sync_job(job))
+    return job
+
+
+def _get_watermark(db: Session) -> Optional[datetime]:
+    state = db.query(SyncState).filter(SyncState.key == PULL_WATERMARK_KEY).first()
+    if state is None or not state.value:
+        return None
+    return datetime.strptime(state.value, WATERMARK_FORMAT)
+
+
+def _set_watermark(db: Session, watermark: datetime) -> None:
+    state = db.query(SyncState).filter(SyncState.key == PULL_WATERMARK_KEY).first()
+    if state is None:
+        state = SyncState(key=PULL_WATERMARK_KEY)
+        db.add(state)
+    state.value = watermark.strftime(WATERMARK_FORMAT)
+
+
+def _modified_at(record: Dict[str, Any]) -> Optional[datetime]:
+    """
+    Modification time of a Dolibarr record; the REST API returns a Unix timestamp.
+    """
+    value = record.get("date_modification") or record.get("tms")
+    if value in (None, ""):
+        return None
+    try:
+        return datetime.utcfromtimestamp(int(value))
+    except (TypeError, ValueError):
+        pass
+    try:
+        return datetime.strptime(str(value), WATERMARK_FORMAT)
+    except ValueError:
+        return None
+
+
+async def pull_dolibarr_changes(db: Session, job: SyncJob) -> None:
+    """
+    Reconcile third parties modified in Dolibarr since the last pull.
+
+    FRIS stays the source of truth for the mapped fields: a remote edit
+    clears the user's synced hash so the push phase restores it, and
+    unlinked users are linked by email. The watermark only advances after
+    the whole window was read, and each run re-reads
+    DOLIBARR_SYNC_PULL_OVERLAP seconds so same-second edits are not lost.
+    """
+    watermark = _get_watermark(db)
+    since = (watermark or datetime(1970, 1, 1)) - timedelta(seconds=settings.DOLIBARR_SYNC_PULL_OVERLAP)
+    page_size = max(1, settings.DOLIBARR_SYNC_CHUNK_SIZE)
+    newest = watermark
+    page = 0
+
+    while True:
+        records = await dolibarr_client.list_third_parties_modified_since(since, limit=page_size, page=page)
+        if not records:
+            break
+
+        ids = [int(record["id"]) for record in records if record.get("id")]
+        emails = [record["email"] for record in records if record.get("email")]
+        users = db.query(User).filter(
+            or_(User.dolibarr_third_party_id.in_(ids), User.userEmail.in_(emails))
+        ).all()
+        by_id = {user.dolibarr_third_party_id: user for user in users if user.dolibarr_third_party_id}
+        by_email = {user.userEmail: user for user in users}
+
+        for record in records:
+            modified = _modified_at(record)
+            if modified and (newest is None or modified > newest):
+                newest = modified
+
+            user = by_id.get(int(record["id"])) if record.get("id") else None
+            if user is None:
+                user = by_email.get(record.get("email"))
+                if user is None or user.dolibarr_third_party_id:
+                    continue
+                # Adopt the existing third party instead of creating a duplicate
+                db.query(User).filter(User.userId == user.userId).update(
+                    {User.dolibarr_third_party_id: int(record["id"]), User.dolibarr_synced_hash: None},
+                    synchronize_session=False
+                )
+                job.pulled += 1
+                continue
+
+            if not third_party_matches(record, dolibarr_user_data(user)):
+                db.query(User).filter(User.userId == user.userId).update(
+                    {User.dolibarr_synced_hash: None},
+                    synchronize_session=False
+                )
+                job.pulled += 1
+
+        db.commit()
+        if len(records) < page_size:
+            break
+        page += 1
+
+    if newest is not None and newest != watermark:
+        _set_watermark(db, newest)
+        db.commit()
+    logger.info("Sync job %s: pulled %s Dolibarr-side changes (watermark %s)", job.job_id, job.pulled, newest)
+
+
+async def run_sync_job(job: SyncJob) -> None:
+    """
+    Push changed users to Dolibarr with bounded concurrency.
+
+    Dolibarr-side changes are pulled first (see pull_dolibarr_changes).
+    A user is pushed when its payload hash differs from the hash stored at
+    its last successful sync, or always when the job is a full sync. Up to
+    DOLIBARR_SYNC_CONCURRENCY users are synced at the same time and request
+    starts are paced by a token bucket (DOLIBARR_SYNC_RATE per second,
+    bursts of DOLIBARR_SYNC_BURST). New third party IDs are written
+    back in chunks of DOLIBARR_SYNC_CHUNK_SIZE with one commit per chunk,
+    together with the synced hash of every user that went through.
+    """
+    db = SessionLocal()
+    job.status = "running"
+    job.started_at = datetime.utcnow()
+
+    try:
+        save_sync_job(db, job)
+        db.commit()
+        if settings.DOLIBARR_SYNC_PULL:
+            try:
+                await pull_dolibarr_changes(db, job)
+            except Exception as e:
+                # A failed pull only delays reconciliation; still push local changes
+                db.rollback()
+                logger.error("Sync job %s: error pulling Dolibarr changes: %s", job.job_id, e)
+                job.record_error("*", f"Pull failed: {str(e)}")
+
+        # Load plain rows so no ORM state is shared across awaits
+        query = db.query(
+            User.userId, User.userName, User.userEmail, User.department,
+            User.college, User.rank, User.dolibarr_third_party_id, User.dolibarr_payload_hash
+        )
+        if not job.full:
+            query = query.filter(or_(
+                User.dolibarr_synced_hash.is_(None),
+                User.dolibarr_payload_hash.is_(None),
+                User.dolibarr_payload_hash != User.dolibarr_synced_hash
+            ))
+        users = query.order_by(User.userId).all()
+        job.total = len(users)
+        job.skipped = db.query(User).count() - job.total
+        logger.info(
+            "Sync job %s: starting sync of %s users with Dolibarr (%s unchanged)",
+            job.job_id, job.total, job.skipped
+        )
+
+        semaphore = asyncio.Semaphore(max(1, settings.DOLIBARR_SYNC_CONCURRENCY))
+        bucket = TokenBucket(settings.DOLIBARR_SYNC_RATE, settings.DOLIBARR_SYNC_BURST)
+        chunk_size = max(1, settings.DOLIBARR_SYNC_CHUNK_SIZE)
+        pending_ids: List[Dict[str, Any]] = []
+
+        def flush_ids() -> None:
+            if not pending_ids:
+                return
+            db.bulk_update_mappings(User, list(pending_ids))
+            save_sync_job(db, job)
+            db.commit()
+            # Bulk mappings bypass the session hooks that keep the token cache fresh
+            for mapping in pending_ids:
+                invalidate_cached_user(mapping["userId"])
+            logger.info("Sync job %s: stored sync state for %s users", job.job_id, len(pending_ids))
+            pending_ids.clear()
+
+        async def sync_one(user) -> None:
+            async with semaphore:
+                await bucket.acquire()
+                try:
+                    user_data = dolibarr_user_data(user)
+                    payload_hash = third_party_payload_hash(user_data)
+                    mapping = {
+                        "userId": user.userId,
+                        "dolibarr_synced_hash": payload_hash,
+                        "dolibarr_synced_at": datetime.utcnow()
+                    }
+                    if user.dolibarr_payload_hash is None:
+                        # Rows written before change tracking existed
+                        mapping["dolibarr_payload_hash"] = payload_hash
+                    if user.dolibarr_third_party_id:
+                        await dolibarr_client.update_third_party(user.dolibarr_third_party_id, user_data)
+                        job.updated += 1
+                    else:
+                        third_party = await dolibarr_client.create_third_party(user_data)
+                        if third_party and "id" in third_party:
+                            mapping["dolibarr_third_party_id"] = int(third_party["id"])
+                        job.created += 1
+                    pending_ids.append(mapping)
+                except Exception as e:
+                    logger.error("Sync job %s: error syncing user %s: %s", job.job_id, user.userName, e)
+                    job.record_error(user.userName, str(e))
+                finally:
+                    job.processed += 1
+
+            if len(pending_ids) >= chunk_size:
+                flush_ids()
+
+        await asyncio.gather(*(sync_one(user) for user in users))
+        flush_ids()
+
+        job.status = "failed" if job.total and job.failed == job.total else "completed"
+        logger.info(
+            "Sync job %s: %s - %s created, %s updated, %s unchanged, %s failed",
+            job.job_id, job.status, job.created, job.updated, job.skipped, job.failed
+        )
+    except asyncio.CancelledError:
+        job.status = "failed"
+        job.record_error("*", "Sync job was cancelled")
+        raise
+    except Exception as e:
+        db.rollback()
+        job.status = "failed"
+        job.record_error("*", str(e))
+        logger.error("Sync job %s aborted: %s", job.job_id, e)
+    finally:
+        job.finished_at = datetime.utcnow()
+        try:
+            save_sync_job(db, job)
+            _prune_saved_jobs(db)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.error("Sync job %s: could not save final status: %s", job.job_id, e)
+        db.close()
+
+
+async def cancel_sync_jobs() -> None:
+    """
+    Cancel running sync jobs; called on application shutdown.
+    """
+    tasks = [job.task for job in sync_jobs.values() if job.task and not job.task.done()]
+    for task in tasks:
+        task.cancel()
+    if tasks:
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,114 @@
+"""
+Profile loading and ETags for GET /profile/me.
+
+The profile version is the user's updated_at plus, for each child table
+(degrees, research interests, affiliations, research experiences), the
+newest updated_at and the row count, so edits, inserts and deletes all
+change it. Computing it is one small indexed query; a client sending the
+matching If-None-Match gets a 304 before any child rows are loaded.
+
+On PostgreSQL and SQLite a full load is a single query returning the user
+row, the version and each collection aggregated into a JSON array; other
+databases fall back to selectin loading.
+"""
+import hashlib
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from sqlalchemy import JSON, func, literal_column, select
+from sqlalchemy.orm import Session, selectinload
+from ..models import User, Degree, ResearchInterest, Affiliations, ResearchExperience
+
+# ProfileResponse field -> child model
+PROFILE_CHILDREN = {
+    "degrees": Degree,
+    "research_interests": ResearchInterest,
+    "affiliations": Affiliations,
+    "research_experiences": ResearchExperience
+}
+
+# Browsers may keep the profile but must revalidate it on every use
+PROFILE_CACHE_CONTROL = "private, no-cache"
+
+
+def _version_columns(user_id: int) -> List:
+    columns = [select(User.updated_at).where(User.userId == user_id).scalar_subquery()]
+    for model in PROFILE_CHILDREN.values():
+        columns.append(select(func.max(model.updated_at)).where(model.userId == user_id).scalar_subquery())
+        columns.append(select(func.count()).where(model.userId == user_id).scalar_subquery())
+    return columns
+
+
+def _etag(user_id: int, version: Sequence) -> str:
+    digest = hashlib.sha1(repr((user_id, tuple(version))).encode()).hexdigest()
+    return f'W/"{digest}"'
+
+
+def profile_etag(db: Session, user_id: int) -> str:
+    """
+    Weak ETag for a user's profile, from one aggregate query.
+    """
+    return _etag(user_id, db.execute(select(*_version_columns(user_id))).one())
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Weak comparison of an If-None-Match header against an ETag.
+    """
+    if not if_none_match:
+        return False
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+def _json_rows(dialect: str, model, user_id: int):
+    """
+    Scalar subquery returning a user's rows of `model` as a JSON array of objects.
+    """
+    table = model.__table__
+    pairs = []
+    for column in table.columns:
+        pairs.extend((literal_column(f"'{column.name}'"), column))
+
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import aggregate_order_by
+        rows = func.json_agg(aggregate_order_by(func.json_build_object(*pairs), *table.primary_key.columns))
+        rows = func.coalesce(rows, literal_column("'[]'::json"), type_=JSON)
+    else:
+        # SQLite walks the userId index, so rows come out in primary key order
+        rows = func.json_group_array(func.json_object(*pairs), type_=JSON)
+    return select(rows).where(model.userId == user_id).scalar_subquery()
+
+
+def load_profile(db: Session, user_id: int) -> Tuple[str, User, Dict[str, Any]]:
+    """
+    ETag, user row and the four profile collections for a user, keyed by ProfileResponse field.
+
+    The user is read in the same query as the version, so the body always
+    matches its ETag, even when the caller's User is a cached token snapshot.
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        version = [User.updated_at, *_version_columns(user_id)[1:]]
+        row = db.execute(select(User, *version, *[
+            _json_rows(dialect, model, user_id).label(key)
+            for key, model in PROFILE_CHILDREN.items()
+        ]).where(User.userId == user_id).execution_options(populate_existing=True)).one()
+        return (
+            _etag(user_id, row[1:1 + len(version)]),
+            row[0],
+            {key: row._mapping[key] for key in PROFILE_CHILDREN}
+        )
+
+    # Portable fallback: one IN query per collection
+    etag = profile_etag(db, user_id)
+    user = db.query(User).options(
+        *[selectinload(getattr(User, key)) for key in PROFILE_CHILDREN]
+    ).filter(User.userId == user_id).populate_existing().one()
+    return etag, user, {key: getattr(user, key) for key in PROFILE_CHILDREN}
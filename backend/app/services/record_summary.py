@@ -0,0 +1,126 @@
+"""
+Record counts behind the dashboard summary, with a short-lived cache.
+
+A user's own counts come from one grouped query over the approval_inbox
+view, and the pending-approval total for a department head, dean or
+admin from the precomputed approval_counters rows. Both are cached for RECORD_SUMMARY_CACHE_TTL
+seconds. Commits that add, change or delete records invalidate the
+submitter's entry and the scope totals, so the TTL only bounds staleness
+across processes.
+"""
+import logging
+from typing import Dict, Any, Hashable, Set
+from sqlalchemy import case, event, func
+from sqlalchemy.orm import Session
+from ..cache import TTLCache
+from ..config import settings
+from ..dependencies import SessionLocal
+from ..models import User, ResearchActivities, CourseAndSET, Extension, Authorship, approval_inbox
+from .approval_counters import scope_count
+
+logger = logging.getLogger(__name__)
+
+# Summary section for each record type in the approval_inbox view
+SUMMARY_SECTIONS = {
+    "research_activity": "publications",
+    "course": "teaching",
+    "extension": "extensions",
+    "authorship": "authorships"
+}
+
+RECORD_MODELS = (ResearchActivities, CourseAndSET, Extension, Authorship)
+
+# userId -> {section: {"count", "pending"}}
+user_counts_cache = TTLCache(settings.RECORD_SUMMARY_CACHE_MAX_ENTRIES, settings.RECORD_SUMMARY_CACHE_TTL)
+# ("department", name) / ("college", name) / ("all",) -> pending total
+scope_pending_cache = TTLCache(settings.RECORD_SUMMARY_CACHE_MAX_ENTRIES, settings.RECORD_SUMMARY_CACHE_TTL)
+
+
+def approval_scope(user: User) -> Hashable:
+    """
+    Scope of submissions whose pending total a user sees, or None.
+    Department heads see their department, deans their college, admins everything.
+    """
+    if user.isDepartmentHead:
+        return ("department", user.department)
+    if user.isDean:
+        return ("college", user.college)
+    if user.role == "admin":
+        return ("all",)
+    return None
+
+
+def load_user_counts(db: Session, user_id: int) -> Dict[str, Dict[str, int]]:
+    """
+    Total and pending record counts per summary section, in one query.
+    """
+    rows = db.query(
+        approval_inbox.c.record_type,
+        func.count(),
+        func.sum(case((approval_inbox.c.status == "pending", 1), else_=0))
+    ).filter(
+        approval_inbox.c.submitter_id == user_id
+    ).group_by(approval_inbox.c.record_type).all()
+
+    counts = {section: {"count": 0, "pending": 0} for section in SUMMARY_SECTIONS.values()}
+    for record_type, count, pending in rows:
+        counts[SUMMARY_SECTIONS[record_type]] = {"count": count or 0, "pending": int(pending or 0)}
+    return counts
+
+
+def load_scope_pending(db: Session, scope: Hashable) -> int:
+    """
+    Pending records submitted by users in a scope, read from approval_counters.
+    """
+    return scope_count(db, scope[0], scope[1] if len(scope) > 1 else None, "pending")
+
+
+def get_record_summary(db: Session, user: User) -> Dict[str, Any]:
+    counts = user_counts_cache.get(user.userId)
+    if counts is None:
+        counts = load_user_counts(db, user.userId)
+        user_counts_cache.set(user.userId, counts)
+
+    pending_approvals = 0
+    scope = approval_scope(user)
+    if scope is not None:
+        pending_approvals = scope_pending_cache.get(scope)
+        if pending_approvals is None:
+            pending_approvals = load_scope_pending(db, scope)
+            scope_pending_cache.set(scope, pending_approvals)
+
+    return {**counts, "pendingApprovals": pending_approvals}
+
+
+def invalidate_record_summary(*user_ids: int) -> None:
+    """
+    Drop cached summaries after records of these submitters changed.
+
+    Commits through SessionLocal call this automatically; use it directly
+    after writes that bypass the ORM unit of work (bulk updates, raw SQL).
+    """
+    for user_id in user_ids:
+        user_counts_cache.pop(user_id)
+    # Scope totals are few and cheap to rebuild; a submitter may count towards several
+    scope_pending_cache.clear()
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _collect_changed_submitters(session: Session, flush_context) -> None:
+    changed: Set[int] = session.info.setdefault("record_summary_users", set())
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        # User changes matter too: moving department or college changes scope totals
+        if isinstance(instance, (*RECORD_MODELS, User)) and instance.userId is not None:
+            changed.add(instance.userId)
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _invalidate_after_commit(session: Session) -> None:
+    changed = session.info.pop("record_summary_users", None)
+    if changed:
+        invalidate_record_summary(*changed)
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _discard_after_rollback(session: Session) -> None:
+    session.info.pop("record_summary_users", None)
@@ -0,0 +1,147 @@
+"""
+SDG tags on research activities, replaced as a whole set.
+
+replace_sdg_tags() diffs the requested SDGs and subsets against the rows
+already stored for a research activity and applies the difference with
+bulk INSERT, UPDATE and DELETE statements. It does not commit, so callers
+can apply the tags in the same transaction as the publication itself.
+"""
+from typing import Dict, List, Sequence, Tuple
+from fastapi import HTTPException, status
+from sqlalchemy import delete, insert, or_, select, update
+from sqlalchemy.orm import Session
+from ..models import SDG, SDGSubset
+from ..schemas import SDGCreate
+
+# Predefined SDGs for reference
+SDG_REFERENCE = [
+    {"sdgNum": 1, "sdgDesc": "No Poverty"},
+    {"sdgNum": 2, "sdgDesc": "Zero Hunger"},
+    {"sdgNum": 3, "sdgDesc": "Good Health and Well-being"},
+    {"sdgNum": 4, "sdgDesc": "Quality Education"},
+    {"sdgNum": 5, "sdgDesc": "Gender Equality"},
+    {"sdgNum": 6, "sdgDesc": "Clean Water and Sanitation"},
+    {"sdgNum": 7, "sdgDesc": "Affordable and Clean Energy"},
+    {"sdgNum": 8, "sdgDesc": "Decent Work and Economic Growth"},
+    {"sdgNum": 9, "sdgDesc": "Industry, Innovation and Infrastructure"},
+    {"sdgNum": 10, "sdgDesc": "Reduced Inequality"},
+    {"sdgNum": 11, "sdgDesc": "Sustainable Cities and Communities"},
+    {"sdgNum": 12, "sdgDesc": "Responsible Consumption and Production"},
+    {"sdgNum": 13, "sdgDesc": "Climate Action"},
+    {"sdgNum": 14, "sdgDesc": "Life Below Water"},
+    {"sdgNum": 15, "sdgDesc": "Life on Land"},
+    {"sdgNum": 16, "sdgDesc": "Peace, Justice and Strong Institutions"},
+    {"sdgNum": 17, "sdgDesc": "Partnerships for the Goals"}
+]
+
+SDG_DESCRIPTIONS = {sdg["sdgNum"]: sdg["sdgDesc"] for sdg in SDG_REFERENCE}
+
+# sdgNum -> (sdgDesc, {sdgSNum: sdgSDesc})
+TagSet = Dict[int, Tuple[str, Dict[int, str]]]
+
+
+def validate_sdg_tags(sdgs: Sequence[SDGCreate]) -> TagSet:
+    """
+    Check SDG numbers against SDG_REFERENCE and reject duplicates.
+    Descriptions are taken from the reference list.
+    """
+    tags: TagSet = {}
+    for sdg in sdgs:
+        if sdg.sdgNum not in SDG_DESCRIPTIONS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown SDG number: {sdg.sdgNum}"
+            )
+        if sdg.sdgNum in tags:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"SDG {sdg.sdgNum} listed more than once"
+            )
+
+        subsets: Dict[int, str] = {}
+        for subset in sdg.subsets or []:
+            if subset.sdgSNum in subsets:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Subset {subset.sdgSNum} listed more than once for SDG {sdg.sdgNum}"
+                )
+            subsets[subset.sdgSNum] = subset.sdgSDesc
+        tags[sdg.sdgNum] = (SDG_DESCRIPTIONS[sdg.sdgNum], subsets)
+    return tags
+
+
+def replace_sdg_tags(db: Session, research_id: int, tags: TagSet) -> None:
+    """
+    Make the research activity's SDGs and subsets exactly `tags`, without committing.
+    """
+    existing_sdgs: Dict[int, Tuple[int, str]] = {}
+    stale_sdg_ids: List[int] = []
+    for sdg_id, sdg_num, sdg_desc in db.execute(
+        select(SDG.sdgId, SDG.sdgNum, SDG.sdgDesc).where(SDG.raId == research_id).order_by(SDG.sdgId)
+    ):
+        # Rows added one at a time could repeat an SDG; keep the first
+        if sdg_num in tags and sdg_num not in existing_sdgs:
+            existing_sdgs[sdg_num] = (sdg_id, sdg_desc)
+        else:
+            stale_sdg_ids.append(sdg_id)
+
+    kept_sdg_ids = {sdg_id: sdg_num for sdg_num, (sdg_id, _) in existing_sdgs.items()}
+    existing_subsets: Dict[int, Dict[int, Tuple[int, str]]] = {sdg_id: {} for sdg_id in kept_sdg_ids}
+    stale_subset_ids: List[int] = []
+    if kept_sdg_ids:
+        for subset_id, sdg_id, subset_num, subset_desc in db.execute(
+            select(SDGSubset.sdgSId, SDGSubset.sdgId, SDGSubset.sdgSNum, SDGSubset.sdgSDesc)
+            .where(SDGSubset.sdgId.in_(list(kept_sdg_ids)))
+            .order_by(SDGSubset.sdgSId)
+        ):
+            wanted = tags[kept_sdg_ids[sdg_id]][1]
+            if subset_num in wanted and subset_num not in existing_subsets[sdg_id]:
+                existing_subsets[sdg_id][subset_num] = (subset_id, subset_desc)
+            else:
+                stale_subset_ids.append(subset_id)
+
+    # Deletes: subsets of removed SDGs, removed subsets, then the SDGs
+    if stale_sdg_ids or stale_subset_ids:
+        db.execute(
+            delete(SDGSubset).where(or_(
+                SDGSubset.sdgId.in_(stale_sdg_ids),
+                SDGSubset.sdgSId.in_(stale_subset_ids)
+            )),
+            execution_options={"synchronize_session": False}
+        )
+    if stale_sdg_ids:
+        db.execute(delete(SDG).where(SDG.sdgId.in_(stale_sdg_ids)), execution_options={"synchronize_session": False})
+
+    # SDGs: new ones in one multi-row INSERT, changed descriptions in one UPDATE by primary key
+    sdg_ids = {sdg_num: sdg_id for sdg_num, (sdg_id, _) in existing_sdgs.items()}
+    new_sdgs = [
+        {"raId": research_id, "sdgNum": sdg_num, "sdgDesc": sdg_desc}
+        for sdg_num, (sdg_desc, _) in tags.items() if sdg_num not in existing_sdgs
+    ]
+    if new_sdgs:
+        sdg_ids.update(
+            (sdg_num, sdg_id)
+            for sdg_id, sdg_num in db.execute(insert(SDG).returning(SDG.sdgId, SDG.sdgNum), new_sdgs)
+        )
+    changed_sdgs = [
+        {"sdgId": sdg_id, "sdgDesc": tags[sdg_num][0]}
+        for sdg_num, (sdg_id, sdg_desc) in existing_sdgs.items() if sdg_desc != tags[sdg_num][0]
+    ]
+    if changed_sdgs:
+        db.execute(update(SDG), changed_sdgs)
+
+    # Subsets, the same way
+    new_subsets = []
+    changed_subsets = []
+    for sdg_num, (_, subsets) in tags.items():
+        sdg_id = sdg_ids[sdg_num]
+        stored = existing_subsets.get(sdg_id, {})
+        for subset_num, subset_desc in subsets.items():
+            if subset_num not in stored:
+                new_subsets.append({"sdgId": sdg_id, "sdgSNum": subset_num, "sdgSDesc": subset_desc})
+            elif stored[subset_num][1] != subset_desc:
+                changed_subsets.append({"sdgSId": stored[subset_num][0], "sdgSDesc": subset_desc})
+    if new_subsets:
+        db.execute(insert(SDGSubset), new_subsets)
+    if changed_subsets:
+        db.execute(update(SDGSubset), changed_subsets)
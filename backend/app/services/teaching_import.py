@@ -0,0 +1,316 @@
+"""
+Bulk import of Course and SET records from CSV or XLSX files.
+
+Rows are read one at a time (csv.reader, openpyxl in read-only mode)
+and processed in batches of TEACHING_IMPORT_BATCH_SIZE. Each row is
+validated against CourseAndSETCreate. A record is identified by (userId,
+academicYear, term, courseNum, section), so importing the same export
+again updates records instead of duplicating them:
+
+  * new keys are added with their approval steps; the unit of work sends
+    them as batched INSERT ... RETURNING statements
+  * existing pending or rejected records get the row's values; rejected
+    ones go back through approval (resubmit)
+  * approved records are left alone and the row is reported as an error
+
+Column headers are matched to CourseAndSETCreate fields ignoring case,
+spaces and punctuation ("Academic Year" -> academicYear). Admins may add a
+userEmail column to import records for other faculty; without it, rows
+belong to the importing user. Approval paths are resolved once per
+submitter. teachingPoints is derived from the SET ratings as for records
+entered one at a time (teaching_scores). Each batch is committed on its
+own, so rows before a failure stay imported and a re-run picks up the rest.
+"""
+import codecs
+import csv
+import logging
+import os
+import re
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+from fastapi import HTTPException, status
+from pydantic import ValidationError
+from sqlalchemy import select, tuple_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from ..config import settings
+from ..dependencies import SessionLocal
+from ..models import User, CourseAndSET
+from ..schemas import CourseAndSETBase, CourseAndSETCreate
+from .approval_paths import resolve_approval_path
+from .approvals import new_approval_steps, resubmit
+from .teaching_scores import derive_teaching_points
+
+logger = logging.getLogger(__name__)
+
+# Identity of an imported record
+COURSE_KEY = ("userId", "academicYear", "term", "courseNum", "section")
+
+# Fields a row may set; supporting documents are uploaded per record
+IMPORT_FIELDS = tuple(CourseAndSETBase.model_fields)
+
+SUBMITTER_FIELD = "userEmail"
+
+CourseKey = Tuple[int, str, str, str, str]
+
+
+def _normalize_header(header: Any) -> str:
+    return re.sub(r"[^a-z0-9]", "", str(header or "").lower())
+
+
+_HEADER_FIELDS = {_normalize_header(field): field for field in (*IMPORT_FIELDS, SUBMITTER_FIELD)}
+
+
+def _cell(value: Any) -> Optional[str]:
+    """
+    Cell value as the string a CSV would carry; None for blanks.
+    """
+    if value is None:
+        return None
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    value = str(value).strip()
+    return value or None
+
+
+def _map_headers(headers: List[Any]) -> List[Optional[str]]:
+    fields = [_HEADER_FIELDS.get(_normalize_header(header)) for header in headers]
+    required = {name for name, field in CourseAndSETBase.model_fields.items() if field.is_required()}
+    missing = sorted(required - set(fields))
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Missing columns: {', '.join(missing)}"
+        )
+    return fields
+
+
+def _csv_rows(source: BinaryIO) -> Iterator[List[Any]]:
+    reader = codecs.getreader("utf-8-sig")(source)
+    try:
+        yield from csv.reader(reader)
+    except UnicodeDecodeError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="CSV files must be UTF-8 encoded"
+        )
+
+
+def _xlsx_rows(source: BinaryIO) -> Iterator[List[Any]]:
+    from openpyxl import load_workbook
+    try:
+        workbook = load_workbook(source, read_only=True, data_only=True)
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Not a readable XLSX workbook"
+        )
+    try:
+        # Only the first worksheet is imported
+        for row in workbook.worksheets[0].iter_rows(values_only=True):
+            yield list(row)
+    finally:
+        workbook.close()
+
+
+def read_rows(source: BinaryIO, filename: str) -> Iterator[Tuple[int, Dict[str, Optional[str]]]]:
+    """
+    (row number, {field: value}) for each non-blank data row of a CSV or XLSX file.
+    Row numbers count the header as row 1, as spreadsheets show them.
+    """
+    extension = os.path.splitext(filename or "")[1].lower()
+    if extension == ".csv":
+        rows = _csv_rows(source)
+    elif extension == ".xlsx":
+        rows = _xlsx_rows(source)
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Upload a .csv or .xlsx file"
+        )
+
+    headers = next(rows, None)
+    if headers is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="The file is empty")
+    fields = _map_headers(headers)
+
+    for row_no, row in enumerate(rows, start=2):
+        values = {
+            field: _cell(value)
+            for field, value in zip(fields, row) if field is not None
+        }
+        if any(value is not None for value in values.values()):
+            yield row_no, values
+
+
+def _validation_errors(error: ValidationError) -> List[str]:
+    return [
+        f"{'.'.join(str(part) for part in item['loc']) or 'row'}: {item['msg']}"
+        for item in error.errors()
+    ]
+
+
+class TeachingImport:
+    """
+    State of one import: submitters and paths resolved so far, keys seen and the report.
+    """
+
+    def __init__(self, db: Session, importer: User):
+        self.db = db
+        self.importer = importer
+        self.users_by_email: Dict[str, Optional[User]] = {importer.userEmail.lower(): importer}
+        self.paths: Dict[int, List[Dict[str, Any]]] = {}
+        self.rows_by_key: Dict[CourseKey, int] = {}
+        self.report = {"rows": 0, "created": 0, "updated": 0, "unchanged": 0, "failed": 0, "errors": []}
+
+    def _fail(self, row_no: int, *errors: str) -> None:
+        self.report["failed"] += 1
+        self.report["errors"].append({"row": row_no, "errors": list(errors)})
+
+    def _load_submitters(self, batch: List[Tuple[int, Dict[str, Optional[str]]]]) -> None:
+        emails = {
+            values[SUBMITTER_FIELD].lower() for _, values in batch
+            if values.get(SUBMITTER_FIELD) and values[SUBMITTER_FIELD].lower() not in self.users_by_email
+        }
+        if not emails:
+            return
+        for user in self.db.scalars(select(User).where(User.userEmail.in_(sorted(emails)))):
+            self.users_by_email[user.userEmail.lower()] = user
+        for email in emails:
+            self.users_by_email.setdefault(email, None)
+
+    def _submitter(self, row_no: int, values: Dict[str, Optional[str]]) -> Optional[User]:
+        email = (values.pop(SUBMITTER_FIELD, None) or self.importer.userEmail).lower()
+        user = self.users_by_email.get(email)
+        if user is None:
+            self._fail(row_no, f"{SUBMITTER_FIELD}: no user with this email")
+            return None
+        if user.userId != self.importer.userId and self.importer.role != "admin":
+            self._fail(row_no, f"{SUBMITTER_FIELD}: only admins can import records for other users")
+            return None
+        return user
+
+    def _approval_path(self, user: User) -> List[Dict[str, Any]]:
+        if user.userId not in self.paths:
+            self.paths[user.userId] = resolve_approval_path(self.db, user.department, user.college)
+        return self.paths[user.userId]
+
+    def _validate(self, batch) -> List[Tuple[int, User, CourseAndSETCreate, CourseKey]]:
+        self._load_submitters(batch)
+        valid = []
+        for row_no, values in batch:
+            user = self._submitter(row_no, values)
+            if user is None:
+                continue
+            try:
+                course = CourseAndSETCreate(**{field: value for field, value in values.items() if value is not None})
+            except ValidationError as e:
+                self._fail(row_no, *_validation_errors(e))
+                continue
+            key = (user.userId, course.academicYear, course.term, course.courseNum, course.section)
+            if key in self.rows_by_key:
+                self._fail(row_no, f"Same course and section as row {self.rows_by_key[key]}")
+                continue
+            self.rows_by_key[key] = row_no
+            valid.append((row_no, user, course, key))
+        return valid
+
+    def _apply(self, rows) -> Dict[str, int]:
+        """
+        Upsert validated rows in the session; returns outcome counts.
+        """
+        counts = {"created": 0, "updated": 0, "unchanged": 0}
+        if not rows:
+            return counts
+
+        key_columns = [getattr(CourseAndSET, column) for column in COURSE_KEY]
+        existing = {
+            tuple(getattr(record, column) for column in COURSE_KEY): record
+            for record in self.db.scalars(
+                select(CourseAndSET).where(tuple_(*key_columns).in_([key for *_, key in rows]))
+            )
+        }
+
+        for row_no, user, course, key in rows:
+            values = course.dict(include=set(IMPORT_FIELDS))
+            values["teachingPoints"] = derive_teaching_points(course)
+            record = existing.get(key)
+            if record is None:
+                approval_path = self._approval_path(user)
+                self.db.add(CourseAndSET(
+                    userId=user.userId,
+                    **values,
+                    approval_steps=new_approval_steps("course", approval_path),
+                    currentApprover=approval_path[0]["approver_id"] if approval_path else None,
+                    status="pending"
+                ))
+                counts["created"] += 1
+            elif all(getattr(record, field) == value for field, value in values.items()):
+                counts["unchanged"] += 1
+            elif record.status == "approved":
+                self._fail(row_no, "Record is already approved and cannot be changed by an import")
+            else:
+                for field, value in values.items():
+                    setattr(record, field, value)
+                resubmit(record)
+                counts["updated"] += 1
+        return counts
+
+    def process(self, batch: List[Tuple[int, Dict[str, Optional[str]]]]) -> None:
+        """
+        Validate and upsert one batch, then commit it.
+        """
+        self.report["rows"] += len(batch)
+        rows = self._validate(batch)
+        failed, errors = self.report["failed"], len(self.report["errors"])
+        counts = None
+        for attempt in range(2):
+            try:
+                counts = self._apply(rows)
+                self.db.commit()
+                break
+            except IntegrityError:
+                # Another import inserted some of these keys first; they exist
+                # now. The retry reports this pass's row errors again.
+                self.db.rollback()
+                counts = None
+                if attempt == 0:
+                    self.report["failed"] = failed
+                    del self.report["errors"][errors:]
+
+        if counts is None:
+            # Still conflicting: nothing in this batch was saved
+            reported = {error["row"] for error in self.report["errors"][errors:]}
+            for row_no, *_ in rows:
+                if row_no not in reported:
+                    self._fail(row_no, "Conflicting concurrent changes to this course; import the file again")
+            return
+        for outcome, count in counts.items():
+            self.report[outcome] += count
+
+
+def import_courses(source: BinaryIO, filename: str, importer_id: int) -> Dict[str, Any]:
+    """
+    Import Course and SET rows from a CSV or XLSX file and return the report.
+
+    Blocks; run it on a worker thread. Uses its own session, committing
+    every TEACHING_IMPORT_BATCH_SIZE rows.
+    """
+    with SessionLocal() as db:
+        importer = db.get(User, importer_id)
+        job = TeachingImport(db, importer)
+        batch = []
+        for row in read_rows(source, filename):
+            batch.append(row)
+            if len(batch) >= settings.TEACHING_IMPORT_BATCH_SIZE:
+                job.process(batch)
+                batch = []
+        if batch:
+            job.process(batch)
+
+    report = job.report
+    logger.info(
+        "Teaching import of %s by user %s: %s rows, %s created, %s updated, %s unchanged, %s failed",
+        filename, importer_id, report["rows"], report["created"], report["updated"],
+        report["unchanged"], report["failed"]
+    )
+    return report
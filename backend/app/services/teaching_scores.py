@@ -0,0 +1,183 @@
+"""
+Teaching points and SET scores of Course and SET records, computed with NumPy.
+
+A course's SET score is the weighted mean of its three Student Evaluation
+of Teachers parts (0-5), using SET_PART_WEIGHTS. Parts left blank are
+dropped and the remaining weights rescaled. Its teaching points are the
+credited load (loadCreditUnits * percentContri / 100) times the SET score.
+A course without SET ratings or load keeps the teachingPoints it was
+submitted with.
+
+Aggregates for a term, department or college weight SET averages by
+noOfRespondents. They are computed on whole columns: one query for the
+selected records, then a few array operations and np.bincount per total.
+Turning the rows into arrays costs more than the arithmetic.
+"""
+from operator import itemgetter
+from typing import Any, Dict, List, Optional, Sequence
+import numpy as np
+from sqlalchemy import Select, func, select
+from ..config import settings
+from ..models import User, CourseAndSET
+from .record_summary import approval_scope
+
+SET_PARTS = ("partOneStudent", "partTwoCourse", "partThreeTeaching")
+
+
+def _part_weights(value: str) -> np.ndarray:
+    weights = np.array([float(weight) for weight in value.split(",")])
+    if weights.shape != (len(SET_PARTS),) or (weights < 0).any() or not weights.any():
+        raise ValueError(f"SET_PART_WEIGHTS must be {len(SET_PARTS)} non-negative numbers, not all zero: {value!r}")
+    return weights
+
+
+SET_WEIGHTS = _part_weights(settings.SET_PART_WEIGHTS)
+
+_term = func.coalesce(CourseAndSET.academicYear, "") + " " + func.coalesce(CourseAndSET.term, "")
+
+# Grouping -> (key, display name) columns
+GROUPINGS = {
+    "user": (User.userId, User.userName),
+    "department": (func.coalesce(User.department, ""), func.coalesce(User.department, "")),
+    "college": (func.coalesce(User.college, ""), func.coalesce(User.college, "")),
+    "term": (_term, _term)
+}
+
+# Columns after the group key and name in score_query rows, in order
+SCORE_COLUMNS = (*SET_PARTS, "loadCreditUnits", "percentContri", "noOfRespondents", "teachingPoints")
+
+
+def set_scores(parts: np.ndarray) -> np.ndarray:
+    """
+    SET score of each row of an (n, 3) array of part ratings, NaN for blanks.
+    Rows without any rating score NaN.
+    """
+    rated = ~np.isnan(parts)
+    weight = rated @ SET_WEIGHTS
+    total = np.where(rated, parts, 0.0) @ SET_WEIGHTS
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(weight > 0, total / weight, np.nan)
+
+
+def teaching_points(parts: np.ndarray, load_units: np.ndarray, percent: np.ndarray,
+                    submitted: np.ndarray) -> np.ndarray:
+    """
+    Teaching points per course: credited load times SET score, else the submitted points.
+    """
+    points = load_units * percent / 100 * set_scores(parts)
+    return np.where(np.isnan(points), submitted, points)
+
+
+def derive_teaching_points(course: Any) -> Optional[float]:
+    """
+    Teaching points of one course, from a record or a CourseAndSET schema.
+    """
+    values = np.array(
+        [[getattr(course, column) for column in (*SET_PARTS, "loadCreditUnits", "percentContri", "teachingPoints")]],
+        dtype=float
+    )
+    points = teaching_points(values[:, :3], values[:, 3], values[:, 4], values[:, 5])[0]
+    return None if np.isnan(points) else float(points)
+
+
+def score_query(user: User, group_by: str, academic_year: Optional[str] = None, term: Optional[str] = None,
+                department: Optional[str] = None, college: Optional[str] = None,
+                record_status: Optional[str] = "approved") -> Select:
+    """
+    Rows of (group key, group name, *SCORE_COLUMNS) for the records `user` may see.
+
+    Department heads see their department, deans their college, admins
+    everything and other users their own records. Filters narrow that
+    further.
+    """
+    key, name = GROUPINGS[group_by]
+    query = select(
+        key.label("group_key"),
+        name.label("group_name"),
+        *(getattr(CourseAndSET, column) for column in SCORE_COLUMNS)
+    ).join(User, User.userId == CourseAndSET.userId)
+
+    scope = approval_scope(user)
+    if scope is None:
+        query = query.where(CourseAndSET.userId == user.userId)
+    elif scope[0] == "department":
+        query = query.where(User.department == scope[1])
+    elif scope[0] == "college":
+        query = query.where(User.college == scope[1])
+
+    if academic_year is not None:
+        query = query.where(CourseAndSET.academicYear == academic_year)
+    if term is not None:
+        query = query.where(CourseAndSET.term == term)
+    if department is not None:
+        query = query.where(User.department == department)
+    if college is not None:
+        query = query.where(User.college == college)
+    if record_status is not None:
+        query = query.where(CourseAndSET.status == record_status)
+    return query.order_by(key)
+
+
+def _totals(codes: np.ndarray, groups: int, parts: np.ndarray, load_units: np.ndarray, percent: np.ndarray,
+            respondents: np.ndarray, submitted: np.ndarray) -> Dict[str, np.ndarray]:
+    def total(values: np.ndarray) -> np.ndarray:
+        return np.bincount(codes, weights=np.nan_to_num(values), minlength=groups)
+
+    def respondent_mean(values: np.ndarray) -> np.ndarray:
+        weights = np.where(np.isnan(values), 0.0, respondents)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return total(values * weights) / total(weights)
+
+    scores = set_scores(parts)
+    return {
+        "courses": np.bincount(codes, minlength=groups),
+        "scoredCourses": np.bincount(codes[~np.isnan(scores)], minlength=groups),
+        "creditedUnits": total(load_units * percent / 100),
+        "teachingPoints": total(teaching_points(parts, load_units, percent, submitted)),
+        "respondents": total(respondents).round().astype(np.int64),
+        "setAverage": respondent_mean(scores),
+        **{part: respondent_mean(parts[:, i]) for i, part in enumerate(SET_PARTS)}
+    }
+
+
+def _rows(totals: Dict[str, np.ndarray], keys: Sequence[Any], names: Sequence[Any]) -> List[Dict[str, Any]]:
+    columns = {
+        # Counts stay integers; NaN (no rated courses) becomes None
+        field: values.tolist() if values.dtype.kind == "i" else [
+            None if np.isnan(value) else value for value in values.tolist()
+        ]
+        for field, values in totals.items()
+    }
+    return [
+        {"key": str(key), "name": name, **{field: values[i] for field, values in columns.items()}}
+        for i, (key, name) in enumerate(zip(keys, names))
+    ]
+
+
+def aggregate_scores(rows: Sequence[Sequence[Any]]) -> Dict[str, Any]:
+    """
+    Per-group and overall totals for score_query rows.
+    """
+    if not rows:
+        return {"groups": [], "totals": None}
+
+    # One column at a time; zip(*rows) would unpack every row as an argument
+    keys = list(map(itemgetter(0), rows))
+    parts, (load_units, percent, respondents, submitted) = np.split(np.array([
+        np.fromiter(map(itemgetter(i), rows), dtype=float, count=len(rows))
+        for i in range(2, 2 + len(SCORE_COLUMNS))
+    ]), [len(SET_PARTS)])
+    parts = parts.T
+    respondents = np.nan_to_num(respondents)
+
+    # Group number of each row, in order of first appearance (score_query sorts by key)
+    group_numbers: Dict[Any, int] = {}
+    codes = np.fromiter((group_numbers.setdefault(key, len(group_numbers)) for key in keys),
+                        dtype=np.intp, count=len(keys))
+    group_names = [rows[i][1] for i in np.unique(codes, return_index=True)[1]]
+    groups = _totals(codes, len(group_numbers), parts, load_units, percent, respondents, submitted)
+    overall = _totals(np.zeros(len(keys), dtype=np.intp), 1, parts, load_units, percent, respondents, submitted)
+    return {
+        "groups": _rows(groups, list(group_numbers), group_names),
+        "totals": _rows(overall, ["all"], ["All"])[0]
+    }
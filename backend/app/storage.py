@@ -0,0 +1,212 @@
+"""
+Blob storage backends for supporting documents.
+
+A backend stores opaque objects under string keys. LocalStorage keeps them
+under a directory; S3Storage talks to any S3-compatible service (AWS S3,
+MinIO, Ceph, a local stand-in) over httpx with SigV4 request signing.
+
+Settings:
+    DOCUMENT_STORAGE      "local" (under UPLOAD_DIRECTORY/blobs) or "s3"
+    S3_ENDPOINT_URL       e.g. http://localhost:9000; empty for AWS
+    S3_BUCKET, S3_REGION, S3_ACCESS_KEY_ID, S3_SECRET_ACCESS_KEY
+    S3_PREFIX             key prefix inside the bucket, e.g. "fris/"
+
+Backend methods block; call them from a worker thread.
+"""
+import hashlib
+import hmac
+import os
+import tempfile
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from typing import BinaryIO, Dict, Optional
+from urllib.parse import quote, urlsplit
+import httpx
+from .config import settings
+
+EMPTY_SHA256 = hashlib.sha256(b"").hexdigest()
+
+
+def fsync_directory(directory: str) -> None:
+    """
+    Make renames into `directory` durable; a no-op where directories can't be opened.
+    """
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class StorageBackend(ABC):
+    """
+    Key/object store used for supporting documents.
+    """
+
+    @abstractmethod
+    def exists(self, key: str) -> bool:
+        """Whether an object is stored under `key`."""
+
+    @abstractmethod
+    def put_file(self, key: str, path: str, sha256: str) -> None:
+        """Store the local file at `path` under `key`. The file is consumed."""
+
+    @abstractmethod
+    def open(self, key: str) -> BinaryIO:
+        """Binary file object with the contents stored under `key`."""
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Remove the object under `key`; missing objects are ignored."""
+
+
+class LocalStorage(StorageBackend):
+    """
+    Objects as files under `root`, one file per key.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, *key.split("/"))
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(self._path(key))
+
+    def put_file(self, key: str, path: str, sha256: str) -> None:
+        target = self._path(key)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        os.replace(path, target)
+        fsync_directory(os.path.dirname(target))
+
+    def open(self, key: str) -> BinaryIO:
+        return open(self._path(key), "rb")
+
+    def delete(self, key: str) -> None:
+        try:
+            os.unlink(self._path(key))
+        except FileNotFoundError:
+            pass
+
+
+class S3Storage(StorageBackend):
+    """
+    Objects in an S3-compatible bucket, addressed path-style.
+    """
+
+    def __init__(self, bucket: str, region: str, access_key_id: str, secret_access_key: str,
+                 endpoint_url: str = "", prefix: str = "", client: Optional[httpx.Client] = None):
+        self.bucket = bucket
+        self.region = region
+        self.access_key_id = access_key_id
+        self.secret_access_key = secret_access_key
+        self.endpoint_url = (endpoint_url or f"https://s3.{region}.amazonaws.com").rstrip("/")
+        self.prefix = prefix
+        self.client = client or httpx.Client(timeout=60)
+
+    def _url(self, key: str) -> str:
+        return f"{self.endpoint_url}/{quote(self.bucket)}/{quote(self.prefix + key, safe='/-_.~')}"
+
+    def _signed_headers(self, method: str, url: str, payload_sha256: str,
+                        headers: Optional[Dict[str, str]] = None, now: Optional[datetime] = None) -> Dict[str, str]:
+        """
+        Headers for `method url` with an AWS Signature Version 4 Authorization.
+        """
+        now = now or datetime.now(timezone.utc)
+        amz_date = now.strftime("%Y%m%dT%H%M%SZ")
+        scope = f"{amz_date[:8]}/{self.region}/s3/aws4_request"
+        parts = urlsplit(url)
+
+        signed = {k.lower(): str(v).strip() for k, v in (headers or {}).items()}
+        signed.update({"host": parts.netloc, "x-amz-content-sha256": payload_sha256, "x-amz-date": amz_date})
+        names = sorted(signed)
+        query = "&".join(sorted(
+            "=".join(quote(piece, safe="-_.~") for piece in (pair.split("=", 1) + [""])[:2])
+            for pair in parts.query.split("&") if pair
+        ))
+        canonical_request = "\n".join([
+            method,
+            parts.path or "/",
+            query,
+            "".join(f"{name}:{signed[name]}\n" for name in names),
+            ";".join(names),
+            payload_sha256
+        ])
+        string_to_sign = "\n".join([
+            "AWS4-HMAC-SHA256",
+            amz_date,
+            scope,
+            hashlib.sha256(canonical_request.encode()).hexdigest()
+        ])
+
+        key = ("AWS4" + self.secret_access_key).encode()
+        for part in (amz_date[:8], self.region, "s3", "aws4_request"):
+            key = hmac.new(key, part.encode(), hashlib.sha256).digest()
+        signature = hmac.new(key, string_to_sign.encode(), hashlib.sha256).hexdigest()
+
+        signed["authorization"] = (
+            f"AWS4-HMAC-SHA256 Credential={self.access_key_id}/{scope}, "
+            f"SignedHeaders={';'.join(names)}, Signature={signature}"
+        )
+        del signed["host"]
+        return signed
+
+    def exists(self, key: str) -> bool:
+        url = self._url(key)
+        response = self.client.head(url, headers=self._signed_headers("HEAD", url, EMPTY_SHA256))
+        if response.status_code == 404:
+            return False
+        response.raise_for_status()
+        return True
+
+    def put_file(self, key: str, path: str, sha256: str) -> None:
+        url = self._url(key)
+        size = os.path.getsize(path)
+        with open(path, "rb") as f:
+            response = self.client.put(
+                url,
+                content=f,
+                headers={
+                    **self._signed_headers("PUT", url, sha256, {"content-length": str(size)}),
+                    "content-length": str(size)
+                }
+            )
+        response.raise_for_status()
+        os.unlink(path)
+
+    def open(self, key: str) -> BinaryIO:
+        url = self._url(key)
+        contents = tempfile.SpooledTemporaryFile(max_size=settings.UPLOAD_CHUNK_SIZE)
+        with self.client.stream("GET", url, headers=self._signed_headers("GET", url, EMPTY_SHA256)) as response:
+            response.raise_for_status()
+            for chunk in response.iter_bytes(settings.UPLOAD_CHUNK_SIZE):
+                contents.write(chunk)
+        contents.seek(0)
+        return contents
+
+    def delete(self, key: str) -> None:
+        url = self._url(key)
+        response = self.client.delete(url, headers=self._signed_headers("DELETE", url, EMPTY_SHA256))
+        if response.status_code != 404:
+            response.raise_for_status()
+
+
+def create_storage() -> StorageBackend:
+    """
+    Backend selected by DOCUMENT_STORAGE.
+    """
+    if settings.DOCUMENT_STORAGE == "local":
+        return LocalStorage(os.path.join(settings.UPLOAD_DIRECTORY, "blobs"))
+    if settings.DOCUMENT_STORAGE == "s3":
+        return S3Storage(
+            bucket=settings.S3_BUCKET,
+            region=settings.S3_REGION,
+            access_key_id=settings.S3_ACCESS_KEY_ID,
+            secret_access_key=settings.S3_SECRET_ACCESS_KEY,
+            endpoint_url=settings.S3_ENDPOINT_URL,
+            prefix=settings.S3_PREFIX
+        )
+    raise ValueError(f"Unknown DOCUMENT_STORAGE: {settings.DOCUMENT_STORAGE!r} (expected 'local' or 's3')")
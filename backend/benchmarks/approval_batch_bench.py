@@ -0,0 +1,121 @@
+"""
+Benchmark: a department head clearing SET records one at a time vs in one batch.
+
+Seeds --records course records for one faculty member, each with a
+two-step approval path (department head, then dean), twice over. The
+department head then approves:
+
+  * single - the first set, one PUT /teaching/{id}/approve per record
+  * batch  - the second set, one POST /approval/batch for all of them
+
+and the benchmark reports wall time and SQL statements for each.
+
+Usage (from the backend directory):
+
+    python benchmarks/approval_batch_bench.py --records 200 --db-latency 1
+
+The database is a throwaway SQLite file. --db-latency adds an artificial
+delay (ms) to every statement to approximate a network round trip to
+PostgreSQL. SQLite has no row locks, so FOR UPDATE SKIP LOCKED is not
+exercised here.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=200)
+    parser.add_argument("--db-latency", type=float, default=0.0, help="extra ms per SQL statement")
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "approval_batch_bench.db")
+    os.environ["DOLIBARR_OUTBOX_IN_PROCESS"] = "false"
+
+    import logging
+    logging.disable(logging.WARNING)
+    import httpx
+    from sqlalchemy import event
+    from app.auth import create_access_token
+    from app.dependencies import SessionLocal, async_engine, engine
+    from app.main import app
+    from app.models import Base, User, CourseAndSET
+    from app.services.approvals import new_approval_steps
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    faculty = User(userName="Bench Faculty", userEmail="faculty@upm.edu.ph", password="x", role="faculty",
+                   department="Physics", college="CAS")
+    head = User(userName="Bench Head", userEmail="head@upm.edu.ph", password="x", role="faculty",
+                department="Physics", college="CAS", isDepartmentHead=True)
+    dean = User(userName="Bench Dean", userEmail="dean@upm.edu.ph", password="x", role="faculty",
+                department="Physics", college="CAS", isDean=True)
+    db.add_all([faculty, head, dean])
+    db.flush()
+    path = [
+        {"approver_id": head.userId, "role": "Department Head"},
+        {"approver_id": dean.userId, "role": "Dean"}
+    ]
+    courses = [
+        CourseAndSET(
+            userId=faculty.userId, academicYear="2025-2026", term="1st", courseNum="Physics 71",
+            section=f"S{i}", courseDesc="Elementary Physics", courseType="lecture", percentContri=100,
+            loadCreditUnits=3, noOfRespondents=30, status="pending", currentApprover=head.userId,
+            approval_steps=new_approval_steps("course", path)
+        )
+        for i in range(2 * args.records)
+    ]
+    db.add_all(courses)
+    db.commit()
+    course_ids = [course.caSId for course in courses]
+    dean_id = dean.userId
+    db.close()
+
+    statements = 0
+
+    @event.listens_for(async_engine.sync_engine, "before_cursor_execute")
+    def _count(*_):
+        nonlocal statements
+        statements += 1
+        if args.db_latency:
+            time.sleep(args.db_latency / 1000)
+
+    headers = {"Authorization": "Bearer " + create_access_token({"sub": "head@upm.edu.ph", "role": "faculty"})}
+    print(f"{args.records} records per run, db latency {args.db_latency}ms")
+
+    async with httpx.AsyncClient(app=app, base_url="http://bench") as client:
+        await client.get("/approval/pending", headers=headers)
+
+        statements = 0
+        start = time.perf_counter()
+        for course_id in course_ids[:args.records]:
+            response = await client.put(f"/teaching/{course_id}/approve", headers=headers,
+                                        json={"status": "approved", "comments": "ok"})
+            assert response.status_code == 200, response.text
+        elapsed = time.perf_counter() - start
+        print(f"single {elapsed:8.3f}s  {args.records} requests  {statements} statements")
+
+        statements = 0
+        start = time.perf_counter()
+        response = await client.post("/approval/batch", headers=headers, json={"items": [
+            {"record_type": "course", "record_id": course_id, "decision": "approved", "comment": "ok"}
+            for course_id in course_ids[args.records:]
+        ]})
+        elapsed = time.perf_counter() - start
+        assert response.status_code == 200 and response.json()["failed"] == 0, response.text
+        print(f"batch  {elapsed:8.3f}s  1 request  {statements} statements")
+
+    db = SessionLocal()
+    waiting = db.query(CourseAndSET).filter(CourseAndSET.currentApprover == dean_id).count()
+    db.close()
+    assert waiting == 2 * args.records, waiting
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
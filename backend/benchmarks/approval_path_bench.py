@@ -0,0 +1,108 @@
+"""
+Benchmark: resolving submitters' approval paths, per-step queries vs joined query vs cache.
+
+Seeds --users users in --departments departments of one college, with a
+configured approval path of --steps approvers for every department, then
+resolves the path of each user in turn, as a bulk import creating one
+record per user would:
+
+  * per-step - the old generate_approval_path: the path rows, then one
+               user lookup per step (two fallback lookups without rows)
+  * joined   - load_approval_path, one query per resolution
+  * cached   - resolve_approval_path, one query per (department, college)
+
+Usage (from the backend directory):
+
+    python benchmarks/approval_path_bench.py --users 2000 --db-latency 1
+
+The database is a throwaway SQLite file. --db-latency adds an artificial
+delay (ms) to every statement to approximate a network round trip to
+PostgreSQL.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def per_step_approval_path(db, department, college):
+    from app.models import ApprovalPath, User
+    approval_paths = db.query(ApprovalPath).filter(
+        ApprovalPath.department == department,
+        ApprovalPath.college == college
+    ).order_by(ApprovalPath.approval_number).all()
+    if not approval_paths:
+        dept_head = db.query(User).filter(User.department == department, User.isDepartmentHead == True).first()
+        dean = db.query(User).filter(User.college == college, User.isDean == True).first()
+        return [{"approver_id": user.userId} for user in (dept_head, dean) if user]
+    approval_path = []
+    for path in approval_paths:
+        approver = db.query(User).filter(User.userEmail == path.approver_email).first()
+        if approver:
+            approval_path.append({"approver_id": approver.userId})
+    return approval_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--departments", type=int, default=10)
+    parser.add_argument("--steps", type=int, default=3, help="approvers per configured path")
+    parser.add_argument("--db-latency", type=float, default=0.0, help="extra ms per SQL statement")
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "approval_path_bench.db")
+    os.environ["DOLIBARR_OUTBOX_IN_PROCESS"] = "false"
+
+    import logging
+    logging.disable(logging.WARNING)
+    from sqlalchemy import event
+    from app.dependencies import SessionLocal, engine
+    from app.models import Base, User, ApprovalPath
+    from app.services.approval_paths import load_approval_path, resolve_approval_path
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    db.add_all(
+        User(userName=f"User {i}", userEmail=f"user{i}@upm.edu.ph", password="x", role="faculty",
+             department=f"Department {i % args.departments}", college="CAS")
+        for i in range(args.users)
+    )
+    db.add_all(
+        ApprovalPath(department=f"Department {d}", college="CAS", approver_email=f"user{d * args.steps + n}@upm.edu.ph",
+                     approval_number=n + 1, isDean=n == args.steps - 1)
+        for d in range(args.departments) for n in range(args.steps)
+    )
+    db.commit()
+    submitters = [(user.department, user.college) for user in db.query(User).order_by(User.userId)]
+
+    statements = 0
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _count(*_):
+        nonlocal statements
+        statements += 1
+        if args.db_latency:
+            time.sleep(args.db_latency / 1000)
+
+    print(f"{len(submitters)} submitters, {args.departments} departments, {args.steps} steps, "
+          f"db latency {args.db_latency}ms")
+    for label, resolve in (
+        ("per-step", lambda department, college: per_step_approval_path(db, department, college)),
+        ("joined", lambda department, college: load_approval_path(db, department, college)),
+        ("cached", lambda department, college: resolve_approval_path(db, department, college))
+    ):
+        statements = 0
+        start = time.perf_counter()
+        for department, college in submitters:
+            assert len(resolve(department, college)) == args.steps
+        elapsed = time.perf_counter() - start
+        print(f"{label:<9} {elapsed:8.3f}s  {statements:6d} statements")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Benchmark: fast requests alongside slow queries, sync Session vs AsyncSession.
+
+Sends a stream of fast requests (list the caller's courses) while a few slow
+requests run a query that takes --slow-ms inside the database:
+
+  * sync  - handlers use the blocking Session from get_db (old behaviour),
+            so every slow query stalls the event loop for everyone
+  * async - the ported /teaching routes and an AsyncSession from get_async_db
+
+Usage (from the backend directory):
+
+    python benchmarks/async_db_bench.py --fast 500 --slow 20 --slow-ms 200
+
+The database is a throwaway SQLite file (aiosqlite for the async engine).
+The slow query calls a bench_sleep() SQL function registered on each
+connection, which stands in for a heavy report or a lock wait.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+async def run(label: str, client, headers: dict, prefix: str, args):
+    fast_latencies = []
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def fast():
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.get(f"{prefix}/courses", headers=headers)
+            response.raise_for_status()
+            fast_latencies.append(time.perf_counter() - start)
+
+    async def slow():
+        response = await client.get(f"{prefix}/slow", headers=headers)
+        response.raise_for_status()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(slow() for _ in range(args.slow)), *(fast() for _ in range(args.fast)))
+    elapsed = time.perf_counter() - start
+
+    fast_latencies.sort()
+    p50 = fast_latencies[len(fast_latencies) // 2] * 1000
+    p99 = fast_latencies[min(len(fast_latencies) - 1, int(len(fast_latencies) * 0.99))] * 1000
+    total = args.fast + args.slow
+    print(f"{label:<6} {elapsed:8.3f}s  {total / elapsed:8.1f} req/s  fast p50={p50:8.2f}ms  p99={p99:8.2f}ms")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fast", type=int, default=500, help="number of fast requests")
+    parser.add_argument("--slow", type=int, default=20, help="number of slow requests")
+    parser.add_argument("--slow-ms", type=float, default=200.0, help="time each slow query spends in the database")
+    parser.add_argument("--concurrency", type=int, default=5,
+                        help="fast requests in flight; with --slow, keep below the engine pool size (5 + 10 overflow)")
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "async_bench.db")
+
+    import logging
+    logging.disable(logging.WARNING)
+    import httpx
+    from fastapi import Depends, FastAPI
+    from sqlalchemy import event, select, text
+    from sqlalchemy.ext.asyncio import AsyncSession
+    from sqlalchemy.orm import Session
+    from app.api import teaching
+    from app.auth import create_access_token
+    from app.dependencies import SessionLocal, async_engine, engine, get_async_db, get_current_user, get_db
+    from app.models import Base, CourseAndSET, User
+
+    def register_sleep(dbapi_connection, connection_record):
+        dbapi_connection.create_function("bench_sleep", 1, lambda seconds: time.sleep(seconds) or 0)
+
+    event.listen(engine, "connect", register_sleep)
+    event.listen(async_engine.sync_engine, "connect", register_sleep)
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    user = User(userName="Bench User", userEmail="bench@upm.edu.ph", password="x", role="faculty")
+    db.add(user)
+    db.flush()
+    db.add_all([
+        CourseAndSET(userId=user.userId, academicYear="2024-2025", term="1", courseNum=f"BIO {i}",
+                     section="A", courseDesc="Bench course", courseType="lecture", percentContri=100,
+                     loadCreditUnits=3, noOfRespondents=30, partOneStudent=4, partTwoCourse=4,
+                     partThreeTeaching=4, teachingPoints=4, status="pending")
+        for i in range(20)
+    ])
+    db.commit()
+    db.close()
+
+    app = FastAPI()
+    slow_seconds = args.slow_ms / 1000
+
+    # Old style: async handlers on the blocking Session
+    @app.get("/sync/courses")
+    async def sync_courses(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+        return len(db.query(CourseAndSET).filter(CourseAndSET.userId == current_user.userId).all())
+
+    @app.get("/sync/slow")
+    async def sync_slow(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+        return db.execute(text("SELECT bench_sleep(:seconds)"), {"seconds": slow_seconds}).scalar()
+
+    # New style: the ported teaching router and an AsyncSession
+    app.include_router(teaching.router, prefix="/async/courses")
+
+    @app.get("/async/slow")
+    async def async_slow(db: AsyncSession = Depends(get_async_db), current_user: User = Depends(get_current_user)):
+        return await db.scalar(select(text("bench_sleep(:seconds)")), {"seconds": slow_seconds})
+
+    headers = {"Authorization": "Bearer " + create_access_token({"sub": "bench@upm.edu.ph", "role": "faculty"})}
+    print(f"{args.fast} fast + {args.slow} slow ({args.slow_ms:g}ms) requests, fast concurrency {args.concurrency}")
+
+    async with httpx.AsyncClient(app=app, base_url="http://bench", follow_redirects=True) as client:
+        await run("sync", client, headers, "/sync", args)
+        await run("async", client, headers, "/async", args)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,99 @@
+"""
+Benchmark: authenticated no-op endpoint with and without the token cache.
+
+Mounts a route that only depends on get_current_user, then sends the same
+bearer token through the ASGI app repeatedly:
+
+  * uncached - every request decodes the JWT and SELECTs the user (old behaviour)
+  * cached   - verified tokens are served from the in-memory snapshot cache
+
+Usage (from the backend directory):
+
+    python benchmarks/auth_cache_bench.py --requests 2000 --concurrency 10 --db-latency 1
+
+The database is a throwaway SQLite file. --db-latency adds an artificial
+delay (ms) to every statement to approximate a network round trip to
+PostgreSQL.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+async def run(label: str, client, headers: dict, total: int, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one():
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.get("/bench/noop", headers=headers)
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] * 1000
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000
+    print(f"{label:<10} {elapsed:8.3f}s  {total / elapsed:8.1f} req/s  p50={p50:7.2f}ms  p99={p99:7.2f}ms")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=10,
+                        help="keep below the engine pool size (5 + 10 overflow)")
+    parser.add_argument("--db-latency", type=float, default=0.0, help="extra ms per SQL statement")
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "auth_bench.db")
+
+    import logging
+    logging.disable(logging.WARNING)
+    import httpx
+    from fastapi import Depends, FastAPI
+    from sqlalchemy import event
+    from app.auth import create_access_token
+    from app.dependencies import SessionLocal, auth_cache, engine, get_current_user
+    from app.models import Base, User
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    db.add(User(userName="Bench User", userEmail="bench@upm.edu.ph", password="x", role="faculty"))
+    db.commit()
+    db.close()
+
+    if args.db_latency:
+        @event.listens_for(engine, "before_cursor_execute")
+        def _delay(*_):
+            time.sleep(args.db_latency / 1000)
+
+    app = FastAPI()
+
+    @app.get("/bench/noop")
+    async def noop(current_user: User = Depends(get_current_user)):
+        return {"ok": True}
+
+    headers = {"Authorization": "Bearer " + create_access_token({"sub": "bench@upm.edu.ph", "role": "faculty"})}
+    print(f"{args.requests} requests, concurrency {args.concurrency}, db latency {args.db_latency}ms")
+
+    async with httpx.AsyncClient(app=app, base_url="http://bench") as client:
+        max_entries = auth_cache.max_entries
+        auth_cache.max_entries = 0
+        auth_cache.clear()
+        await run("uncached", client, headers, args.requests, args.concurrency)
+
+        auth_cache.max_entries = max_entries
+        await run("cached", client, headers, args.requests, args.concurrency)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,181 @@
+"""
+Benchmark: disk use of supporting documents with the content-addressed store.
+
+Creates --courses course records and uploads the same SET form (--size MB)
+to each through /teaching/{id}/upload-document, as faculty do when one form
+covers several sections. Then deletes every course and checks that the
+blob is collected once the last reference is gone.
+
+Usage (from the backend directory):
+
+    python benchmarks/document_store_bench.py --courses 20 --size 2
+    python benchmarks/document_store_bench.py --storage s3
+
+--storage s3 runs against a local S3 stand-in that checks every request
+carries a SigV4 Authorization header and that PUT bodies match their
+x-amz-content-sha256. The database and files go to a throwaway temp directory.
+"""
+import argparse
+import asyncio
+import hashlib
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class FakeS3Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address):
+        super().__init__(address, FakeS3Handler)
+        self.objects = {}
+        self.lock = threading.Lock()
+
+
+class FakeS3Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status: int, body: bytes = b"") -> None:
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def _authorized(self) -> bool:
+        if not self.headers.get("Authorization", "").startswith("AWS4-HMAC-SHA256 Credential="):
+            self._reply(403)
+            return False
+        return True
+
+    def do_HEAD(self):
+        if self._authorized():
+            self._reply(200 if self.path in self.server.objects else 404)
+
+    def do_GET(self):
+        if self._authorized():
+            body = self.server.objects.get(self.path)
+            self._reply(404) if body is None else self._reply(200, body)
+
+    def do_PUT(self):
+        if not self._authorized():
+            return
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        if hashlib.sha256(body).hexdigest() != self.headers.get("x-amz-content-sha256"):
+            self._reply(400)
+            return
+        with self.server.lock:
+            self.server.objects[self.path] = body
+        self._reply(200)
+
+    def do_DELETE(self):
+        if self._authorized():
+            with self.server.lock:
+                self.server.objects.pop(self.path, None)
+            self._reply(204)
+
+
+def directory_size(path: str) -> int:
+    return sum(
+        os.path.getsize(os.path.join(root, name))
+        for root, _, names in os.walk(path) for name in names
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--courses", type=int, default=20)
+    parser.add_argument("--size", type=float, default=2, help="MB per SET form")
+    parser.add_argument("--storage", choices=("local", "s3"), default="local")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(workdir, "document_bench.db")
+    os.environ["UPLOAD_DIRECTORY"] = os.path.join(workdir, "uploads")
+    os.environ["DOLIBARR_OUTBOX_IN_PROCESS"] = "false"
+    os.environ["DOCUMENT_GC_GRACE_SECONDS"] = "0"
+    server = None
+    if args.storage == "s3":
+        server = FakeS3Server(("127.0.0.1", 0))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        os.environ.update({
+            "DOCUMENT_STORAGE": "s3",
+            "S3_ENDPOINT_URL": f"http://127.0.0.1:{server.server_address[1]}",
+            "S3_BUCKET": "fris",
+            "S3_ACCESS_KEY_ID": "bench",
+            "S3_SECRET_ACCESS_KEY": "bench"
+        })
+
+    import logging
+    logging.disable(logging.WARNING)
+    import httpx
+    from app.auth import create_access_token
+    from app.dependencies import SessionLocal, engine
+    from app.main import app
+    from app.models import Base, User, DocumentBlob
+    from app.services import documents
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    db.add(User(userName="Bench User", userEmail="bench@upm.edu.ph", password="x", role="faculty",
+                department="Physics", college="CAS"))
+    db.commit()
+    db.close()
+
+    headers = {"Authorization": "Bearer " + create_access_token({"sub": "bench@upm.edu.ph", "role": "faculty"})}
+    form = os.urandom(int(args.size * 1024 * 1024))
+    course = {
+        "academicYear": "2025-2026", "term": "1st", "courseNum": "Physics 71", "section": "A",
+        "courseDesc": "Elementary Physics", "courseType": "lecture", "percentContri": 100,
+        "loadCreditUnits": 3, "noOfRespondents": 30
+    }
+
+    def stored_bytes() -> int:
+        if server is not None:
+            return sum(len(body) for body in server.objects.values())
+        return directory_size(os.path.join(workdir, "uploads", "blobs"))
+
+    def blob_rows():
+        db = SessionLocal()
+        try:
+            return [(row.sha256[:12], row.refcount) for row in db.query(DocumentBlob).all()]
+        finally:
+            db.close()
+
+    async with httpx.AsyncClient(app=app, base_url="http://bench") as client:
+        course_ids = []
+        start = time.perf_counter()
+        for i in range(args.courses):
+            response = await client.post("/teaching/", headers=headers, json={**course, "section": f"S{i}"})
+            response.raise_for_status()
+            course_ids.append(response.json()["caSId"])
+            response = await client.post(
+                f"/teaching/{course_ids[-1]}/upload-document",
+                headers=headers,
+                files={"file": ("set-form.pdf", form, "application/pdf")}
+            )
+            response.raise_for_status()
+        elapsed = time.perf_counter() - start
+
+        uploaded = args.courses * len(form)
+        print(f"{args.courses} uploads of {args.size} MB to {args.storage} storage in {elapsed:.3f}s")
+        print(f"uploaded {uploaded / 1024 / 1024:8.1f} MB  stored {stored_bytes() / 1024 / 1024:8.1f} MB  "
+              f"blobs {blob_rows()}")
+
+        for course_id in course_ids:
+            (await client.delete(f"/teaching/{course_id}", headers=headers)).raise_for_status()
+
+    documents._gc_executor.submit(lambda: None).result()
+    print(f"after deleting every course: stored {stored_bytes() / 1024 / 1024:8.1f} MB  blobs {blob_rows()}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
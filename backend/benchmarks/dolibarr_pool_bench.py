@@ -0,0 +1,223 @@
+"""
+Benchmark: per-call httpx clients vs the pooled DolibarrClient.
+
+Starts a local fake Dolibarr server that counts the TCP connections it
+accepts, then runs the same third party workload twice:
+
+  * per-call  - a fresh httpx.AsyncClient for every request (old behaviour)
+  * pooled    - the shared, keep-alive DolibarrClient
+
+Usage (from the backend directory):
+
+    python benchmarks/dolibarr_pool_bench.py --requests 300 --concurrency 10 --tls
+
+--tls serves the fake API over HTTPS with a throwaway self-signed certificate
+so the TLS handshake cost is included. --connect-latency adds an artificial
+delay (ms) to every new connection to approximate a remote Dolibarr host.
+"""
+import argparse
+import asyncio
+import datetime
+import ipaddress
+import json
+import os
+import ssl
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class FakeDolibarrServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, address, connect_latency: float = 0.0):
+        super().__init__(address, FakeDolibarrHandler)
+        self.connect_latency = connect_latency
+        self.connections = 0
+        self.lock = threading.Lock()
+        self.next_id = 1000
+
+    def get_request(self):
+        request = super().get_request()
+        with self.lock:
+            self.connections += 1
+        if self.connect_latency:
+            time.sleep(self.connect_latency)
+        return request
+
+
+class FakeDolibarrHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, body: str):
+        payload = body.encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _read_body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def do_GET(self):
+        third_party_id = self.path.rstrip("/").split("/")[-1].split("?")[0]
+        self._send(200, json.dumps({"id": third_party_id, "name": "Faculty", "email": "faculty@upm.edu.ph"}))
+
+    def do_POST(self):
+        self._read_body()
+        with self.server.lock:
+            self.server.next_id += 1
+            new_id = self.server.next_id
+        self._send(200, str(new_id))
+
+    def do_PUT(self):
+        self._read_body()
+        self._send(200, json.dumps({"id": self.path.rstrip("/").split("/")[-1]}))
+
+    def do_DELETE(self):
+        self._send(200, json.dumps({"success": {"code": 200}}))
+
+
+def write_self_signed_cert(directory: str):
+    from cryptography import x509
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import ec
+    from cryptography.x509.oid import NameOID
+
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "localhost")])
+    now = datetime.datetime.utcnow()
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(minutes=5))
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .add_extension(x509.BasicConstraints(ca=True, path_length=None), critical=True)
+        .add_extension(
+            x509.SubjectAlternativeName([
+                x509.DNSName("localhost"),
+                x509.IPAddress(ipaddress.ip_address("127.0.0.1"))
+            ]),
+            critical=False
+        )
+        .sign(key, hashes.SHA256())
+    )
+    cert_path = os.path.join(directory, "cert.pem")
+    key_path = os.path.join(directory, "key.pem")
+    with open(cert_path, "wb") as f:
+        f.write(cert.public_bytes(serialization.Encoding.PEM))
+    with open(key_path, "wb") as f:
+        f.write(key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption()
+        ))
+    return cert_path, key_path
+
+
+USER_DATA = {
+    "userName": "Juan Dela Cruz",
+    "userEmail": "jdelacruz@upm.edu.ph",
+    "department": "Department of Biochemistry",
+    "college": "College of Medicine",
+    "rank": "Associate Professor"
+}
+
+
+async def per_call_workload(base_url: str, headers: dict, index: int):
+    """The pre-pool request pattern: one AsyncClient per round trip."""
+    import httpx
+
+    async with httpx.AsyncClient() as client:
+        response = await client.put(f"{base_url}/thirdparties/{index}", json=USER_DATA, headers=headers, timeout=30.0)
+        response.raise_for_status()
+    async with httpx.AsyncClient() as client:
+        response = await client.get(f"{base_url}/thirdparties/{index}", headers=headers, timeout=30.0)
+        response.raise_for_status()
+
+
+async def pooled_workload(client, index: int):
+    await client.update_third_party(index, USER_DATA)
+
+
+async def run(label: str, server: FakeDolibarrServer, total: int, concurrency: int, make_call):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(i: int):
+        async with semaphore:
+            start = time.perf_counter()
+            await make_call(i)
+            latencies.append(time.perf_counter() - start)
+
+    server.connections = 0
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] * 1000
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000
+    print(
+        f"{label:<10} {elapsed:8.3f}s  {total / elapsed:8.1f} ops/s  "
+        f"p50={p50:7.2f}ms  p99={p99:7.2f}ms  connections={server.connections}"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=300, help="number of update_third_party operations")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--tls", action="store_true", help="serve the fake API over HTTPS")
+    parser.add_argument("--connect-latency", type=float, default=0.0, help="extra ms per new connection")
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp()
+    server = FakeDolibarrServer(("127.0.0.1", 0), connect_latency=args.connect_latency / 1000)
+    scheme = "http"
+    if args.tls:
+        cert_path, key_path = write_self_signed_cert(tmpdir)
+        context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+        context.load_cert_chain(cert_path, key_path)
+        server.socket = context.wrap_socket(server.socket, server_side=True, do_handshake_on_connect=False)
+        # httpx trusts SSL_CERT_FILE when trust_env is enabled (the default)
+        os.environ["SSL_CERT_FILE"] = cert_path
+        scheme = "https"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    base_url = f"{scheme}://127.0.0.1:{server.server_address[1]}/api/index.php"
+    os.environ["DOLIBARR_API_URL"] = base_url
+
+    import logging
+    logging.disable(logging.INFO)
+    from app.services.dolibarr_client import DolibarrClient
+
+    client = DolibarrClient()
+    await client.start()
+
+    print(f"Fake Dolibarr at {base_url} ({args.requests} updates, concurrency {args.concurrency})")
+    await run("per-call", server, args.requests, args.concurrency,
+              lambda i: per_call_workload(base_url, client.headers, i))
+    await run("pooled", server, args.requests, args.concurrency,
+              lambda i: pooled_workload(client, i))
+
+    await client.close()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,133 @@
+"""
+Benchmark: a login storm against /auth/token, e.g. semester start.
+
+Fires --logins logins, --concurrency at a time, through the ASGI app. The
+first storm runs bcrypt inline on the event loop (old behaviour). Later
+storms use the bcrypt worker pool with more workers each time, up to the
+number of cores. While each storm runs, a /health probe measures how long
+other requests wait for the event loop.
+
+Usage (from the backend directory):
+
+    python benchmarks/login_storm_bench.py --logins 200 --concurrency 10 --rounds 12
+
+The database is a throwaway SQLite file with one user per login.
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+async def probe(client, stop: asyncio.Event, latencies: list):
+    # Time from when a /health request is due until it completes, including event loop stalls
+    interval = 0.01
+    while not stop.is_set():
+        due = time.perf_counter() + interval
+        await asyncio.sleep(interval)
+        await client.get("/health")
+        latencies.append(time.perf_counter() - due)
+
+
+async def storm(client, total: int, concurrency: int) -> str:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    probe_latencies = []
+    stop = asyncio.Event()
+
+    async def one(i: int):
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.post(
+                "/auth/token",
+                data={"username": f"user{i}@upm.edu.ph", "password": "semester-start"}
+            )
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+
+    prober = asyncio.create_task(probe(client, stop, probe_latencies))
+    start = time.perf_counter()
+    # The login path prints per request; keep the benchmark output readable
+    with contextlib.redirect_stdout(io.StringIO()):
+        await asyncio.gather(*(one(i) for i in range(total)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await prober
+
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] * 1000
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000
+    probe_max = max(probe_latencies, default=0) * 1000
+    return (f"{elapsed:8.3f}s  {total / elapsed:7.1f} logins/s  "
+            f"p50={p50:8.1f}ms  p99={p99:8.1f}ms  /health max={probe_max:7.1f}ms")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=10,
+                        help="logins in flight; keep below the engine pool size (5 + 10 overflow)")
+    parser.add_argument("--rounds", type=int, default=12, help="bcrypt rounds (BCRYPT_ROUNDS)")
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "login_bench.db")
+    os.environ["BCRYPT_ROUNDS"] = str(args.rounds)
+
+    import logging
+    logging.disable(logging.WARNING)
+    import httpx
+    from fastapi import FastAPI
+    import app.auth as auth
+    from app.api import auth as auth_api
+    from app.dependencies import SessionLocal, engine
+    from app.models import Base, User
+
+    Base.metadata.create_all(bind=engine)
+    password_hash = auth.get_password_hash("semester-start")
+    db = SessionLocal()
+    db.add_all([
+        User(userName=f"User {i}", userEmail=f"user{i}@upm.edu.ph", password=password_hash, role="faculty")
+        for i in range(args.logins)
+    ])
+    db.commit()
+    db.close()
+
+    app = FastAPI()
+    app.include_router(auth_api.router, prefix="/auth")
+
+    @app.get("/health")
+    async def health():
+        return {"status": "healthy"}
+
+    cores = os.cpu_count() or 1
+    print(f"{args.logins} logins, concurrency {args.concurrency}, bcrypt rounds {args.rounds}, {cores} cores")
+
+    async def verify_inline(plain_password, hashed_password):
+        # The old behaviour: bcrypt on the event loop thread
+        return auth.pwd_context.verify_and_update(plain_password, hashed_password)
+
+    async with httpx.AsyncClient(app=app, base_url="http://bench") as client:
+        verify_on_pool = auth.verify_and_update_password
+        auth.verify_and_update_password = verify_inline
+        print(f"{'inline':<10} {await storm(client, args.logins, args.concurrency)}")
+        auth.verify_and_update_password = verify_on_pool
+
+        workers = 1
+        while True:
+            auth._password_executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+            print(f"{f'pool x{workers}':<10} {await storm(client, args.logins, args.concurrency)}")
+            auth._password_executor.shutdown()
+            if workers >= cores:
+                break
+            workers = min(workers * 2, cores)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
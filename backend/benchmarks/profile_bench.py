@@ -0,0 +1,123 @@
+"""
+Benchmark: GET /profile/me with lazy relationships, aggregated loading and ETags.
+
+Seeds one user with a few rows in each profile child table, then sends the
+same bearer token through the ASGI app repeatedly:
+
+  * lazy       - the old handler: four lazy relationship loads per request
+  * aggregated - /profile/me, ETag and children from one JSON-aggregating query
+  * etag       - /profile/me with If-None-Match, answered with 304
+
+Usage (from the backend directory):
+
+    python benchmarks/profile_bench.py --requests 2000 --concurrency 10 --db-latency 1
+
+The database is a throwaway SQLite file. --db-latency adds an artificial
+delay (ms) to every statement to approximate a network round trip to
+PostgreSQL. The token cache is disabled so each request sees its own
+session, as with several API workers.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from datetime import date
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+async def run(label: str, client, path: str, headers: dict, total: int, concurrency: int, expect: int):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one():
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.get(path, headers=headers)
+            assert response.status_code == expect, response.status_code
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] * 1000
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000
+    print(f"{label:<10} {elapsed:8.3f}s  {total / elapsed:8.1f} req/s  p50={p50:7.2f}ms  p99={p99:7.2f}ms")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=10,
+                        help="keep below the engine pool size (5 + 10 overflow)")
+    parser.add_argument("--db-latency", type=float, default=0.0, help="extra ms per SQL statement")
+    parser.add_argument("--rows", type=int, default=5, help="rows per profile child table")
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "profile_bench.db")
+    os.environ["DOLIBARR_OUTBOX_IN_PROCESS"] = "false"
+
+    import logging
+    logging.disable(logging.WARNING)
+    import httpx
+    from fastapi import Depends
+    from sqlalchemy import event
+    from app.auth import create_access_token
+    from app.dependencies import SessionLocal, auth_cache, engine, get_current_user
+    from app.main import app
+    from app.models import Base, User, Degree, ResearchInterest, Affiliations, ResearchExperience
+    from app.schemas import ProfileResponse
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    user = User(userName="Bench User", userEmail="bench@upm.edu.ph", password="x", role="faculty",
+                department="Physics", college="CAS")
+    db.add(user)
+    db.flush()
+    for i in range(args.rows):
+        db.add_all([
+            Degree(userId=user.userId, school=f"School {i}", year=2000 + i, degreeType="PhD"),
+            ResearchInterest(userId=user.userId, resInt=f"Interest {i}"),
+            Affiliations(userId=user.userId, affInt=f"Affiliation {i}"),
+            ResearchExperience(userId=user.userId, resExpLoc=f"Lab {i}", startDate=date(2010 + i, 1, 1))
+        ])
+    db.commit()
+    db.close()
+    auth_cache.max_entries = 0
+
+    if args.db_latency:
+        @event.listens_for(engine, "before_cursor_execute")
+        def _delay(*_):
+            time.sleep(args.db_latency / 1000)
+
+    @app.get("/bench/profile-lazy", response_model=ProfileResponse)
+    async def lazy_profile(current_user: User = Depends(get_current_user)):
+        return {
+            "user": current_user,
+            "degrees": current_user.degrees,
+            "research_interests": current_user.research_interests,
+            "affiliations": current_user.affiliations,
+            "research_experiences": current_user.research_experiences
+        }
+
+    headers = {"Authorization": "Bearer " + create_access_token({"sub": "bench@upm.edu.ph", "role": "faculty"})}
+    print(f"{args.requests} requests, concurrency {args.concurrency}, db latency {args.db_latency}ms, "
+          f"{args.rows} rows per child table")
+
+    async with httpx.AsyncClient(app=app, base_url="http://bench") as client:
+        lazy = (await client.get("/bench/profile-lazy", headers=headers)).json()
+        first = await client.get("/profile/me", headers=headers)
+        assert first.json() == lazy, "aggregated profile differs from the lazy one"
+        etag_headers = {**headers, "If-None-Match": first.headers["etag"]}
+
+        await run("lazy", client, "/bench/profile-lazy", headers, args.requests, args.concurrency, 200)
+        await run("aggregated", client, "/profile/me", headers, args.requests, args.concurrency, 200)
+        await run("etag", client, "/profile/me", etag_headers, args.requests, args.concurrency, 304)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
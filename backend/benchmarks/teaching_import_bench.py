@@ -0,0 +1,122 @@
+"""
+Benchmark: entering a semester of course sections one POST at a time vs one file import.
+
+Seeds a department head, a dean and a faculty member, then creates
+--records course records for the faculty member twice over:
+
+  * single - one POST /teaching/ per record
+  * import - one POST /teaching/import with a CSV of all of them
+
+and the benchmark reports wall time and SQL statements for each. The
+import is then repeated to show that a re-run only reads.
+
+Usage (from the backend directory):
+
+    python benchmarks/teaching_import_bench.py --records 1000 --db-latency 1
+
+The database is a throwaway SQLite file. --db-latency adds an artificial
+delay (ms) to every statement to approximate a network round trip to
+PostgreSQL. SQLite cannot order RETURNING rows, so SQLAlchemy sends the
+import's INSERTs one row at a time there; on PostgreSQL each batch is a
+few multi-row INSERT ... RETURNING statements, so the import's statement
+count here is an upper bound.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+COLUMNS = ("academicYear", "term", "courseNum", "section", "courseDesc", "courseType",
+           "percentContri", "loadCreditUnits", "noOfRespondents", "teachingPoints")
+
+
+def course(term: str, i: int):
+    return {
+        "academicYear": "2025-2026", "term": term, "courseNum": "Physics 71", "section": f"S{i}",
+        "courseDesc": "Elementary Physics", "courseType": "lecture", "percentContri": 100,
+        "loadCreditUnits": 3, "noOfRespondents": 30, "teachingPoints": 4.5
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=1000)
+    parser.add_argument("--db-latency", type=float, default=0.0, help="extra ms per SQL statement")
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "teaching_import_bench.db")
+    os.environ["DOLIBARR_OUTBOX_IN_PROCESS"] = "false"
+
+    import logging
+    logging.disable(logging.WARNING)
+    import httpx
+    from sqlalchemy import event, func, select
+    from app.auth import create_access_token
+    from app.dependencies import SessionLocal, async_engine, engine
+    from app.main import app
+    from app.models import Base, User, CourseAndSET
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    db.add_all([
+        User(userName="Bench Faculty", userEmail="faculty@upm.edu.ph", password="x", role="faculty",
+             department="Physics", college="CAS"),
+        User(userName="Bench Head", userEmail="head@upm.edu.ph", password="x", role="faculty",
+             department="Physics", college="CAS", isDepartmentHead=True),
+        User(userName="Bench Dean", userEmail="dean@upm.edu.ph", password="x", role="faculty",
+             department="Physics", college="CAS", isDean=True)
+    ])
+    db.commit()
+    db.close()
+
+    statements = 0
+
+    def _count(*_):
+        nonlocal statements
+        statements += 1
+        if args.db_latency:
+            time.sleep(args.db_latency / 1000)
+
+    # Handlers use the async engine, the import its own sync sessions
+    event.listen(async_engine.sync_engine, "before_cursor_execute", _count)
+    event.listen(engine, "before_cursor_execute", _count)
+
+    headers = {"Authorization": "Bearer " + create_access_token({"sub": "faculty@upm.edu.ph", "role": "faculty"})}
+    csv_body = ",".join(COLUMNS) + "\n" + "".join(
+        ",".join(str(course("2nd", i)[column]) for column in COLUMNS) + "\n"
+        for i in range(args.records)
+    )
+    print(f"{args.records} records per run, db latency {args.db_latency}ms")
+
+    async with httpx.AsyncClient(app=app, base_url="http://bench") as client:
+        await client.get("/teaching/", headers=headers)
+
+        statements = 0
+        start = time.perf_counter()
+        for i in range(args.records):
+            response = await client.post("/teaching/", headers=headers, json=course("1st", i))
+            assert response.status_code == 200, response.text
+        elapsed = time.perf_counter() - start
+        print(f"single {elapsed:8.3f}s  {args.records} requests  {statements} statements")
+
+        for label in ("import", "re-run"):
+            statements = 0
+            start = time.perf_counter()
+            response = await client.post("/teaching/import", headers=headers,
+                                         files={"file": ("courses.csv", csv_body.encode())})
+            elapsed = time.perf_counter() - start
+            assert response.status_code == 200 and response.json()["failed"] == 0, response.text
+            print(f"{label} {elapsed:8.3f}s  1 request  {statements} statements")
+
+    db = SessionLocal()
+    total = db.scalar(select(func.count()).select_from(CourseAndSET))
+    db.close()
+    assert total == 2 * args.records, total
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
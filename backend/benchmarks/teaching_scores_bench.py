@@ -0,0 +1,121 @@
+"""
+Benchmark: college-wide teaching score aggregates, per-row Python loop vs NumPy.
+
+Seeds --faculty faculty members across --departments departments of one
+college with --courses course records each for one term, then totals
+teaching points and respondent-weighted SET averages per department:
+
+  * loop   - one pass over the rows in Python, accumulating dicts
+  * numpy  - aggregate_scores, the /teaching/scores implementation
+
+Both start from the same score_query rows; the query time is reported
+separately.
+
+Usage (from the backend directory):
+
+    python benchmarks/teaching_scores_bench.py --faculty 2000 --courses 10
+
+The database is a throwaway SQLite file.
+"""
+import argparse
+import math
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def loop_scores(rows, weights):
+    groups = {}
+    for key, name, p1, p2, p3, load_units, percent, respondents, submitted in rows:
+        group = groups.setdefault(key, {"courses": 0, "teachingPoints": 0.0, "weighted": 0.0, "respondents": 0.0})
+        rated = [(part, weight) for part, weight in zip((p1, p2, p3), weights) if part is not None]
+        weight = sum(weight for _, weight in rated)
+        score = sum(part * weight for part, weight in rated) / weight if weight else None
+        points = submitted
+        if score is not None and load_units is not None and percent is not None:
+            points = load_units * percent / 100 * score
+        group["courses"] += 1
+        group["teachingPoints"] += points or 0.0
+        if score is not None and respondents:
+            group["weighted"] += score * respondents
+            group["respondents"] += respondents
+    return {
+        key: (group["teachingPoints"], group["weighted"] / group["respondents"] if group["respondents"] else None)
+        for key, group in groups.items()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--faculty", type=int, default=2000)
+    parser.add_argument("--courses", type=int, default=10, help="courses per faculty member")
+    parser.add_argument("--departments", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "teaching_scores_bench.db")
+    os.environ["DOLIBARR_OUTBOX_IN_PROCESS"] = "false"
+
+    import logging
+    logging.disable(logging.WARNING)
+    from app.dependencies import SessionLocal, engine
+    from app.models import Base, User, CourseAndSET
+    from app.services.teaching_scores import SET_WEIGHTS, aggregate_scores, score_query
+
+    Base.metadata.create_all(bind=engine)
+    random.seed(0)
+    db = SessionLocal()
+    admin = User(userName="Bench Admin", userEmail="admin@upm.edu.ph", password="x", role="admin")
+    faculty = [
+        User(userName=f"Faculty {i}", userEmail=f"faculty{i}@upm.edu.ph", password="x", role="faculty",
+             department=f"Department {i % args.departments}", college="CAS")
+        for i in range(args.faculty)
+    ]
+    db.add_all([admin, *faculty])
+    db.flush()
+
+    def rating():
+        return None if random.random() < 0.05 else round(random.uniform(2.5, 5), 2)
+
+    db.bulk_insert_mappings(CourseAndSET, [
+        {
+            "userId": user.userId, "academicYear": "2025-2026", "term": "1st", "courseNum": f"Course {n}",
+            "section": "A", "courseDesc": "Bench", "courseType": "lecture", "status": "approved",
+            "percentContri": random.choice((50, 100)), "loadCreditUnits": random.choice((2, 3, 5)),
+            "noOfRespondents": random.randint(0, 40),
+            "partOneStudent": rating(), "partTwoCourse": rating(), "partThreeTeaching": rating()
+        }
+        for user in faculty for n in range(args.courses)
+    ])
+    db.commit()
+
+    start = time.perf_counter()
+    rows = db.execute(score_query(admin, "department", academic_year="2025-2026", term="1st", college="CAS")).all()
+    print(f"{len(rows)} courses, {args.departments} departments; query {time.perf_counter() - start:.3f}s")
+
+    timings = {}
+    for label, run in (
+        ("loop", lambda: loop_scores(rows, SET_WEIGHTS.tolist())),
+        ("numpy", lambda: aggregate_scores(rows))
+    ):
+        best = math.inf
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            result = run()
+            best = min(best, time.perf_counter() - start)
+        timings[label] = result
+        print(f"{label:<6} {best * 1000:9.2f}ms")
+
+    for group in timings["numpy"]["groups"]:
+        points, average = timings["loop"][group["key"]]
+        assert math.isclose(points, group["teachingPoints"], rel_tol=1e-9), group
+        assert math.isclose(average, group["setAverage"], rel_tol=1e-9), group
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Benchmark: saving concurrent supporting-document uploads, buffered vs streamed.
+
+Builds --uploads UploadFile objects of --size MB, spooled to disk the way
+Starlette leaves multipart files, and saves them concurrently while a probe
+task measures event loop lag every 5ms. Reports throughput, loop lag and
+the peak Python heap (tracemalloc) for:
+
+  * buffered - the old save_upload_file: read() the whole file, blocking write
+  * streamed - save_upload_file copying chunks on a worker thread
+
+Usage (from the backend directory):
+
+    python benchmarks/upload_bench.py --uploads 8 --size 8
+
+Each upload has distinct random contents, so the document store can't
+deduplicate them. Files and the database go to a throwaway temp directory.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import uuid
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+async def buffered_save_upload_file(file):
+    from app.config import settings
+    target_dir = os.path.join(settings.UPLOAD_DIRECTORY, "buffered")
+    os.makedirs(target_dir, exist_ok=True)
+    unique_filename = f"{uuid.uuid4()}{os.path.splitext(file.filename)[1]}"
+    contents = await file.read()
+    with open(os.path.join(target_dir, unique_filename), "wb") as f:
+        f.write(contents)
+        f.flush()
+        os.fsync(f.fileno())
+    return os.path.join("buffered", unique_filename)
+
+
+def make_uploads(size: int, count: int):
+    from tempfile import SpooledTemporaryFile
+    from fastapi import UploadFile
+    uploads = []
+    for _ in range(count):
+        spooled = SpooledTemporaryFile(max_size=1024 * 1024)
+        spooled.write(os.urandom(size))
+        spooled.seek(0)
+        uploads.append(UploadFile(spooled, size=size, filename="paper.pdf"))
+    return uploads
+
+
+async def run(label: str, save, size: int, count: int):
+    uploads = make_uploads(size, count)
+    lags = []
+    done = asyncio.Event()
+
+    async def probe():
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(0.005)
+            lags.append(time.perf_counter() - start - 0.005)
+
+    prober = asyncio.create_task(probe())
+    await asyncio.sleep(0.02)
+    tracemalloc.start()
+    start = time.perf_counter()
+    await asyncio.gather(*(save(upload) for upload in uploads))
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    done.set()
+    await prober
+
+    lags.sort()
+    mb = count * size / 1024 / 1024
+    print(f"{label:<9} {elapsed:7.3f}s  {mb / elapsed:7.1f} MB/s  loop lag max={lags[-1] * 1000:7.2f}ms  "
+          f"peak heap={peak / 1024 / 1024:7.1f} MB")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--uploads", type=int, default=8, help="concurrent uploads")
+    parser.add_argument("--size", type=float, default=8, help="MB per upload (limit is 10)")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(workdir, "upload_bench.db")
+    os.environ["UPLOAD_DIRECTORY"] = os.path.join(workdir, "uploads")
+
+    import logging
+    logging.disable(logging.WARNING)
+    from app.config import settings
+    from app.dependencies import engine
+    from app.models import Base
+    from app.utils import save_upload_file
+
+    Base.metadata.create_all(bind=engine)
+    size = int(args.size * 1024 * 1024)
+    print(f"{args.uploads} concurrent uploads of {args.size} MB, {settings.UPLOAD_CHUNK_SIZE // 1024} KB chunks")
+
+    await run("buffered", buffered_save_upload_file, size, args.uploads)
+    await run("streamed", save_upload_file, size, args.uploads)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -139,8 +139,25 @@ export const usersAPI = {
     return response.data;
   },
   
-  syncAllWithDolibarr: async () => {
-    const response = await api.post('/users/sync-all');
+  syncAllWithDolibarr: async (full: boolean = false) => {
+    // Sync runs as a background job on the server; poll until it finishes.
+    // By default only users changed since their last sync are pushed.
+    const response = await api.post('/users/sync-all', null, { params: { full } });
+    let job = response.data;
+    while (job.status === 'queued' || job.status === 'running') {
+      await new Promise(resolve => setTimeout(resolve, 2000));
+      const statusResponse = await api.get(`/users/sync-jobs/${job.job_id}`);
+      job = statusResponse.data;
+    }
+    if (job.status === 'failed') {
+      throw new Error(`Dolibarr sync failed: ${JSON.stringify(job.errors)}`);
+    }
+    const usersResponse = await api.get('/users/');
+    return usersResponse.data;
+  },
+  
+  getSyncJob: async (jobId: string) => {
+    const response = await api.get(`/users/sync-jobs/${jobId}`);
     return response.data;
   }
 };
@@ -416,6 +433,14 @@ export const approvalAPI = {
     return api.get('/approval/pending');
   },
   
+  getInbox(params?: { record_type?: string[]; status?: string; order?: 'asc' | 'desc'; limit?: number; cursor?: string }) {
+    return api.get('/approval/inbox', {
+      params,
+      // Repeat record_type instead of using the record_type[] form
+      paramsSerializer: { indexes: null }
+    });
+  },
+  
   getMySubmissions() {
     return api.get('/approval/my-submissions');
   },